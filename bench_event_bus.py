@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark du bus d'événements partagé (EVENT_BUS=sqlite)
+
+Plusieurs processus publient en parallèle, plusieurs processus consomment comme
+des workers SSE. Mesure le débit de publication et la latence de bout en bout,
+et vérifie la garantie d'ordre : tous les consommateurs voient exactement la
+même séquence, et l'ordre de publication de chaque producteur est conservé.
+
+Usage : python bench_event_bus.py [--publishers 4] [--consumers 2] [--events 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+
+def _import_server(bus_path, db_path):
+    """Importer server.py configuré sur le bus SQLite (sans le bruit du démarrage)"""
+    os.environ['EVENT_BUS'] = 'sqlite'
+    os.environ['EVENT_BUS_PATH'] = bus_path
+    os.environ['DB_PATH'] = db_path
+    os.environ['SSE_BUFFER_SIZE'] = '1000000'
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    with contextlib.redirect_stdout(io.StringIO()):
+        import server
+        server.event_bus.start()
+    return server
+
+
+def publisher(worker_id, count, bus_path, db_path, ready, go, results):
+    server = _import_server(bus_path, db_path)
+    ready.wait()
+    go.wait()
+    started = time.perf_counter()
+    for n in range(count):
+        server.event_bus.publish('bench', {'worker': worker_id, 'n': n, 'sentAt': time.time()})
+    results.put(('publisher', worker_id, time.perf_counter() - started))
+
+
+def consumer(consumer_id, expected, bus_path, db_path, ready, results):
+    server = _import_server(bus_path, db_path)
+    received = []
+    original_append = server.append_event
+
+    def recording_append(event_type, data, seq=None):
+        if event_type == 'bench':
+            received.append((seq, data['worker'], data['n'], time.time() - data['sentAt']))
+        original_append(event_type, data, seq=seq)
+
+    server.append_event = recording_append
+    ready.wait()
+    deadline = time.time() + 120
+    while len(received) < expected and time.time() < deadline:
+        time.sleep(0.01)
+    results.put(('consumer', consumer_id, received))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--publishers', type=int, default=4)
+    parser.add_argument('--consumers', type=int, default=2)
+    parser.add_argument('--events', type=int, default=2000, help='événements par producteur')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='event-bus-bench-')
+    bus_path = os.path.join(workdir, 'events.db')
+    db_path = os.path.join(workdir, 'inventory.db')
+    expected = args.publishers * args.events
+
+    ctx = multiprocessing.get_context('spawn')
+    ready = ctx.Barrier(args.publishers + args.consumers + 1)
+    go = ctx.Event()
+    results = ctx.Queue()
+    processes = [ctx.Process(target=consumer, args=(i, expected, bus_path, db_path, ready, results))
+                 for i in range(args.consumers)]
+    processes += [ctx.Process(target=publisher, args=(i, args.events, bus_path, db_path, ready, go, results))
+                  for i in range(args.publishers)]
+    for process in processes:
+        process.start()
+
+    ready.wait()
+    started = time.perf_counter()
+    go.set()
+
+    publish_times = []
+    streams = {}
+    for _ in processes:
+        kind, ident, value = results.get()
+        if kind == 'publisher':
+            publish_times.append(value)
+        else:
+            streams[ident] = value
+    elapsed = time.perf_counter() - started
+    for process in processes:
+        process.join()
+
+    print(f'Producteurs: {args.publishers} x {args.events} événements, consommateurs: {args.consumers}')
+    print(f'Publication : {expected / max(publish_times):,.0f} évt/s (tous producteurs)')
+    print(f'Bout en bout: {expected / elapsed:,.0f} évt/s reçus par chaque consommateur')
+
+    orders = []
+    ok = True
+    for ident, received in sorted(streams.items()):
+        latencies = sorted(r[3] * 1000 for r in received)
+        seqs = [r[0] for r in received]
+        order = [(r[1], r[2]) for r in received]
+        per_worker_fifo = all(
+            [n for w, n in order if w == worker] == list(range(args.events))
+            for worker in range(args.publishers)
+        )
+        monotonic = all(a < b for a, b in zip(seqs, seqs[1:]))
+        complete = len(received) == expected
+        ok = ok and per_worker_fifo and monotonic and complete
+        orders.append(order)
+        p99 = latencies[int(len(latencies) * 0.99) - 1] if latencies else float('nan')
+        print(f'  consommateur {ident}: {len(received)}/{expected} reçus, '
+              f'latence p50 {statistics.median(latencies) if latencies else float("nan"):.1f} ms, p99 {p99:.1f} ms, '
+              f'seq croissante: {monotonic}, FIFO par producteur: {per_worker_fifo}')
+    same_order = all(order == orders[0] for order in orders)
+    print(f'Ordre identique chez tous les consommateurs: {same_order}')
+    sys.exit(0 if ok and same_order else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Benchmark de charge : serveur de développement Flask vs serveur de production
+
+Lance server.py sur une base temporaire dans chaque mode, crée quelques items puis
+envoie des requêtes GET en parallèle (connexions keep-alive) pendant une durée fixe.
+Affiche requêtes/seconde et latences p50/p99 par mode.
+
+Usage : python bench_server.py [--workers 4] [--clients 32] [--duration 10] [--path /api/items]
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def start_server(mode, port, workers, workdir):
+    """Démarrer server.py dans le mode demandé et attendre qu'il réponde"""
+    env = dict(os.environ)
+    env.update({
+        'SERVER_PORT': str(port),
+        'DB_PATH': os.path.join(workdir, 'inventory.db'),
+        'EVENT_BUS_PATH': os.path.join(workdir, 'events.db'),
+        'FLASK_DEBUG': 'false',
+        'WHISPER_PRELOAD': 'false'
+    })
+    if mode == 'dev':
+        env.update({'APP_MODE': 'development', 'PRODUCTION_SERVER': 'false'})
+    else:
+        env.update({'APP_MODE': 'production', 'PRODUCTION_SERVER': 'true', 'SERVER_WORKERS': str(workers)})
+    process = subprocess.Popen([sys.executable, os.path.join(SCRIPT_DIR, 'server.py')], env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=2)
+            conn.request('GET', '/api/health')
+            if conn.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f'Le serveur ({mode}) ne répond pas sur le port {port}')
+
+
+def seed_items(port, count):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    for n in range(count):
+        body = json.dumps({'name': f'Bench {n}', 'serialNumber': f'BENCH-{n:05d}', 'quantity': n % 7 + 1})
+        conn.request('POST', '/api/items', body=body, headers={'Content-Type': 'application/json'})
+        conn.getresponse().read()
+
+
+def load_process(port, path, threads, duration, results):
+    """Un processus client : plusieurs threads, une connexion keep-alive chacun"""
+    latencies = []
+    errors = [0]
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def run():
+        local, failed = [], 0
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            try:
+                conn.request('GET', path)
+                response = conn.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+                    continue
+                local.append(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        with lock:
+            latencies.extend(local)
+            errors[0] += failed
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    results.put((latencies, errors[0]))
+
+
+def run_load(port, path, clients, duration):
+    processes_count = min(clients, os.cpu_count() or 1)
+    ctx = multiprocessing.get_context('spawn')
+    results = ctx.Queue()
+    per_process = [clients // processes_count + (1 if i < clients % processes_count else 0)
+                   for i in range(processes_count)]
+    processes = [ctx.Process(target=load_process, args=(port, path, n, duration, results)) for n in per_process]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    latencies, errors = [], 0
+    for _ in processes:
+        chunk, failed = results.get()
+        latencies.extend(chunk)
+        errors += failed
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed,
+        'p50': latencies[len(latencies) // 2] * 1000 if latencies else float('nan'),
+        'p99': latencies[int(len(latencies) * 0.99) - 1] * 1000 if latencies else float('nan')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=min(4, os.cpu_count() or 1), help='workers du serveur de production')
+    parser.add_argument('--clients', type=int, default=32, help='connexions simultanées')
+    parser.add_argument('--duration', type=float, default=10, help='durée de chaque mesure (s)')
+    parser.add_argument('--path', default='/api/items', help='route mesurée')
+    parser.add_argument('--items', type=int, default=200, help='items créés avant la mesure')
+    parser.add_argument('--port', type=int, default=5099)
+    args = parser.parse_args()
+
+    print(f'{args.clients} clients, {args.duration:.0f} s, GET {args.path}, {args.items} items')
+    for mode in ('dev', 'production'):
+        workdir = tempfile.mkdtemp(prefix='server-bench-')
+        process = start_server(mode, args.port, args.workers, workdir)
+        try:
+            seed_items(args.port, args.items)
+            run_load(args.port, args.path, args.clients, 1)  # échauffement
+            result = run_load(args.port, args.path, args.clients, args.duration)
+        finally:
+            process.terminate()
+            process.wait(timeout=30)
+            shutil.rmtree(workdir, ignore_errors=True)
+        label = 'Flask dev (threaded)' if mode == 'dev' else f'production ({args.workers} workers)'
+        print(f'  {label:<24} {result["rps"]:>8.0f} req/s   p50 {result["p50"]:6.1f} ms   '
+              f'p99 {result["p99"]:6.1f} ms   erreurs {result["errors"]}')
+
+
+if __name__ == '__main__':
+    main()
@@ -23,7 +23,8 @@ CREATE TABLE IF NOT EXISTS items (
     current_rental_id INT,
     custom_data JSON,
     parent_id INT,
-    display_order INT
+    display_order INT,
+    version INT DEFAULT 1
 );
 
 CREATE TABLE IF NOT EXISTS custom_fields (
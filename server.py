@@ -8,6 +8,10 @@ Base de données SQLite locale
 
 import sys
 import io
+import time
+
+# Début du démarrage (profil des phases de boot, voir BOOT_PHASES)
+BOOT_STARTED_AT = time.perf_counter()
 
 # Forcer l'encodage UTF-8 pour stdout et stderr sur Windows
 if sys.platform == 'win32':
@@ -20,7 +24,7 @@ if sys.platform == 'win32':
         sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
         sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-from flask import Flask, request, jsonify, send_from_directory, Response, send_file
+from flask import Flask, request, jsonify, send_from_directory, Response, send_file, g, has_request_context
 from flask_cors import CORS
 import sqlite3
 import os
@@ -28,13 +32,29 @@ import secrets
 from datetime import datetime, timedelta
 import requests
 import threading
+import asyncio
+import gc
+import importlib.util
 import queue
 import json
+import logging
+import logging.handlers
+import atexit
+import random
+import math
+import hashlib
 import base64
+import csv
 import re
 import urllib.parse
+import mimetypes
+import gzip
 from io import BytesIO
-from functools import wraps
+from functools import wraps, lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from collections import deque
+from itertools import islice
 
 # Charger les variables d'environnement depuis le fichier .env
 try:
@@ -64,29 +84,201 @@ print(f'[CONFIG] Mode: {APP_MODE}')
 print(f'[CONFIG] CORS Origins: {CORS_ORIGINS_LIST}')
 print(f'[CONFIG] Port: {SERVER_PORT}')
 
-# Fonction d'affichage sécurisée pour Windows
-def safe_print(msg):
-    """Print qui ne plante jamais sur Windows (Errno 22)"""
-    try:
-        print(msg)
-    except (OSError, IOError, UnicodeEncodeError):
+# ==================== JOURNALISATION ====================
+# Les logs passent par une file : le thread de la requête ne fait que déposer un
+# enregistrement, un thread dédié (QueueListener) formate et écrit sur stdout.
+# Format texte en développement, JSON (un objet par ligne) en production.
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.environ.get('LOG_FORMAT', 'json' if APP_MODE == 'production' else 'text').lower()
+# Contenu des requêtes (données reçues, textes transcrits...) : désactivé en production
+LOG_PAYLOADS = os.environ.get('LOG_PAYLOADS', 'false' if APP_MODE == 'production' else 'true').lower() == 'true'
+LOG_QUEUE_SIZE = int(os.environ.get('LOG_QUEUE_SIZE', 10000))
+# Échantillonnage des logs de requêtes : taux par défaut + taux par route
+# (LOG_SAMPLING="/api/health=0,GET /api/items=0.1" ; route Flask, méthode optionnelle).
+# Les réponses 4xx/5xx sont toujours journalisées.
+LOG_REQUEST_SAMPLE_RATE = float(os.environ.get('LOG_REQUEST_SAMPLE_RATE', 1.0))
+
+def parse_log_sampling(value):
+    """Lire LOG_SAMPLING : {'[MÉTHODE ]route': taux}"""
+    rates = {}
+    for entry in (value or '').split(','):
+        route, sep, rate = entry.rpartition('=')
+        if not sep or not route.strip():
+            continue
         try:
-            # Essayer avec ASCII uniquement
-            print(msg.encode('ascii', errors='replace').decode('ascii'))
-        except:
+            rates[' '.join(route.split())] = min(1.0, max(0.0, float(rate)))
+        except ValueError:
+            print(f'[CONFIG] LOG_SAMPLING ignoré: {entry.strip()}')
+    return rates
+
+LOG_SAMPLING = parse_log_sampling(os.environ.get('LOG_SAMPLING', ''))
+
+_LOG_TAG_PATTERN = re.compile(r'^\s*\[([^\]]{1,20})\]\s*')
+log_dropped_count = 0  # enregistrements perdus (file pleine)
+
+class _LogQueueHandler(logging.handlers.QueueHandler):
+    """Dépose l'enregistrement dans la file (sans bloquer : abandonné si la file est pleine)"""
+
+    def prepare(self, record):
+        # Figer le message, le traceback et l'id de requête dans le thread appelant
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = record.exc_text or logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if has_request_context():
+            record.request_id = getattr(g, 'request_id', None)
+        return record
+
+    def enqueue(self, record):
+        global log_dropped_count
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            log_dropped_count += 1
+
+class _SafeStreamHandler(logging.StreamHandler):
+    """Écriture sur stdout qui ne plante jamais sur Windows (Errno 22, encodage)"""
+
+    def emit(self, record):
+        try:
+            line = self.format(record)
+            try:
+                self.stream.write(line + '\n')
+            except (OSError, UnicodeEncodeError):
+                self.stream.write(line.encode('ascii', errors='replace').decode('ascii') + '\n')
+            self.flush()
+        except Exception:
             pass  # Abandonner silencieusement
 
+class _TextLogFormatter(logging.Formatter):
+    """Format terminal : le message tel quel ([TAG] en tête), horodaté pour les logs _log()"""
+
+    def format(self, record):
+        message = record.getMessage()
+        tag = getattr(record, 'tag', None)
+        if tag:
+            message = f"[{datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S')}] [{tag}] {message}"
+        if getattr(record, 'request_id', None) and record.levelno >= logging.WARNING:
+            message = f'{message} (requête {record.request_id})'
+        if record.exc_text:
+            message = f'{message}\n{record.exc_text}' if message else record.exc_text
+        return message
+
+class _JsonLogFormatter(logging.Formatter):
+    """Format structuré : un objet JSON par ligne (composant extrait du préfixe [TAG])"""
+
+    def format(self, record):
+        message = record.getMessage()
+        tag = getattr(record, 'tag', None)
+        match = _LOG_TAG_PATTERN.match(message)
+        if match:
+            tag = tag or match.group(1)
+            message = message[match.end():]
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'component': tag,
+            'msg': message,
+            'pid': record.process
+        }
+        if getattr(record, 'request_id', None):
+            entry['requestId'] = record.request_id
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+logger = logging.getLogger('inventory')
+logger.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+logger.propagate = False
+log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+_log_stream_handler = _SafeStreamHandler(sys.stdout)
+_log_stream_handler.setFormatter(_JsonLogFormatter() if LOG_FORMAT == 'json' else _TextLogFormatter())
+# Un worker multi-processus importe ce fichier deux fois (__mp_main__ puis server) et
+# le logger 'inventory' est partagé : remplacer la file installée par l'import
+# précédent (vidée par stop) pour garder un seul gestionnaire et un seul listener.
+_previous_log_pipeline = getattr(logger, '_inventory_log_pipeline', None)
+if _previous_log_pipeline:
+    _previous_handler, _previous_listener = _previous_log_pipeline
+    _previous_listener.stop()
+    atexit.unregister(_previous_listener.stop)
+    logger.removeHandler(_previous_handler)
+_log_queue_handler = _LogQueueHandler(log_queue)
+logger.addHandler(_log_queue_handler)
+_log_listener = logging.handlers.QueueListener(log_queue, _log_stream_handler)
+_log_listener.start()
+logger._inventory_log_pipeline = (_log_queue_handler, _log_listener)
+# Vider la file à l'arrêt du processus
+atexit.register(_log_listener.stop)
+
+def flush_logs():
+    """Attendre que la file de logs soit écrite (avant un affichage direct, ex. bannière)"""
+    log_queue.join()
+
+def _infer_log_level(message):
+    """Niveau d'un message libre d'après son préfixe (ERREUR, ATTENTION...)"""
+    head = message[:80].upper()
+    if 'ERREUR' in head or 'ERROR' in head or '[KO]' in head:
+        return logging.ERROR
+    if 'ATTENTION' in head or 'WARN' in head:
+        return logging.WARNING
+    return logging.INFO
+
+def safe_print(msg, level=None, **fields):
+    """Journaliser un message (non bloquant ; niveau déduit du texte si non fourni)"""
+    try:
+        message = str(msg)
+        level = level or _infer_log_level(message)
+        if logger.isEnabledFor(level):
+            logger.log(level, message, extra={'fields': fields} if fields else None)
+    except Exception:
+        pass  # Ne jamais faire échouer une requête à cause d'un log
+
 def safe_traceback():
-    """Afficher le traceback de manière sécurisée sur Windows"""
+    """Journaliser le traceback de l'exception en cours"""
     try:
-        import traceback
-        import io
-        buffer = io.StringIO()
-        traceback.print_exc(file=buffer)
-        safe_print(buffer.getvalue())
-    except:
+        logger.error('', exc_info=True)
+    except Exception:
         pass  # Ignorer les erreurs de traceback
 
+def log_payload(label, data):
+    """Journaliser le contenu d'une requête (seulement si LOG_PAYLOADS)"""
+    if LOG_PAYLOADS:
+        safe_print(f'{label}: {data}', level=logging.INFO)
+
+# ==================== PROFIL DE DÉMARRAGE ====================
+
+# Phases de démarrage chronométrées : [{'name', 'seconds', 'parallel'?, 'error'?}]
+BOOT_PHASES = []
+_boot_phase_mark = BOOT_STARTED_AT
+BOOT_READY_SECONDS = None
+FIRST_REQUEST_SECONDS = None
+
+def record_boot_phase(name, seconds=None, parallel=False, error=None):
+    """Enregistrer une phase de démarrage (par défaut : durée depuis la phase précédente)"""
+    global _boot_phase_mark
+    now = time.perf_counter()
+    if seconds is None:
+        seconds = now - _boot_phase_mark
+        _boot_phase_mark = now
+    phase = {'name': name, 'seconds': round(seconds, 3)}
+    if parallel:
+        phase['parallel'] = True
+    if error:
+        phase['error'] = error
+    BOOT_PHASES.append(phase)
+
+def boot_report():
+    """Résumé du profil de démarrage (bannière et /api/health)"""
+    return {
+        'readySeconds': round(BOOT_READY_SECONDS, 3) if BOOT_READY_SECONDS is not None else None,
+        'firstRequestSeconds': round(FIRST_REQUEST_SECONDS, 3) if FIRST_REQUEST_SECONDS is not None else None,
+        'phases': BOOT_PHASES
+    }
+
+record_boot_phase('imports')
+
 # ==================== GESTION DES IMAGES ====================
 
 # Utiliser un chemin absolu basé sur le répertoire du script (évite les problèmes Windows/OneDrive)
@@ -102,10 +294,51 @@ def ensure_images_dir():
         safe_print(f'[IMG] Erreur création dossier images: {e}')
         return False
 
+# Stockage adressé par le contenu : le fichier est haché (SHA-256) pendant l'écriture
+# et nommé <empreinte>.<ext>. Un même contenu donne donc le même fichier, quel que
+# soit le nombre d'uploads ou d'items qui l'utilisent ; la table image_refs compte
+# les références dans items.image (tenue à jour par des triggers SQLite).
+IMAGE_HASH_LENGTH = 32  # caractères hexadécimaux de l'empreinte gardés dans le nom (128 bits)
+IMAGE_HASH_CHUNK_SIZE = 64 * 1024
+IMAGE_ORPHAN_GRACE_HOURS = float(os.environ.get('IMAGE_ORPHAN_GRACE_HOURS', 24))  # upload pas encore rattaché à un item
+CONTENT_ADDRESSED_IMAGE_PATTERN = re.compile(rf'^[0-9a-f]{{{IMAGE_HASH_LENGTH}}}\.(jpg|png|gif|webp)$')
+
+def sniff_image_extension(head):
+    """Extension d'après les premiers octets du fichier (None si format inconnu)"""
+    if head.startswith(b'\xff\xd8\xff'):
+        return 'jpg'
+    if head.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'png'
+    if head.startswith(b'GIF8'):
+        return 'gif'
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'webp'
+    return None
+
+def hash_image_file(path):
+    """Empreinte (tronquée) d'un fichier image"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(IMAGE_HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:IMAGE_HASH_LENGTH]
+
+def register_image(filename, size):
+    """Inscrire un upload dans l'index (sans référence tant qu'aucun item ne l'utilise)"""
+    conn = get_db()
+    try:
+        conn.execute('''
+            INSERT INTO image_refs (filename, ref_count, size, uploaded_at) VALUES (?, 0, ?, ?)
+            ON CONFLICT(filename) DO UPDATE SET size = excluded.size, uploaded_at = excluded.uploaded_at
+        ''', (filename, size, datetime.now().isoformat()))
+        conn.commit()
+    finally:
+        conn.close()
+
 def save_uploaded_file(file_storage, serial_number, index=0):
     """
-    Sauvegarder un fichier uploadé directement sur disque.
-    Simple et fiable - pas de Base64.
+    Sauvegarder un fichier uploadé directement sur disque, sous son empreinte.
+    Un contenu déjà présent n'est pas réécrit : le chemin existant est retourné.
     """
     try:
         safe_print(f'[IMG] save_uploaded_file: debut')
@@ -118,31 +351,182 @@ def save_uploaded_file(file_storage, serial_number, index=0):
             safe_print('[IMG] Erreur: file_storage invalide')
             return None
 
-        # Extension depuis le nom de fichier original
+        # Extension depuis le nom de fichier original (si le contenu ne la révèle pas)
         original_name = file_storage.filename
         ext = original_name.rsplit('.', 1)[-1].lower() if '.' in original_name else 'jpg'
         if ext not in ['jpg', 'jpeg', 'png', 'gif', 'webp']:
             ext = 'jpg'
 
-        # Nom de fichier simple et unique
-        unique_id = secrets.token_hex(6)
-        safe_serial = re.sub(r'[^a-zA-Z0-9]', '', str(serial_number or 'img'))[:20]
-        filename = f"{safe_serial}_{unique_id}.{ext}"
-        filepath = os.path.join(IMAGES_DIR, filename)
+        # Écrire le flux dans un fichier temporaire en calculant l'empreinte au passage
+        digest = hashlib.sha256()
+        size = 0
+        head = b''
+        temp_path = os.path.join(IMAGES_DIR, f'.upload-{secrets.token_hex(6)}.tmp')
+        try:
+            with open(temp_path, 'wb') as out:
+                for chunk in iter(lambda: file_storage.stream.read(IMAGE_HASH_CHUNK_SIZE), b''):
+                    if not head:
+                        head = chunk[:16]
+                    digest.update(chunk)
+                    out.write(chunk)
+                    size += len(chunk)
+            ext = sniff_image_extension(head) or ('jpg' if ext == 'jpeg' else ext)
+            filename = f'{digest.hexdigest()[:IMAGE_HASH_LENGTH]}.{ext}'
+            filepath = os.path.join(IMAGES_DIR, filename)
+            deduplicated = os.path.exists(filepath)
+            if not deduplicated:
+                os.replace(temp_path, filepath)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
-        safe_print(f'[IMG] Sauvegarde vers: {filepath}')
-        
-        # Sauvegarder directement
-        file_storage.save(filepath)
-        safe_print(f'[IMG] Fichier sauvegarde OK: {filename}')
+        register_image(filename, size)
+        metric_inc('inventory_image_uploads_total', {'outcome': 'deduplicated' if deduplicated else 'stored'})
+        if deduplicated:
+            safe_print(f'[IMG] Contenu déjà présent ({serial_number}): {filename}')
+        else:
+            safe_print(f'[IMG] Fichier sauvegarde OK ({serial_number}): {filename} ({size} octets)')
+            schedule_image_variants(filename)
         return f"/api/images/{filename}"
 
     except Exception as e:
         safe_print(f'[IMG] Exception sauvegarde: {e}')
-        import traceback
-        traceback.print_exc()
+        safe_traceback()
         return None
 
+# Tailles dérivées (miniature, moyenne) : générées après l'upload dans un pool de
+# threads, servies par /api/images/<fichier>?w=<largeur>. Les images plus anciennes
+# sont traitées à la première demande d'une taille (l'original est servi entre-temps).
+IMAGE_VARIANTS_DIR = os.path.join(IMAGES_DIR, 'variants')
+IMAGE_VARIANT_WIDTHS = tuple(sorted({int(w) for w in os.environ.get('IMAGE_VARIANT_WIDTHS', '160,640').split(',')
+                                     if w.strip().isdigit() and int(w) > 0}))
+IMAGE_VARIANT_FORMAT = os.environ.get('IMAGE_VARIANT_FORMAT', 'webp').lower()  # webp ou jpeg
+IMAGE_VARIANT_QUALITY = int(os.environ.get('IMAGE_VARIANT_QUALITY', 80))
+IMAGE_VARIANT_WORKERS = int(os.environ.get('IMAGE_VARIANT_WORKERS', 2))
+IMAGE_VARIANTS_AVAILABLE = importlib.util.find_spec('PIL') is not None
+IMAGE_VARIANT_EXTENSIONS = {'webp': 'webp', 'jpeg': 'jpg'}
+
+_image_variant_executor = None
+_image_variant_scheduled = set()  # fichiers déjà confiés au pool par ce processus
+_image_variant_lock = threading.Lock()
+_image_variant_format = None  # format effectif (jpeg si Pillow est compilé sans WebP)
+
+def image_variant_path(filename, width, fmt):
+    """Chemin d'une taille dérivée : variants/<fichier>.w<largeur>.<ext>"""
+    return os.path.join(IMAGE_VARIANTS_DIR, f'{filename}.w{width}.{IMAGE_VARIANT_EXTENSIONS[fmt]}')
+
+def get_image_variant_format():
+    global _image_variant_format
+    if _image_variant_format is None:
+        fmt = IMAGE_VARIANT_FORMAT if IMAGE_VARIANT_FORMAT in IMAGE_VARIANT_EXTENSIONS else 'jpeg'
+        if fmt == 'webp':
+            from PIL import features
+            if not features.check('webp'):
+                safe_print('[IMG] Pillow sans support WebP, tailles dérivées en JPEG', level='WARNING')
+                fmt = 'jpeg'
+        _image_variant_format = fmt
+    return _image_variant_format
+
+def generate_image_variants(filename):
+    """Créer les tailles dérivées manquantes (uniquement celles plus petites que l'original)"""
+    from PIL import Image, ImageOps
+    fmt = get_image_variant_format()
+    started = time.perf_counter()
+    created = []
+    with Image.open(os.path.join(IMAGES_DIR, filename)) as original:
+        # JPEG : décoder directement à une échelle réduite (1/2, 1/4, 1/8) suffisante
+        original.draft('RGB', (IMAGE_VARIANT_WIDTHS[-1], IMAGE_VARIANT_WIDTHS[-1]))
+        image = ImageOps.exif_transpose(original)  # photos de téléphone : appliquer l'orientation EXIF
+        if fmt == 'jpeg' and image.mode in ('RGBA', 'LA', 'P'):
+            image = image.convert('RGBA')
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.split()[-1])
+            image = background
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+        save_options = {'quality': IMAGE_VARIANT_QUALITY}
+        save_options.update({'method': 4} if fmt == 'webp' else {'optimize': True})
+        os.makedirs(IMAGE_VARIANTS_DIR, exist_ok=True)
+        for width in IMAGE_VARIANT_WIDTHS:
+            if width >= image.width:
+                break
+            target = image_variant_path(filename, width, fmt)
+            if os.path.exists(target):
+                continue
+            height = max(1, round(image.height * width / image.width))
+            variant = image.resize((width, height), Image.LANCZOS)
+            # Écriture atomique dans un fichier temporaire propre à ce rendu : deux workers
+            # qui génèrent la même taille n'écrivent jamais dans le même fichier
+            temp_path = f'{target}.{os.getpid()}-{secrets.token_hex(4)}.tmp'
+            try:
+                variant.save(temp_path, format=fmt.upper(), **save_options)
+                os.replace(temp_path, target)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+            created.append(width)
+    if created:
+        safe_print(f'[IMG] Tailles dérivées {filename}: {created} px ({fmt}, '
+                   f'{(time.perf_counter() - started) * 1000:.0f} ms)')
+    return created
+
+def _run_image_variants(filename):
+    try:
+        generate_image_variants(filename)
+    except Exception as e:
+        safe_print(f'[IMG] Erreur tailles dérivées {filename}: {e}', level='WARNING')
+
+def schedule_image_variants(filename):
+    """Confier la génération des tailles dérivées au pool (une fois par fichier et par processus)"""
+    global _image_variant_executor
+    if not IMAGE_VARIANTS_AVAILABLE or not IMAGE_VARIANT_WIDTHS:
+        return
+    with _image_variant_lock:
+        if filename in _image_variant_scheduled:
+            return
+        _image_variant_scheduled.add(filename)
+        if _image_variant_executor is None:
+            _image_variant_executor = ThreadPoolExecutor(max_workers=IMAGE_VARIANT_WORKERS,
+                                                         thread_name_prefix='img-variants')
+    _image_variant_executor.submit(_run_image_variants, filename)
+
+def select_image_variant(filename, requested_width):
+    """Plus petite taille précalculée couvrant la largeur demandée (None : servir l'original)"""
+    for width in IMAGE_VARIANT_WIDTHS:
+        if width >= requested_width:
+            for fmt in IMAGE_VARIANT_EXTENSIONS:
+                path = image_variant_path(filename, width, fmt)
+                if os.path.isfile(path):
+                    return path
+            # Image antérieure au pipeline, génération en cours ou original plus petit
+            schedule_image_variants(filename)
+            return None
+    return None
+
+_image_widths = {}  # fichier -> largeur de l'original (orientation EXIF appliquée)
+
+def image_display_width(filename):
+    """Largeur de l'original, lue une fois dans l'en-tête (0 si illisible)"""
+    width = _image_widths.get(filename)
+    if width is None:
+        try:
+            from PIL import Image
+            with Image.open(os.path.join(IMAGES_DIR, filename)) as image:
+                width, height = image.size
+                if image.getexif().get(0x0112) in (5, 6, 7, 8):  # rotation de 90° : largeur et hauteur échangées
+                    width = height
+        except Exception:
+            width = 0
+        _image_widths[filename] = width
+    return width
+
+def image_variant_pending(filename, requested_width):
+    """La taille couvrant requested_width sera-t-elle générée ? (faux si l'original est plus étroit)"""
+    if not IMAGE_VARIANTS_AVAILABLE:
+        return False
+    covering = next((width for width in IMAGE_VARIANT_WIDTHS if width >= requested_width), None)
+    return covering is not None and covering < image_display_width(filename)
+
 def process_images_for_storage(image_data, serial_number):
     """
     Traiter les chemins d'images existants.
@@ -255,64 +639,47 @@ def find_tesseract():
     
     return None
 
+# Dépendances optionnelles : seule leur présence est vérifiée au démarrage,
+# les modules sont importés au premier usage (voir les handlers concernés).
+def module_available(name):
+    """Vérifier qu'un module est installé sans l'importer"""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
 # OCR avec Tesseract
-try:
-    import pytesseract
-    from PIL import Image
-    
-    tesseract_path = find_tesseract()
-    if tesseract_path:
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
-        OCR_AVAILABLE = True
-        print(f'[OCR] Tesseract configuré: {tesseract_path}')
-    else:
-        OCR_AVAILABLE = False
-        print('[OCR] Tesseract non trouvé. Définissez TESSERACT_PATH ou installez Tesseract.')
-except ImportError:
-    OCR_AVAILABLE = False
+tesseract_path = find_tesseract()
+OCR_AVAILABLE = False
+if not (module_available('pytesseract') and module_available('PIL')):
     print('[OCR] pytesseract non installé - pip install pytesseract Pillow')
+elif tesseract_path:
+    OCR_AVAILABLE = True
+    print(f'[OCR] Tesseract configuré: {tesseract_path}')
+else:
+    print('[OCR] Tesseract non trouvé. Définissez TESSERACT_PATH ou installez Tesseract.')
+
+def load_pytesseract():
+    """Importer pytesseract et le configurer avec le binaire Tesseract trouvé"""
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract_path
+    return pytesseract
 
 # Génération DOCX
-try:
-    from docx import Document
-    from docx.shared import Pt, Inches
-    DOCX_AVAILABLE = True
-    print('[DOCX] python-docx disponible')
-except ImportError:
-    DOCX_AVAILABLE = False
-    print('[DOCX] python-docx non installé - pip install python-docx')
+DOCX_AVAILABLE = module_available('docx')
+print('[DOCX] python-docx disponible' if DOCX_AVAILABLE else '[DOCX] python-docx non installé - pip install python-docx')
 
 # Génération PDF (modèle caution location)
-try:
-    from reportlab.lib.pagesizes import A4
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib.units import cm
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib import colors
-    from reportlab.pdfgen import canvas
-    PDF_AVAILABLE = True
-    print('[PDF] reportlab disponible')
-except ImportError:
-    PDF_AVAILABLE = False
-    print('[PDF] reportlab non installé - pip install reportlab')
+PDF_AVAILABLE = module_available('reportlab')
+print('[PDF] reportlab disponible' if PDF_AVAILABLE else '[PDF] reportlab non installé - pip install reportlab')
 
 # PyPDF2 pour fusionner avec le modèle
-try:
-    from PyPDF2 import PdfReader, PdfWriter
-    PYPDF2_AVAILABLE = True
-    print('[PDF] PyPDF2 disponible')
-except ImportError:
-    PYPDF2_AVAILABLE = False
-    print('[PDF] PyPDF2 non installé - pip install PyPDF2')
+PYPDF2_AVAILABLE = module_available('PyPDF2')
+print('[PDF] PyPDF2 disponible' if PYPDF2_AVAILABLE else '[PDF] PyPDF2 non installé - pip install PyPDF2')
 
 # FPDF pour génération simple de PDF
-try:
-    from fpdf import FPDF
-    FPDF_AVAILABLE = True
-    print('[PDF] fpdf disponible')
-except ImportError:
-    FPDF_AVAILABLE = False
-    print('[PDF] fpdf non installé - pip install fpdf')
+FPDF_AVAILABLE = module_available('fpdf')
+print('[PDF] fpdf disponible' if FPDF_AVAILABLE else '[PDF] fpdf non installé - pip install fpdf')
 
 app = Flask(__name__, static_folder='.')
 
@@ -320,14 +687,259 @@ app = Flask(__name__, static_folder='.')
 # Augmenter la limite de taille de requête pour les données POST
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16 MB
 
+# ==================== MÉTRIQUES (Prometheus) ====================
+# Registre en mémoire exposé au format texte Prometheus sur /api/metrics.
+# Compteurs et histogrammes sont mis à jour par les hooks de requête et autour des
+# appels externes ; les jauges sont calculées à la lecture. En mode multi-worker,
+# chaque worker écrit un instantané <pid>.json dans METRICS_DIR (toutes les
+# METRICS_FLUSH_SECONDS et à chaque lecture) : compteurs et histogrammes sont
+# additionnés sur tous les workers, y compris ceux déjà arrêtés (les compteurs ne
+# reculent pas), et les jauges des workers vivants sont exposées avec un label pid.
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')  # si défini : Authorization: Bearer <token>
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_DIR = os.environ.get('METRICS_DIR', os.path.join(SCRIPT_DIR, 'data', 'metrics'))
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', 5))
+
+_metrics_lock = threading.Lock()
+_metric_definitions = {}  # nom -> (type, aide, buckets)
+_metric_values = {}  # (nom, labels triés) -> valeur (compteur) ou [compteurs par bucket..., somme, total]
+_metric_gauges = {}  # nom -> (aide, fonction retournant une valeur ou [(labels, valeur), ...])
+_inflight_tasks = {}  # tâche -> nombre en cours (OCR, Whisper...)
+
+def define_metric(name, metric_type, help_text, buckets=METRICS_LATENCY_BUCKETS):
+    """Déclarer un compteur ou un histogramme"""
+    _metric_definitions[name] = (metric_type, help_text, buckets)
+
+def define_gauge(name, help_text, read):
+    """Déclarer une jauge calculée à chaque lecture de /api/metrics"""
+    _metric_gauges[name] = (help_text, read)
+
+def metric_inc(name, labels=None, value=1):
+    """Incrémenter un compteur"""
+    key = (name, tuple(sorted((labels or {}).items())))
+    with _metrics_lock:
+        _metric_values[key] = _metric_values.get(key, 0) + value
+
+def metric_observe(name, value, labels=None):
+    """Ajouter une observation à un histogramme"""
+    buckets = _metric_definitions[name][2]
+    key = (name, tuple(sorted((labels or {}).items())))
+    with _metrics_lock:
+        series = _metric_values.get(key)
+        if series is None:
+            series = _metric_values[key] = [0] * (len(buckets) + 2)
+        for index, bound in enumerate(buckets):
+            if value <= bound:
+                series[index] += 1
+                break
+        series[-2] += value
+        series[-1] += 1
+
+@contextmanager
+def track_inflight(task):
+    """Compter une tâche lourde en cours (jauge inventory_inflight_tasks)"""
+    with _metrics_lock:
+        _inflight_tasks[task] = _inflight_tasks.get(task, 0) + 1
+    try:
+        yield
+    finally:
+        with _metrics_lock:
+            _inflight_tasks[task] -= 1
+
+@contextmanager
+def time_external_call(service):
+    """Chronométrer un appel à un service externe (outcome=error si exception)"""
+    started = time.perf_counter()
+    outcome = 'error'
+    try:
+        yield
+        outcome = 'ok'
+    finally:
+        metric_observe('inventory_external_call_duration_seconds', time.perf_counter() - started,
+                       {'service': service, 'outcome': outcome})
+
+def external_request(service, method, url, **kwargs):
+    """requests.request chronométré, avec compteur des statuts HTTP par service"""
+    with time_external_call(service):
+        response = requests.request(method, url, **kwargs)
+    metric_inc('inventory_external_call_responses_total', {'service': service, 'status': str(response.status_code)})
+    return response
+
+def _format_metric_labels(labels):
+    """Labels Prometheus {k="v",...} (valeurs échappées)"""
+    if not labels:
+        return ''
+    escaped = []
+    for key, value in labels:
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        escaped.append(f'{key}="{value}"')
+    return '{' + ','.join(escaped) + '}'
+
+def metrics_shared():
+    """Worker lancé par le superviseur multi-worker : métriques partagées via METRICS_DIR"""
+    return bool(os.environ.get(SUPERVISOR_BOOT_ENV))
+
+def _read_metric_gauges():
+    """Lire toutes les jauges : nom -> [(labels triés, valeur), ...]"""
+    gauges = {}
+    for name, (help_text, read) in _metric_gauges.items():
+        try:
+            result = read()
+        except Exception as e:
+            safe_print(f'[METRICS] Erreur jauge {name}: {sanitize_error(e)}')
+            continue
+        gauges[name] = [(tuple(sorted(labels.items())), value)
+                        for labels, value in (result if isinstance(result, list) else [({}, result)])]
+    return gauges
+
+def _local_metric_snapshot():
+    """Copie des compteurs/histogrammes du processus et lecture de ses jauges"""
+    with _metrics_lock:
+        values = {key: (list(v) if isinstance(v, list) else v) for key, v in _metric_values.items()}
+    return values, _read_metric_gauges()
+
+def write_metrics_snapshot():
+    """Écrire l'instantané du processus dans METRICS_DIR/<pid>.json (remplacement atomique)"""
+    values, gauges = _local_metric_snapshot()
+    snapshot = {
+        'values': [[name, [list(label) for label in labels], value] for (name, labels), value in values.items()],
+        'gauges': {name: [[[list(label) for label in labels], value] for labels, value in series]
+                   for name, series in gauges.items()}
+    }
+    path = os.path.join(METRICS_DIR, f'{os.getpid()}.json')
+    temp_path = f'{path}.tmp'
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(snapshot, f, default=str)
+    os.replace(temp_path, path)
+    return values, gauges
+
+def _shared_metric_snapshot():
+    """Agréger les instantanés de tous les workers (celui du processus courant est rafraîchi)"""
+    own_values, own_gauges = write_metrics_snapshot()
+    values = {}
+    gauges = {}
+    fresh_after = time.time() - 3 * METRICS_FLUSH_SECONDS
+    own_file = f'{os.getpid()}.json'
+    for filename in sorted(os.listdir(METRICS_DIR)):
+        if not filename.endswith('.json'):
+            continue
+        if filename == own_file:
+            worker_values, worker_gauges, fresh = own_values, own_gauges, True
+        else:
+            path = os.path.join(METRICS_DIR, filename)
+            try:
+                fresh = os.path.getmtime(path) >= fresh_after
+                with open(path, encoding='utf-8') as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError) as e:
+                safe_print(f'[METRICS] Instantané illisible {filename}: {sanitize_error(e)}')
+                continue
+            worker_values = {(name, tuple(tuple(label) for label in labels)): value
+                             for name, labels, value in snapshot.get('values', [])}
+            worker_gauges = {name: [(tuple(tuple(label) for label in labels), value) for labels, value in series]
+                             for name, series in snapshot.get('gauges', {}).items()}
+        for key, value in worker_values.items():
+            if key[0] not in _metric_definitions:
+                continue
+            total = values.get(key)
+            if total is None:
+                values[key] = list(value) if isinstance(value, list) else value
+            elif isinstance(total, list):
+                values[key] = [a + b for a, b in zip(total, value)]
+            else:
+                values[key] = total + value
+        # Jauges : valeurs instantanées, seulement pour les workers encore actifs
+        if not fresh:
+            continue
+        pid = filename[:-len('.json')]
+        for name, series in worker_gauges.items():
+            for labels, value in series:
+                if 'pid' not in dict(labels):
+                    labels = tuple(sorted(labels + (('pid', pid),)))
+                gauges.setdefault(name, []).append((labels, value))
+    return values, gauges
+
+def render_metrics():
+    """Exposition au format texte Prometheus (version 0.0.4)"""
+    if metrics_shared():
+        values, gauges = _shared_metric_snapshot()
+    else:
+        values, gauges = _local_metric_snapshot()
+    series_by_name = {}
+    for (name, labels), value in values.items():
+        series_by_name.setdefault(name, []).append((labels, value))
+    lines = []
+    for name, (metric_type, help_text, buckets) in _metric_definitions.items():
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {metric_type}')
+        for labels, value in sorted(series_by_name.get(name, [])):
+            if metric_type == 'histogram':
+                cumulative = 0
+                for bound, count in zip(buckets, value):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{_format_metric_labels(labels + (("le", repr(bound)),))} {cumulative}')
+                lines.append(f'{name}_bucket{_format_metric_labels(labels + (("le", "+Inf"),))} {value[-1]}')
+                lines.append(f'{name}_sum{_format_metric_labels(labels)} {value[-2]:.6f}')
+                lines.append(f'{name}_count{_format_metric_labels(labels)} {value[-1]}')
+            else:
+                lines.append(f'{name}{_format_metric_labels(labels)} {value}')
+    for name, (help_text, _) in _metric_gauges.items():
+        if name not in gauges:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} gauge')
+        for labels, value in sorted(gauges[name], key=lambda series: series[0]):
+            lines.append(f'{name}{_format_metric_labels(labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+def _metrics_flush_loop():
+    """Écrire l'instantané du worker toutes les METRICS_FLUSH_SECONDS"""
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        try:
+            write_metrics_snapshot()
+        except Exception as e:
+            safe_print(f'[METRICS] Erreur écriture instantané: {sanitize_error(e)}')
+
+def start_metrics_flusher():
+    """Démarrer l'écriture périodique des métriques du worker (mode multi-worker uniquement)"""
+    if not metrics_shared():
+        return
+    threading.Thread(target=_metrics_flush_loop, name='metrics-flush', daemon=True).start()
+    atexit.register(write_metrics_snapshot)
+
+def reset_metrics_dir():
+    """Supprimer les instantanés d'un lancement précédent (superviseur, avant les workers)"""
+    if not os.path.isdir(METRICS_DIR):
+        return
+    for filename in os.listdir(METRICS_DIR):
+        if filename.endswith(('.json', '.tmp')):
+            try:
+                os.remove(os.path.join(METRICS_DIR, filename))
+            except OSError as e:
+                safe_print(f'[METRICS] Impossible de supprimer {filename}: {sanitize_error(e)}')
+
+define_metric('inventory_http_requests_total', 'counter', 'Requêtes HTTP par méthode, route et statut')
+define_metric('inventory_http_request_duration_seconds', 'histogram', 'Durée des requêtes HTTP par méthode et route')
+define_metric('inventory_external_call_duration_seconds', 'histogram', 'Durée des appels aux services externes')
+define_metric('inventory_external_call_responses_total', 'counter', 'Réponses des services externes par statut HTTP')
+define_metric('inventory_cache_requests_total', 'counter', 'Accès aux caches en mémoire (hit/miss)')
+define_metric('inventory_db_connections_total', 'counter', 'Connexions SQLite ouvertes (get_db)')
+define_metric('inventory_sse_events_total', 'counter', 'Événements SSE ajoutés au tampon par type')
+define_metric('inventory_image_uploads_total', 'counter', 'Images uploadées (stored : nouveau contenu, deduplicated : déjà présent)')
+
 # ==================== LOGS ERREURS (terminal) ====================
-def _log(level, msg, exc=None):
-    """Afficher un log avec horodatage dans le terminal (sécurisé Windows)."""
+def _log(level, msg, exc=None, **fields):
+    """Journaliser un log horodaté [level] (avec le traceback de exc si fourni)."""
     try:
-        ts = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        line = f"[{ts}] [{level}] {msg}"
-        safe_print(line)
-    except:
+        log_level = logging.ERROR if level == 'ERREUR' else logging.INFO
+        exc_info = (type(exc), exc, exc.__traceback__) if isinstance(exc, BaseException) and exc.__traceback__ else None
+        extra = {'tag': level}
+        if fields:
+            extra['fields'] = fields
+        logger.log(log_level, str(msg), exc_info=exc_info, extra=extra)
+    except Exception:
         pass  # Ignorer silencieusement les erreurs de log
 
 # Gestionnaire d'erreur pour les URLs trop longues (414)
@@ -352,54 +964,529 @@ def handle_exception(error):
     _log('ERREUR', f'Exception: {sanitize_error(error)}', error)
     return jsonify({'success': False, 'error': sanitize_error(error)}), 500
 
+REQUEST_ID_PATTERN = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
 @app.before_request
 def log_request():
-    """Log chaque requête API dans le terminal pour le debug."""
-    if request.path.startswith('/api'):
-        _log('API', f"{request.method} {request.path}")
+    """Attribuer un id à la requête (X-Request-Id fourni par le proxy, sinon généré)."""
+    global FIRST_REQUEST_SECONDS
+    if FIRST_REQUEST_SECONDS is None:
+        FIRST_REQUEST_SECONDS = time.perf_counter() - BOOT_STARTED_AT
+    incoming = request.headers.get('X-Request-Id', '')
+    g.request_id = incoming if REQUEST_ID_PATTERN.match(incoming) else secrets.token_hex(8)
+    g.request_started = time.perf_counter()
+
+def should_log_request(method, route, status):
+    """Échantillonnage des logs de requêtes (erreurs toujours journalisées)"""
+    if status >= 400:
+        return True
+    rate = LOG_SAMPLING.get(f'{method} {route}', LOG_SAMPLING.get(route, LOG_REQUEST_SAMPLE_RATE))
+    return rate >= 1 or (rate > 0 and random.random() < rate)
+
+@app.after_request
+def record_request_metrics(response):
+    """Latence et statut par route (route Flask, pas le chemin : cardinalité bornée)"""
+    started = g.get('request_started')
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else '<unmatched>'
+        metric_observe('inventory_http_request_duration_seconds', time.perf_counter() - started,
+                       {'method': request.method, 'route': route})
+        metric_inc('inventory_http_requests_total',
+                   {'method': request.method, 'route': route, 'status': str(response.status_code)})
+    return response
+
+@app.after_request
+def log_response(response):
+    """Journaliser chaque requête API (méthode, route, statut, durée) et renvoyer son id."""
+    if not request.path.startswith('/api'):
+        return response
+    request_id = getattr(g, 'request_id', None)
+    if request_id:
+        response.headers['X-Request-Id'] = request_id
+    route = request.url_rule.rule if request.url_rule else request.path
+    if should_log_request(request.method, route, response.status_code):
+        duration_ms = round((time.perf_counter() - g.get('request_started', time.perf_counter())) * 1000, 1)
+        level = logging.ERROR if response.status_code >= 500 else logging.WARNING if response.status_code >= 400 else logging.INFO
+        db_ms = round(g.get('db_seconds', 0.0) * 1000, 1)
+        logger.log(level, f"{request.method} {request.path} {response.status_code} ({duration_ms} ms, SQL {db_ms} ms)", extra={
+            'tag': 'API',
+            'fields': {'method': request.method, 'path': request.path, 'route': route,
+                       'status': response.status_code, 'durationMs': duration_ms,
+                       'dbMs': db_ms, 'dbStatements': g.get('db_statements', 0)}
+        })
+    return response
 
 # Configuration CORS sécurisée
 CORS(app, 
      resources={r"/api/*": {
          "origins": CORS_ORIGINS_LIST,
          "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-         "allow_headers": ["Content-Type", "Authorization"],
-         "expose_headers": ["Content-Type"],
+         "allow_headers": ["Content-Type", "Authorization", "If-Match", "X-Client-Id", "Last-Event-ID", "X-Request-Id", "X-Profile"],
+         "expose_headers": ["Content-Type", "ETag", "X-Request-Id", "X-Profile-Id"],
          "max_age": 3600
      }},
      supports_credentials=True if APP_MODE == 'production' else False)
 
 # Système de broadcast pour Server-Sent Events
-clients = []
-clients_lock = threading.Lock()
+# Chaque événement reçoit un numéro de séquence et rejoint un tampon circulaire partagé ;
+# chaque client lit le tampon à son rythme depuis son dernier id (pas de file par client).
+SSE_BUFFER_SIZE = int(os.environ.get('SSE_BUFFER_SIZE', 1000))
+SSE_KEEPALIVE_SECONDS = 30
+SSE_RETRY_MS = 3000
+
+# Identifiant de ce flux : un Last-Event-ID d'un autre processus/démarrage impose une resynchronisation
+SSE_STREAM_ID = secrets.token_hex(4)
+_event_buffer = deque(maxlen=SSE_BUFFER_SIZE)  # (seq, type, données, ids d'items, message SSE formaté)
+_event_seq = 0
+_event_lock = threading.Lock()
+# Un événement de réveil par ensemble de types suivis (None = tous) : un client abonné
+# aux locations n'est pas réveillé par les événements items
+_event_wakeups = {None: threading.Event()}
+sse_client_count = 0
+
+# Abonnements par sujet : /api/events?topics=rentals,notifications&itemIds=12,15
+SSE_TOPICS = {
+    'items': 'items_changed',
+    'rentals': 'rentals_changed',
+    'categories': 'categories_changed',
+    'custom_fields': 'custom_fields_changed',
+    'notifications': 'notifications_changed'
+}
+SSE_MAX_ITEM_FILTERS = 500
+
+def parse_sse_subscription(topics_value, item_ids_value):
+    """Lire l'abonnement d'un client : (types d'événements ou None, ids d'items ou None)
+    
+    Lève ValueError si un sujet ou un id est invalide.
+    """
+    event_types = None
+    if topics_value:
+        names = [t.strip() for t in topics_value.split(',') if t.strip()]
+        unknown = [name for name in names if name not in SSE_TOPICS]
+        if unknown:
+            raise ValueError(f"Sujet(s) inconnu(s): {', '.join(unknown)} (valides: {', '.join(SSE_TOPICS)})")
+        event_types = frozenset(SSE_TOPICS[name] for name in names) or None
+    item_ids = None
+    if item_ids_value:
+        try:
+            item_ids = frozenset(int(v) for v in item_ids_value.split(',') if v.strip())
+        except ValueError:
+            raise ValueError('itemIds doit être une liste d\'entiers séparés par des virgules')
+        if len(item_ids) > SSE_MAX_ITEM_FILTERS:
+            raise ValueError(f'itemIds: {SSE_MAX_ITEM_FILTERS} ids maximum')
+        item_ids = item_ids or None
+    return event_types, item_ids
+
+def event_item_ids(event_type, data):
+    """Ids d'items concernés par un événement (None = concerne tous les items)"""
+    if event_type != 'items_changed' or not isinstance(data, dict) or data.get('reload'):
+        return None
+    ids = [item.get('id') for item in data.get('items', [])]
+    ids.extend(entry.get('id') for entry in data.get('deleted', []))
+    if 'items' not in data or None in ids:
+        return None
+    return frozenset(ids)
+
+def filter_event(subscription, entry):
+    """Message à envoyer à un abonné pour une entrée du tampon (None = non concerné)"""
+    seq, event_type, data, item_ids, message = entry
+    event_types, watched_items = subscription
+    if event_types is not None and event_type not in event_types:
+        return None
+    if watched_items is None or item_ids is None:
+        return message
+    matched = item_ids & watched_items
+    if not matched:
+        return None
+    if matched == item_ids:
+        return message
+    # Ne garder que les items suivis (même id d'événement : la reprise reste valable)
+    trimmed = dict(data)
+    trimmed['items'] = [item for item in data['items'] if item.get('id') in watched_items]
+    trimmed['deleted'] = [deleted for deleted in data.get('deleted', []) if deleted.get('id') in watched_items]
+    return format_sse_message(event_type, trimmed, f'{SSE_STREAM_ID}-{seq}')
+
+def format_sse_message(event_type, data, event_id=None):
+    """Formater un message SSE (id, nom d'événement, données JSON)"""
+    payload = json.dumps({'type': event_type, 'data': data})
+    id_line = f'id: {event_id}\n' if event_id else ''
+    return f"{id_line}event: {event_type}\ndata: {payload}\n\n"
+
+def emit_event(event_type, data):
+    """Publier un événement sur le bus (local, ou partagé entre les workers de l'hôte)"""
+    event_bus.publish(event_type, data)
+
+def append_event(event_type, data, seq=None):
+    """Écrire un événement dans le tampon SSE (temps constant, quel que soit le nombre de clients)
+    
+    seq est fourni par un bus partagé (ordre global) ; sinon la séquence locale est incrémentée.
+    """
+    global _event_seq
+    item_ids = event_item_ids(event_type, data)
+    wakeups = []
+    with _event_lock:
+        _event_seq = _event_seq + 1 if seq is None else seq
+        seq = _event_seq
+        message = format_sse_message(event_type, data, f'{SSE_STREAM_ID}-{seq}')
+        _event_buffer.append((seq, event_type, data, item_ids, message))
+        # Seuls les abonnements qui suivent ce type sont réveillés
+        for key in list(_event_wakeups):
+            if key is None or event_type in key:
+                wakeups.append(_event_wakeups[key])
+                _event_wakeups[key] = threading.Event()
+    # Réveiller les clients en attente hors du verrou (threads WSGI et boucles asyncio)
+    for wakeup in wakeups:
+        wakeup.set()
+    notify_async_waiters(event_type)
+    metric_inc('inventory_sse_events_total', {'type': event_type})
+    if sse_client_count > 0:
+        safe_print(f'[SSE] Event {event_type} #{seq} -> {sse_client_count} client(s)')
+
+# Regroupement des événements : les appels à broadcast_event d'une même fenêtre
+# (SSE_COALESCE_MS) sont fusionnés par type, et les payloads items/notifications
+# embarquent les objets modifiés pour que les clients patchent leur état local.
+SSE_COALESCE_MS = int(os.environ.get('SSE_COALESCE_MS', 100))  # 0 = pas de regroupement
+_pending_events = {}  # event_type -> [data, ...] (ordre de première apparition)
+_pending_lock = threading.Lock()
+_pending_timer = None
+_flush_lock = threading.Lock()  # une seule fusion à la fois (ordre des diffusions, repère des notifications)
+_notification_watermark = None  # dernier id de notification déjà diffusé (initialisé par init_db)
 
 def broadcast_event(event_type, data):
-    """Diffuser un événement à tous les clients connectés"""
-    message = f"data: {json.dumps({'type': event_type, 'data': data})}\n\n"
+    """Diffuser un événement à tous les clients connectés (regroupé sur une courte fenêtre)"""
+    global _pending_timer
+    if SSE_COALESCE_MS <= 0:
+        emit_event(event_type, merge_events(event_type, [data]))
+        return
+    with _pending_lock:
+        _pending_events.setdefault(event_type, []).append(data)
+        if _pending_timer is None:
+            _pending_timer = threading.Timer(SSE_COALESCE_MS / 1000, flush_pending_events)
+            _pending_timer.daemon = True
+            _pending_timer.start()
+
+def flush_pending_events():
+    """Fusionner et diffuser les événements accumulés pendant la fenêtre"""
+    global _pending_events, _pending_timer
+    with _flush_lock:
+        with _pending_lock:
+            pending, _pending_events = _pending_events, {}
+            _pending_timer = None
+        for event_type, events in pending.items():
+            try:
+                emit_event(event_type, merge_events(event_type, events))
+            except Exception as e:
+                safe_print(f'[SSE] Erreur regroupement {event_type}: {sanitize_error(e)}')
+                emit_event(event_type, {'action': 'batch', 'reload': True})
+
+def merge_events(event_type, events):
+    """Construire le payload fusionné d'un type d'événement"""
+    if event_type == 'items_changed':
+        return merge_item_events(events)
+    if event_type == 'notifications_changed':
+        return merge_notification_events(events)
+    if len(events) == 1:
+        return events[0]
+    return {'action': 'batch', 'events': events}
+
+def _base_payload(events):
+    """Payload commun : données d'origine si un seul événement, sinon action 'batch'"""
+    actions = list(dict.fromkeys(data.get('action') for data in events if data.get('action')))
+    payload = dict(events[0]) if len(events) == 1 else {'action': actions[0] if len(actions) == 1 else 'batch'}
+    payload['actions'] = actions
+    payload['count'] = len(events)
+    return payload
+
+def merge_item_events(events):
+    """Fusionner des items_changed : objets items à jour + items supprimés (reload si non exprimable)"""
+    payload = _base_payload(events)
+    ids, serials, deleted = set(), set(), []
+    reload = False
+    for data in events:
+        action = data.get('action')
+        if action == 'deleted':
+            deleted.append({'id': data.get('id'), 'serialNumber': data.get('serialNumber')})
+        elif action == 'bulk_deleted':
+            deleted.extend({'id': item_id, 'serialNumber': None} for item_id in data.get('ids', []))
+        elif data.get('ids'):
+            ids.update(data['ids'])
+        elif data.get('id') or data.get('itemId'):
+            ids.add(data.get('id') or data.get('itemId'))
+        elif data.get('serialNumber'):
+            serials.add(data['serialNumber'])
+        else:
+            # all_deleted, hierarchy_reordered, category_deleted, locations... : rechargement complet
+            reload = True
     
+    items = []
+    if not reload and (ids or serials):
+        conn = get_db()
+        try:
+            cursor = conn.cursor()
+            for chunk in chunked(sorted(ids), SQL_IN_CHUNK_SIZE):
+                cursor.execute(f'SELECT * FROM items WHERE id IN ({",".join("?" * len(chunk))})', chunk)
+                items.extend(format_item(dict(row)) for row in cursor.fetchall())
+            for chunk in chunked(sorted(serials), SQL_IN_CHUNK_SIZE):
+                cursor.execute(f'SELECT * FROM items WHERE serial_number IN ({",".join("?" * len(chunk))})', chunk)
+                items.extend(format_item(dict(row)) for row in cursor.fetchall() if row['id'] not in ids)
+        finally:
+            conn.close()
     
-    with clients_lock:
-        client_count = len(clients)
-        
-        disconnected_clients = []
-        for client_queue in clients:
+    payload['items'] = items
+    payload['deleted'] = deleted
+    payload['reload'] = reload
+    return payload
+
+def merge_notification_events(events):
+    """Fusionner des notifications_changed : nouvelles notifications + suppressions"""
+    global _notification_watermark
+    payload = _base_payload(events)
+    deleted = []
+    cleared = False
+    created = False
+    for data in events:
+        action = data.get('action', 'created')
+        if action == 'deleted':
+            deleted.append(data.get('id'))
+        elif action == 'cleared':
+            cleared = True
+            deleted = []
+        else:
+            created = True
+    
+    notifications = []
+    if created and _notification_watermark is not None:
+        conn = get_db()
+        try:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, message, type, item_serial_number, item_hex_id, created_at,
+                       event_type, item_id, field_name, old_value, new_value
+                FROM notifications
+                WHERE id > ?
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (_notification_watermark, NOTIFICATIONS_MAX_LIMIT))
+            notifications = [format_notification_row(row) for row in cursor.fetchall()]
+        finally:
+            conn.close()
+        if notifications:
+            _notification_watermark = max(_notification_watermark, notifications[0]['id'])
+    
+    payload['notifications'] = notifications
+    payload['deleted'] = deleted
+    payload['cleared'] = cleared
+    # Sans repère initial, le client doit recharger la liste
+    payload['reload'] = created and _notification_watermark is None
+    return payload
+
+def parse_last_event_id(value):
+    """Extraire la séquence d'un Last-Event-ID de ce flux (None si absent, -1 si inutilisable)"""
+    if not value:
+        return None
+    stream_id, _, seq = value.strip().rpartition('-')
+    if stream_id != SSE_STREAM_ID or not seq.isdigit():
+        return -1
+    return int(seq)
+
+SSE_MAX_CONNECTIONS = int(os.environ.get('SSE_MAX_CONNECTIONS', 5000))
+
+def acquire_sse_slot():
+    """Réserver une connexion SSE : séquence courante, ou None si SSE_MAX_CONNECTIONS est atteint"""
+    global sse_client_count
+    with _event_lock:
+        if sse_client_count >= SSE_MAX_CONNECTIONS:
+            return None
+        sse_client_count += 1
+        return _event_seq
+
+def release_sse_slot():
+    """Libérer une connexion SSE et retourner le nombre restant"""
+    global sse_client_count
+    with _event_lock:
+        sse_client_count -= 1
+        return sse_client_count
+
+def sse_stream_start(requested_seq, current_seq):
+    """Position de départ d'un flux et messages d'ouverture (connexion, resynchronisation éventuelle)"""
+    prelude = f"retry: {SSE_RETRY_MS}\n" + format_sse_message('connected', {'streamId': SSE_STREAM_ID}, f'{SSE_STREAM_ID}-{current_seq}')
+    if requested_seq is None:
+        return current_seq, prelude
+    if requested_seq < 0 or requested_seq > current_seq:
+        # Last-Event-ID d'un autre démarrage du serveur
+        return current_seq, prelude + format_sse_message('resync', {'reason': 'unknown_last_event_id'})
+    return requested_seq, prelude
+
+def read_events_since(last_seq, subscription=(None, None)):
+    """Lire les messages postérieurs à last_seq : (messages, dernière séquence, événement de réveil, trou)
+    
+    Le filtrage par abonnement se fait ici, à la lecture : le tampon reste unique et
+    la dernière séquence avance même si aucun message ne concerne le client.
+    """
+    event_types = subscription[0]
+    with _event_lock:
+        wakeup = _event_wakeups.get(event_types)
+        if wakeup is None:
+            wakeup = _event_wakeups[event_types] = threading.Event()
+        current_seq = _event_seq
+        if last_seq >= current_seq:
+            return [], current_seq, wakeup, False
+        first_seq = _event_buffer[0][0] if _event_buffer else current_seq + 1
+        # Des événements sont sortis du tampon : le client doit tout recharger
+        gap = last_seq < first_seq - 1
+        # Compter depuis la fin (exact si les séquences sont contiguës, filtré sinon)
+        start = max(0, len(_event_buffer) - (current_seq - last_seq))
+        entries = [entry for entry in islice(_event_buffer, start, None) if entry[0] > last_seq]
+    if subscription == (None, None):
+        messages = [entry[4] for entry in entries]
+    else:
+        messages = [message for message in (filter_event(subscription, entry) for entry in entries) if message]
+    return messages, current_seq, wakeup, gap
+
+def sse_keepalive(last_seq, sent_seq):
+    """Keepalive ; pour un abonné filtré, un bloc « id: » seul fait avancer son Last-Event-ID
+    sans déclencher d'événement (reprise sans resync après des événements non suivis)"""
+    if last_seq != sent_seq:
+        return f'id: {SSE_STREAM_ID}-{last_seq}\n\n'
+    return ': keepalive\n\n'
+
+# ==================== BUS D'ÉVÉNEMENTS ====================
+# EVENT_BUS=local : un seul processus, la séquence est locale.
+# EVENT_BUS=sqlite : les workers d'un même hôte publient dans une table SQLite (WAL)
+# dont la clé AUTOINCREMENT fixe l'ordre global ; chaque worker relit la table et
+# alimente son tampon SSE dans cet ordre, avec les mêmes ids (Last-Event-ID valable
+# quel que soit le worker).
+EVENT_BUS = os.environ.get('EVENT_BUS', 'local').lower()
+EVENT_BUS_PATH = os.environ.get('EVENT_BUS_PATH', os.path.join(SCRIPT_DIR, 'data', 'events.db'))
+EVENT_BUS_POLL_MS = int(os.environ.get('EVENT_BUS_POLL_MS', 50))
+
+class LocalEventBus:
+    """Bus en mémoire : diffusion aux seuls clients de ce processus"""
+    name = 'local'
+
+    def start(self):
+        pass
+
+    def publish(self, event_type, data):
+        append_event(event_type, data)
+
+class SQLiteEventBus:
+    """Bus partagé entre processus via une table SQLite (ordre global = clé AUTOINCREMENT)"""
+    name = 'sqlite'
+
+    def __init__(self, path, poll_interval):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._last_seq = 0
+        self._poke = threading.Event()
+        self._started = False
+        self._start_lock = threading.Lock()
+        self._local = threading.local()
+
+    def _connection(self):
+        """Connexion SQLite par thread (réutilisée, WAL pour lectures/écritures concurrentes)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        """Créer la table, reprendre le flux commun et lancer la lecture (une seule fois)"""
+        global SSE_STREAM_ID
+        with self._start_lock:
+            if self._started:
+                return
+            conn = self._connection()
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS sse_events (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    event_type TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('CREATE TABLE IF NOT EXISTS sse_meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)')
+            conn.execute("INSERT OR IGNORE INTO sse_meta (key, value) VALUES ('stream_id', ?)", (secrets.token_hex(4),))
+            conn.commit()
+            # Même identifiant de flux pour tous les workers
+            SSE_STREAM_ID = conn.execute("SELECT value FROM sse_meta WHERE key = 'stream_id'").fetchone()[0]
+            # Précharger la fin du journal pour pouvoir rejouer dès le démarrage
+            row = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM sse_events').fetchone()
+            self._last_seq = max(0, row[0] - SSE_BUFFER_SIZE)
+            self._read_new_events()
+            self._started = True
+        threading.Thread(target=self._poll_loop, name='event-bus', daemon=True).start()
+        safe_print(f'[SSE] Bus SQLite partagé: {self.path} (flux {SSE_STREAM_ID})')
+
+    def publish(self, event_type, data):
+        if not self._started:
+            self.start()
+        conn = self._connection()
+        conn.execute(
+            'INSERT INTO sse_events (event_type, payload, created_at) VALUES (?, ?, ?)',
+            (event_type, json.dumps(data), datetime.now().isoformat())
+        )
+        conn.commit()
+        # Relire tout de suite pour les clients de ce worker
+        self._poke.set()
+
+    def _read_new_events(self):
+        """Ajouter au tampon local les événements publiés depuis la dernière lecture (dans l'ordre)"""
+        rows = self._connection().execute(
+            'SELECT seq, event_type, payload FROM sse_events WHERE seq > ? ORDER BY seq LIMIT 1000',
+            (self._last_seq,)
+        ).fetchall()
+        for seq, event_type, payload in rows:
+            data = json.loads(payload)
+            append_event(event_type, data, seq=seq)
+            sync_worker_state(event_type, data)
+            self._last_seq = seq
+        return len(rows)
+
+    def _prune(self):
+        """Ne garder dans la table que ce que les tampons peuvent rejouer"""
+        conn = self._connection()
+        conn.execute('DELETE FROM sse_events WHERE seq <= ?', (self._last_seq - SSE_BUFFER_SIZE * 2,))
+        conn.commit()
+
+    def _poll_loop(self):
+        last_prune = time.monotonic()
+        while True:
+            self._poke.wait(self.poll_interval)
+            self._poke.clear()
             try:
-                client_queue.put_nowait(message)
-            except queue.Full:
-                # Queue pleine, ignorer
-                pass
-            except:
-                # Client déconnecté, le marquer pour suppression
-                disconnected_clients.append(client_queue)
-        
-        # Retirer les clients déconnectés
-        for client_queue in disconnected_clients:
-            if client_queue in clients:
-                clients.remove(client_queue)
-        
-        success_count = client_count - len(disconnected_clients)
-        if success_count > 0:
-            safe_print(f'[SSE] Event {event_type} -> {success_count} client(s)')
+                while self._read_new_events() == 1000:
+                    pass
+                if time.monotonic() - last_prune > 60:
+                    self._prune()
+                    last_prune = time.monotonic()
+            except Exception as e:
+                safe_print(f'[SSE] Erreur lecture bus: {sanitize_error(e)}')
+
+def sync_worker_state(event_type, data):
+    """Mettre à jour l'état propre au processus après un événement publié par un autre worker"""
+    global _notification_watermark
+    if event_type == 'custom_fields_changed':
+        invalidate_custom_field_registry()
+    elif event_type == 'notifications_changed' and _notification_watermark is not None:
+        # Ne pas rediffuser les notifications déjà envoyées par un autre worker
+        ids = [n.get('id') for n in data.get('notifications', []) if n.get('id')]
+        if ids:
+            _notification_watermark = max(_notification_watermark, max(ids))
+
+def create_event_bus():
+    """Instancier le bus configuré par EVENT_BUS"""
+    if EVENT_BUS == 'sqlite':
+        return SQLiteEventBus(EVENT_BUS_PATH, EVENT_BUS_POLL_MS / 1000)
+    if EVENT_BUS != 'local':
+        safe_print(f'[SSE] EVENT_BUS inconnu ({EVENT_BUS}), bus local utilisé')
+    return LocalEventBus()
+
+event_bus = create_event_bus()
 
 # Configuration base de données (utiliser chemin absolu par défaut)
 DB_PATH = os.environ.get('DB_PATH', os.path.join(SCRIPT_DIR, 'data', 'inventory.db'))
@@ -451,9 +1538,9 @@ def sanitize_string(value, max_length=500):
         try:
             error_msg = str(e)
             error_msg = error_msg.encode('utf-8', errors='replace').decode('utf-8', errors='replace')
-            print(f'[ERREUR] Erreur lors de la sanitization: {error_msg}')
+            safe_print(f'[ERREUR] Erreur lors de la sanitization: {error_msg}')
         except:
-            print('[ERREUR] Erreur lors de la sanitization (encodage impossible)')
+            safe_print('[ERREUR] Erreur lors de la sanitization (encodage impossible)')
         return 'Message'
 
 def sanitize_error(error):
@@ -502,65 +1589,413 @@ def clean_existing_notifications():
         
         if updated_count > 0:
             conn.commit()
-            print(f'[DB] {updated_count} notification(s) nettoyée(s) pour éviter les problèmes d\'encodage')
+            safe_print(f'[DB] {updated_count} notification(s) nettoyée(s) pour éviter les problèmes d\'encodage')
         
         conn.close()
     except Exception as e:
-        print(f'[DB] Erreur lors du nettoyage des notifications: {str(e)}')
+        safe_print(f'[DB] Erreur lors du nettoyage des notifications: {str(e)}')
+
+def notification_value(value):
+    """Normaliser une valeur stockée dans une notification structurée (texte nettoyé ou None)"""
+    if value is None:
+        return None
+    if isinstance(value, (dict, list)):
+        value = json.dumps(value, ensure_ascii=False)
+    return sanitize_notification_message(str(value))
 
-def create_notification(message, type, item_serial_number, conn, cursor):
-    """Créer une notification dans la base de données (avec item_hex_id pour navigation)"""
+def create_notification(message, type, item_serial_number, conn, cursor,
+                        event=None, item_id=None, field=None, old_value=None, new_value=None):
+    """Créer une notification dans la base de données (avec item_hex_id pour navigation)
+    
+    Les champs structurés (event, item_id, field, old_value, new_value) sont nettoyés ici,
+    une seule fois à l'écriture : la lecture les renvoie tels quels.
+    """
     try:
-        # Récupérer l'ID hexadécimal de l'item pour le lien depuis la notification
+        # Récupérer l'ID et l'ID hexadécimal de l'item pour le lien depuis la notification
         item_hex_id = None
         if item_serial_number:
-            cursor.execute('SELECT hex_id FROM items WHERE serial_number = ?', (item_serial_number,))
+            cursor.execute('SELECT id, hex_id FROM items WHERE serial_number = ?', (item_serial_number,))
             row = cursor.fetchone()
-            if row and row['hex_id']:
-                item_hex_id = row['hex_id']
-            else:
-                # Backfill hex_id pour cet item
-                new_hex = generate_item_hex_id(cursor)
-                cursor.execute('UPDATE items SET hex_id = ? WHERE serial_number = ?', (new_hex, item_serial_number))
-                item_hex_id = new_hex
+            if row:
+                if item_id is None:
+                    item_id = row['id']
+                if row['hex_id']:
+                    item_hex_id = row['hex_id']
+                else:
+                    # Backfill hex_id pour cet item
+                    new_hex = generate_item_hex_id(cursor)
+                    cursor.execute('UPDATE items SET hex_id = ? WHERE id = ?', (new_hex, row['id']))
+                    item_hex_id = new_hex
         # Nettoyer le message pour éviter les problèmes d'encodage
         clean_message = sanitize_notification_message(message)
         now = datetime.now().isoformat()
         cursor.execute('''
-            INSERT INTO notifications (message, type, item_serial_number, item_hex_id, created_at)
-            VALUES (?, ?, ?, ?, ?)
+            INSERT INTO notifications (message, type, item_serial_number, item_hex_id, created_at,
+                                       event_type, item_id, field_name, old_value, new_value)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
             clean_message,
             type,
             item_serial_number,
             item_hex_id,
-            now
+            now,
+            event,
+            item_id,
+            notification_value(field),
+            notification_value(old_value),
+            notification_value(new_value)
         ))
         notification_id = cursor.lastrowid
         # Ne pas afficher le message dans la console car il peut contenir des caractères Unicode
         # qui causent des erreurs d'encodage sur Windows
+        # (la rétention est gérée par le nettoyage périodique, voir prune_notifications)
         safe_print(f'[API] Notification créée (ID: {notification_id})')
-        
-        # Limiter à 100 notifications (supprimer les plus anciennes)
-        cursor.execute('''
-            DELETE FROM notifications 
-            WHERE id NOT IN (
-                SELECT id FROM notifications 
-                ORDER BY created_at DESC 
-                LIMIT 100
-            )
-        ''')
-        deleted_count = cursor.rowcount
-        if deleted_count > 0:
-            safe_print(f'[API] {deleted_count} anciennes notifications supprimées')
     except Exception as e:
         safe_print(f'[API] Erreur lors de la création de la notification: {str(e)}')
 
+# Rétention des notifications (appliquée périodiquement, pas à chaque insertion)
+NOTIFICATIONS_MAX_COUNT = int(os.environ.get('NOTIFICATIONS_MAX_COUNT', 100))
+NOTIFICATIONS_MAX_AGE_DAYS = int(os.environ.get('NOTIFICATIONS_MAX_AGE_DAYS', 30))  # 0 = pas de limite d'âge
+NOTIFICATIONS_PRUNE_INTERVAL = int(os.environ.get('NOTIFICATIONS_PRUNE_INTERVAL', 300))  # secondes
+
+_notification_pruner_started = False
+_notification_pruner_lock = threading.Lock()
+
+def prune_notifications():
+    """Appliquer la rétention des notifications (nombre max et âge max)"""
+    conn = get_db()
+    try:
+        cursor = conn.cursor()
+        deleted_count = 0
+
+        if NOTIFICATIONS_MAX_AGE_DAYS > 0:
+            cutoff = (datetime.now() - timedelta(days=NOTIFICATIONS_MAX_AGE_DAYS)).isoformat()
+            cursor.execute('DELETE FROM notifications WHERE created_at < ?', (cutoff,))
+            deleted_count += cursor.rowcount
+
+        if NOTIFICATIONS_MAX_COUNT > 0:
+            # Les id sont croissants : tout ce qui est sous la N-ième plus récente est supprimé (parcours de la clé primaire)
+            cursor.execute('''
+                DELETE FROM notifications
+                WHERE id <= (SELECT id FROM notifications ORDER BY id DESC LIMIT 1 OFFSET ?)
+            ''', (NOTIFICATIONS_MAX_COUNT,))
+            deleted_count += cursor.rowcount
+
+        conn.commit()
+        if deleted_count > 0:
+            safe_print(f'[DB] {deleted_count} ancienne(s) notification(s) supprimée(s)')
+        return deleted_count
+    finally:
+        conn.close()
+
+def _notification_pruner_loop():
+    """Boucle du thread de nettoyage des notifications"""
+    while True:
+        try:
+            prune_notifications()
+        except Exception as e:
+            safe_print(f'[DB] Erreur nettoyage notifications: {e}')
+        time.sleep(NOTIFICATIONS_PRUNE_INTERVAL)
+
+def start_notification_pruner():
+    """Démarrer le nettoyage périodique des notifications (une seule fois par processus)"""
+    global _notification_pruner_started
+    with _notification_pruner_lock:
+        if _notification_pruner_started:
+            return
+        _notification_pruner_started = True
+    threading.Thread(target=_notification_pruner_loop, name='notification-pruner', daemon=True).start()
+    safe_print(f'[DB] Nettoyage des notifications: max {NOTIFICATIONS_MAX_COUNT}, '
+               f'{NOTIFICATIONS_MAX_AGE_DAYS or "sans limite de"} jour(s), toutes les {NOTIFICATIONS_PRUNE_INTERVAL}s')
+
+# ==================== ADMISSION (tâches lourdes) ====================
+# OCR, analyse IA, transcription Whisper et documents de caution s'exécutent dans le
+# thread de la requête. Chaque classe de tâche a un nombre de places et une file
+# d'attente bornée : au-delà (file pleine ou attente > ADMISSION_MAX_WAIT_SECONDS),
+# réponse 503 immédiate avec Retry-After, pour que les lectures légères (scanner,
+# inventaire) gardent du CPU. Les limites s'appliquent par processus (par worker).
+ADMISSION_DEFAULT_LIMITS = 'ocr=2,ai=4,whisper=1,documents=2'
+ADMISSION_DEFAULT_QUEUES = 'ocr=4,ai=8,whisper=2,documents=4'
+ADMISSION_MAX_WAIT_SECONDS = float(os.environ.get('ADMISSION_MAX_WAIT_SECONDS', 10))
+ADMISSION_MAX_RETRY_AFTER = 60  # secondes
+
+def parse_admission_setting(value, default):
+    """Lire 'classe=nombre,...' (les classes absentes gardent leur valeur par défaut)"""
+    setting = {}
+    for entry in f'{default},{value or ""}'.split(','):
+        name, sep, number = entry.partition('=')
+        if not sep or not name.strip():
+            continue
+        try:
+            setting[name.strip()] = max(0, int(number))
+        except ValueError:
+            print(f'[CONFIG] Réglage d\'admission ignoré: {entry.strip()}')
+    return setting
+
+class AdmissionPool:
+    """Places limitées + file d'attente bornée pour une classe de tâches lourdes"""
+
+    def __init__(self, name, limit, max_queue):
+        self.name = name
+        self.limit = max(1, limit)
+        self.max_queue = max_queue
+        self.active = 0
+        self.waiting = 0
+        self.average_seconds = 2.0  # durée moyenne d'une tâche (moyenne glissante)
+        self.condition = threading.Condition()
+
+    def retry_after(self):
+        """Délai conseillé avant de réessayer : temps pour écouler la file actuelle"""
+        backlog = (self.active + self.waiting) / self.limit
+        return max(1, min(ADMISSION_MAX_RETRY_AFTER, math.ceil(backlog * self.average_seconds)))
+
+    def acquire(self):
+        """Prendre une place (en attendant dans la file) : (admis, Retry-After)"""
+        started = time.perf_counter()
+        with self.condition:
+            if self.active >= self.limit and self.waiting >= self.max_queue:
+                reason = 'queue_full'
+            else:
+                self.waiting += 1
+                deadline = started + ADMISSION_MAX_WAIT_SECONDS
+                try:
+                    while self.active >= self.limit:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0:
+                            break
+                        self.condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+                if self.active < self.limit:
+                    self.active += 1
+                    reason = None
+                else:
+                    reason = 'timeout'
+            retry_after = self.retry_after()
+        waited = time.perf_counter() - started
+        metric_observe('inventory_admission_wait_seconds', waited, {'pool': self.name})
+        if reason:
+            metric_inc('inventory_admission_rejected_total', {'pool': self.name, 'reason': reason})
+            safe_print(f'[ADMISSION] {self.name}: requête refusée ({reason}, {self.active}/{self.limit} en cours, '
+                       f'{self.waiting} en attente), Retry-After {retry_after}s', level='WARNING')
+            return False, retry_after
+        return True, 0
+
+    def release(self, seconds):
+        """Libérer la place et réveiller le premier en attente"""
+        with self.condition:
+            self.active -= 1
+            self.average_seconds = 0.8 * self.average_seconds + 0.2 * seconds
+            self.condition.notify()
+
+_admission_limits = parse_admission_setting(os.environ.get('ADMISSION_LIMITS'), ADMISSION_DEFAULT_LIMITS)
+_admission_queues = parse_admission_setting(os.environ.get('ADMISSION_QUEUES'), ADMISSION_DEFAULT_QUEUES)
+ADMISSION_POOLS = {name: AdmissionPool(name, limit, _admission_queues.get(name, 0))
+                   for name, limit in _admission_limits.items()}
+
+def admission_controlled(pool_name):
+    """Décorateur : exécuter la vue dans une place de la classe (503 + Retry-After si saturée)"""
+    pool = ADMISSION_POOLS[pool_name]
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            admitted, retry_after = pool.acquire()
+            if not admitted:
+                response = jsonify({
+                    'success': False,
+                    'error': f'Serveur occupé, réessayez dans {retry_after} s',
+                    'retryAfter': retry_after
+                })
+                response.status_code = 503
+                response.headers['Retry-After'] = str(retry_after)
+                return response
+            started = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                pool.release(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+def admission_snapshot():
+    """État des classes : [(nom, en cours, en attente, limite, file max)]"""
+    snapshot = []
+    for name, pool in sorted(ADMISSION_POOLS.items()):
+        with pool.condition:
+            snapshot.append((name, pool.active, pool.waiting, pool.limit, pool.max_queue))
+    return snapshot
+
+define_metric('inventory_admission_wait_seconds', 'histogram', 'Attente avant admission des tâches lourdes par classe',
+              buckets=(0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0))
+define_metric('inventory_admission_rejected_total', 'counter', 'Requêtes lourdes refusées (503) par classe et motif')
+
+# ==================== TRACE SQL ====================
+# Les connexions de get_db() chronomètrent chaque requête (execute + fetch*) et
+# agrègent les durées par SQL normalisé (littéraux remplacés par ?). Au-delà de
+# SQL_SLOW_MS, la requête est journalisée avec son EXPLAIN QUERY PLAN.
+SQL_TRACE = os.environ.get('SQL_TRACE', 'true').lower() == 'true'
+SQL_SLOW_MS = float(os.environ.get('SQL_SLOW_MS', 100))
+SQL_TRACE_MAX_STATEMENTS = int(os.environ.get('SQL_TRACE_MAX_STATEMENTS', 1000))  # SQL distincts suivis
+
+_sql_stats = {}  # SQL normalisé -> {'count', 'totalSeconds', 'maxSeconds', 'slowCount', 'rows'}
+_sql_stats_lock = threading.Lock()
+_sql_stats_since = datetime.now().isoformat()
+_SQL_STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+_SQL_NUMBER_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\b')
+_SQL_IN_LIST_PATTERN = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_SQL_SPACE_PATTERN = re.compile(r'\s+')
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """SQL sans littéraux ni espaces superflus (les listes IN (?, ?, ...) sont regroupées)
+
+    Mémoïsé : les handlers réexécutent les mêmes chaînes SQL.
+    """
+    normalized = _SQL_STRING_PATTERN.sub('?', sql)
+    normalized = _SQL_NUMBER_PATTERN.sub('?', normalized)
+    normalized = _SQL_SPACE_PATTERN.sub(' ', normalized).strip()
+    return _SQL_IN_LIST_PATTERN.sub('(?, ...)', normalized)[:1000]
+
+def record_sql_timing(key, seconds, rows=0, new_statement=True, statement_seconds=None):
+    """Ajouter une durée aux statistiques du SQL normalisé (key = normalize_sql(sql))
+
+    statement_seconds : durée cumulée de l'exécution en cours (execute + fetch*), pour le max
+    """
+    with _sql_stats_lock:
+        stats = _sql_stats.get(key)
+        if stats is None:
+            if len(_sql_stats) >= SQL_TRACE_MAX_STATEMENTS:
+                key = '<autres>'
+                stats = _sql_stats.get(key)
+            if stats is None:
+                stats = _sql_stats[key] = {'count': 0, 'totalSeconds': 0.0, 'maxSeconds': 0.0, 'slowCount': 0, 'rows': 0}
+        if new_statement:
+            stats['count'] += 1
+        stats['totalSeconds'] += seconds
+        stats['maxSeconds'] = max(stats['maxSeconds'], seconds if statement_seconds is None else statement_seconds)
+        stats['rows'] += rows
+    if has_request_context():
+        g.db_seconds = g.get('db_seconds', 0.0) + seconds
+        if new_statement:
+            g.db_statements = g.get('db_statements', 0) + 1
+    return key
+
+def _record_slow_query(conn, key, sql, params, seconds):
+    """Journaliser une requête lente avec son plan d'exécution"""
+    with _sql_stats_lock:
+        stats = _sql_stats.get(key)
+        if stats:
+            stats['slowCount'] += 1
+    metric_inc('inventory_db_slow_queries_total')
+    plan = []
+    statement = sql.split(None, 1)[0].upper() if sql.strip() else ''
+    if statement in ('SELECT', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE', 'WITH'):
+        try:
+            # Curseur de base : le plan n'est pas lui-même tracé
+            rows = sqlite3.Cursor(conn).execute(f'EXPLAIN QUERY PLAN {sql}', params).fetchall()
+            plan = [row[-1] for row in rows]
+        except sqlite3.Error as e:
+            plan = [f'(plan indisponible: {e})']
+    plan_text = ''.join(f'\n    plan: {line}' for line in plan) if LOG_FORMAT != 'json' else ''
+    safe_print(f'[DB] Requête lente ({seconds * 1000:.0f} ms): {key}{plan_text}', level=logging.WARNING,
+               durationMs=round(seconds * 1000, 1), sql=key, plan=plan)
+
+class TracedCursor(sqlite3.Cursor):
+    """Curseur chronométré : execute et fetch* sont attribués au dernier SQL exécuté
+
+    Le SQL est normalisé une seule fois par execute ; les fetch* réutilisent la clé.
+    """
+
+    def _timed(self, started, new_statement, rows=0):
+        seconds = time.perf_counter() - started
+        self._trace_seconds = (0.0 if new_statement else self._trace_seconds) + seconds
+        key = record_sql_timing(self._trace_key, seconds, rows, new_statement, self._trace_seconds)
+        metric_observe('inventory_db_query_duration_seconds', seconds)
+        if self._trace_seconds * 1000 >= SQL_SLOW_MS and not self._trace_reported:
+            self._trace_reported = True
+            _record_slow_query(self.connection, key, self._trace_sql, self._trace_params, self._trace_seconds)
+
+    def execute(self, sql, params=()):
+        self._trace_sql, self._trace_params, self._trace_reported = sql, params, False
+        self._trace_key = normalize_sql(sql)
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, params)
+        finally:
+            self._timed(started, True)
+
+    def executemany(self, sql, seq_of_params):
+        self._trace_sql, self._trace_params, self._trace_reported = sql, (), True  # pas d'EXPLAIN
+        self._trace_key = normalize_sql(sql)
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_params)
+        finally:
+            self._timed(started, True)
+
+    def _timed_fetch(self, fetch, *args):
+        if getattr(self, '_trace_key', None) is None:
+            return fetch(*args)
+        started = time.perf_counter()
+        rows = fetch(*args)
+        count = len(rows) if isinstance(rows, list) else int(rows is not None)
+        self._timed(started, False, count)
+        return rows
+
+    def fetchone(self):
+        return self._timed_fetch(super().fetchone)
+
+    def fetchmany(self, size=None):
+        return self._timed_fetch(super().fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._timed_fetch(super().fetchall)
+
+class TracedConnection(sqlite3.Connection):
+    """Connexion dont tous les curseurs (y compris conn.execute) sont tracés"""
+
+    def cursor(self, factory=TracedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, params=()):
+        return self.cursor().execute(sql, params)
+
+    def executemany(self, sql, seq_of_params):
+        return self.cursor().executemany(sql, seq_of_params)
+
+def sql_stats_report(limit=20, sort='total'):
+    """Top des requêtes par durée totale (ou max, count, avg)"""
+    with _sql_stats_lock:
+        rows = [{'sql': sql, **stats} for sql, stats in _sql_stats.items()]
+    for row in rows:
+        row['avgMs'] = round(row['totalSeconds'] * 1000 / row['count'], 3) if row['count'] else 0
+        row['totalMs'] = round(row.pop('totalSeconds') * 1000, 3)
+        row['maxMs'] = round(row.pop('maxSeconds') * 1000, 3)
+    sort_keys = {'total': 'totalMs', 'max': 'maxMs', 'count': 'count', 'avg': 'avgMs'}
+    rows.sort(key=lambda row: row[sort_keys.get(sort, 'totalMs')], reverse=True)
+    return {
+        'since': _sql_stats_since,
+        'statements': len(rows),
+        'totalMs': round(sum(row['totalMs'] for row in rows), 3),
+        'top': rows[:limit]
+    }
+
+def reset_sql_stats():
+    global _sql_stats_since
+    with _sql_stats_lock:
+        _sql_stats.clear()
+        _sql_stats_since = datetime.now().isoformat()
+
+define_metric('inventory_db_query_duration_seconds', 'histogram', 'Durée des requêtes SQL (execute + fetch)',
+              buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0))
+define_metric('inventory_db_slow_queries_total', 'counter', 'Requêtes SQL au-delà de SQL_SLOW_MS')
+
 def get_db():
-    """Créer une connexion à la base de données"""
+    """Créer une connexion à la base de données (tracée si SQL_TRACE)"""
     os.makedirs(os.path.join(SCRIPT_DIR, 'data'), exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, factory=TracedConnection) if SQL_TRACE else sqlite3.connect(DB_PATH)
     conn.row_factory = sqlite3.Row
+    metric_inc('inventory_db_connections_total')
     return conn
 
 def generate_next_item_id(cursor):
@@ -660,7 +2095,7 @@ def migrate_hex_ids():
         items_to_update = cursor.fetchall()
         
         if items_to_update:
-            print(f'[DB] Migration de {len(items_to_update)} hex_id vers format A00-Z99...')
+            safe_print(f'[DB] Migration de {len(items_to_update)} hex_id vers format A00-Z99...')
             
             # Trouver le dernier ID utilisé dans le nouveau format
             cursor.execute('''
@@ -689,12 +2124,68 @@ def migrate_hex_ids():
                 cursor.execute('UPDATE items SET hex_id = ? WHERE id = ?', (new_id, item_id))
             
             conn.commit()
-            print(f'[DB] Migration hex_id terminée: {len(items_to_update)} items mis à jour')
+            safe_print(f'[DB] Migration hex_id terminée: {len(items_to_update)} items mis à jour')
     except Exception as e:
-        print(f'[DB] Erreur migration hex_id: {str(e)}')
+        safe_print(f'[DB] Erreur migration hex_id: {str(e)}')
     finally:
         conn.close()
 
+def load_notification_watermark(cursor):
+    """Repère des notifications déjà existantes (les suivantes sont diffusées dans les événements SSE)"""
+    global _notification_watermark
+    cursor.execute('SELECT COALESCE(MAX(id), 0) FROM notifications')
+    _notification_watermark = cursor.fetchone()[0]
+
+def _image_paths_sql(column):
+    """Chemins /api/images/ d'une colonne image (tableau JSON ou chemin seul) -> lignes value"""
+    return (f"json_each(CASE WHEN json_valid({column}) THEN {column} ELSE json_array({column}) END) "
+            f"WHERE type = 'text' AND value LIKE '/api/images/%'")
+
+def create_image_refs(cursor):
+    """Table image_refs et triggers qui suivent les références dans items.image"""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_refs (
+            filename TEXT PRIMARY KEY,
+            ref_count INTEGER NOT NULL DEFAULT 0,
+            size INTEGER,
+            uploaded_at TEXT
+        )
+    ''')
+    increment = f'''
+        INSERT INTO image_refs (filename, ref_count)
+        SELECT substr(value, 13), 1 FROM {_image_paths_sql('NEW.image')}
+        ON CONFLICT(filename) DO UPDATE SET ref_count = ref_count + 1;'''
+    decrement = f'''
+        UPDATE image_refs SET ref_count = max(0, ref_count - (
+            SELECT count(*) FROM {_image_paths_sql('OLD.image')} AND substr(value, 13) = image_refs.filename))
+        WHERE filename IN (SELECT substr(value, 13) FROM {_image_paths_sql('OLD.image')});'''
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS items_image_refs_insert AFTER INSERT ON items
+        WHEN NEW.image LIKE '%/api/images/%' BEGIN {increment} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS items_image_refs_update AFTER UPDATE OF image ON items
+        WHEN OLD.image IS NOT NEW.image BEGIN {decrement} {increment} END
+    ''')
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS items_image_refs_delete AFTER DELETE ON items
+        WHEN OLD.image LIKE '%/api/images/%' BEGIN {decrement} END
+    ''')
+
+def rebuild_image_refs(cursor):
+    """Recompter toutes les références à partir de items.image"""
+    cursor.execute('UPDATE image_refs SET ref_count = 0')
+    cursor.execute(f'''
+        INSERT INTO image_refs (filename, ref_count)
+        SELECT substr(value, 13), count(*) FROM items, {_image_paths_sql('items.image')}
+        AND items.image IS NOT NULL
+        GROUP BY substr(value, 13)
+        ON CONFLICT(filename) DO UPDATE SET ref_count = excluded.ref_count
+    ''')
+    cursor.execute('SELECT count(*), coalesce(sum(ref_count), 0) FROM image_refs WHERE ref_count > 0')
+    files, references = cursor.fetchone()
+    safe_print(f'[IMG] Index des images reconstruit: {files} fichier(s), {references} référence(s)')
+
 def init_db():
     """Initialiser la base de données"""
     conn = get_db()
@@ -720,7 +2211,7 @@ def init_db():
     # Vérifier et ajouter les colonnes manquantes pour les bases de données existantes
     cursor.execute("PRAGMA table_info(items)")
     columns = [column[1] for column in cursor.fetchall()]
-    print(f'[DB] Colonnes existantes dans items: {columns}')
+    safe_print(f'[DB] Colonnes existantes dans items: {columns}')
     
     # Ajouter les nouvelles colonnes si elles n'existent pas
     # SQLite n'accepte pas UNIQUE/DEFAULT complexes dans ALTER ADD COLUMN, donc on utilise seulement le type
@@ -735,16 +2226,17 @@ def init_db():
         'current_rental_id': 'INTEGER',
         'custom_data': 'TEXT',  # JSON pour stocker les champs personnalisés
         'parent_id': 'INTEGER',  # ID du parent pour créer des groupes d'items
-        'display_order': 'INTEGER'  # Ordre d'affichage dans le groupe
+        'display_order': 'INTEGER',  # Ordre d'affichage dans le groupe
+        'version': 'INTEGER DEFAULT 1'  # Version pour la concurrence optimiste (ETag / If-Match)
     }
     
     for col_name, col_type in new_columns.items():
         if col_name not in columns:
             try:
                 cursor.execute(f'ALTER TABLE items ADD COLUMN {col_name} {col_type}')
-                print(f'[DB] Colonne {col_name} ajoutée')
+                safe_print(f'[DB] Colonne {col_name} ajoutée')
             except sqlite3.OperationalError as e:
-                print(f'[DB] Erreur ajout colonne {col_name}: {e}')
+                safe_print(f'[DB] Erreur ajout colonne {col_name}: {e}')
     
     conn.commit()
     
@@ -798,15 +2290,33 @@ def init_db():
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS item_history (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id INTEGER,
             item_serial_number TEXT NOT NULL,
             field_name TEXT NOT NULL,
             old_value TEXT,
             new_value TEXT,
             changed_at TEXT NOT NULL,
-            FOREIGN KEY (item_serial_number) REFERENCES items(serial_number)
+            FOREIGN KEY (item_id) REFERENCES items(id)
         )
     ''')
     
+    # Rattacher l'historique à items.id (identifiant stable) pour les bases existantes
+    cursor.execute("PRAGMA table_info(item_history)")
+    history_columns = [c[1] for c in cursor.fetchall()]
+    if 'item_id' not in history_columns:
+        try:
+            cursor.execute('ALTER TABLE item_history ADD COLUMN item_id INTEGER')
+            safe_print('[DB] Colonne item_history.item_id ajoutée')
+        except sqlite3.OperationalError as e:
+            safe_print(f'[DB] Erreur ajout colonne item_history.item_id: {e}')
+    cursor.execute('''
+        UPDATE item_history
+        SET item_id = (SELECT id FROM items WHERE items.serial_number = item_history.item_serial_number)
+        WHERE item_id IS NULL
+    ''')
+    if cursor.rowcount > 0:
+        safe_print(f'[DB] {cursor.rowcount} entrée(s) d\'historique rattachée(s) à items.id')
+    
     # Table des notifications partagées
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS notifications (
@@ -815,7 +2325,12 @@ def init_db():
             type TEXT NOT NULL,
             item_serial_number TEXT,
             item_hex_id TEXT,
-            created_at TEXT NOT NULL
+            created_at TEXT NOT NULL,
+            event_type TEXT,
+            item_id INTEGER,
+            field_name TEXT,
+            old_value TEXT,
+            new_value TEXT
         )
     ''')
     # Ajouter item_hex_id si la table existait déjà
@@ -826,11 +2341,25 @@ def init_db():
             cursor.execute('ALTER TABLE notifications ADD COLUMN item_hex_id TEXT')
         except sqlite3.OperationalError:
             pass
+    # Champs structurés (type d'événement, item, champ, ancienne/nouvelle valeur)
+    for col_name, col_type in [('event_type', 'TEXT'), ('item_id', 'INTEGER'), ('field_name', 'TEXT'),
+                               ('old_value', 'TEXT'), ('new_value', 'TEXT')]:
+        if col_name not in notif_columns:
+            try:
+                cursor.execute(f'ALTER TABLE notifications ADD COLUMN {col_name} {col_type}')
+            except sqlite3.OperationalError:
+                pass
     
-    conn.commit()
+    # Marqueurs "dernière notification vue" par client
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS notification_reads (
+            client_id TEXT PRIMARY KEY,
+            last_seen_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT NOT NULL
+        )
+    ''')
     
-    # Nettoyer les notifications existantes pour éviter les problèmes d'encodage
-    clean_existing_notifications()
+    conn.commit()
     
     # Table des locations
     cursor.execute('''
@@ -867,9 +2396,9 @@ def init_db():
         if col_name not in rental_columns:
             try:
                 cursor.execute(f'ALTER TABLE rentals ADD COLUMN {col_name} {col_type}')
-                print(f'[DB] Colonne rentals.{col_name} ajoutée')
+                safe_print(f'[DB] Colonne rentals.{col_name} ajoutée')
             except sqlite3.OperationalError as e:
-                print(f'[DB] Erreur ajout colonne rentals.{col_name}: {e}')
+                safe_print(f'[DB] Erreur ajout colonne rentals.{col_name}: {e}')
     
     # Table des statuts personnalisés pour les locations
     cursor.execute('''
@@ -893,16 +2422,28 @@ def init_db():
             VALUES (?, ?, ?)
         ''', (status_name, color, datetime.now().isoformat()))
     
+    # Index des images : références par fichier, maintenues par triggers sur items.image
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'image_refs'")
+    image_refs_missing = cursor.fetchone() is None
+    create_image_refs(cursor)
+    if image_refs_missing:
+        rebuild_image_refs(cursor)
+    
     # Index pour améliorer les performances
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_item_history_serial ON item_history(item_serial_number)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_item_history_item_changed ON item_history(item_id, changed_at)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_item_history_changed_at ON item_history(changed_at)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_notifications_created_at ON notifications(created_at)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_rentals_start_date ON rentals(start_date)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_rentals_end_date ON rentals(end_date)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_rentals_status ON rentals(status)')
     
     conn.commit()
+    
+    load_notification_watermark(cursor)
+    
     conn.close()
-    print(f"[OK] Base de donnees initialisee: {DB_PATH}")
+    safe_print(f"[OK] Base de donnees initialisee: {DB_PATH}")
 
 # ==================== CONFIGURATION FRONTEND STATIQUE ====================
 
@@ -923,13 +2464,136 @@ if FRONTEND_AVAILABLE:
 else:
     print(f'[FRONTEND] Build non trouvé. Exécutez: npm run build')
 
+# Manifeste des routes statiques : out/ est parcouru une fois au démarrage, chaque
+# chemin d'URL (fichier, page.html sans extension, dossier/index.html) pointe vers
+# son fichier, son ETag et ses variantes précompressées (.br, .gz).
+STATIC_IMMUTABLE_PREFIXES = ('_next/static/',)  # noms de fichiers avec hash de contenu (Next.js)
+STATIC_IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+STATIC_ASSET_CACHE = 'public, max-age=86400'
+STATIC_PAGE_CACHE = 'no-cache'  # pages HTML : revalidées via ETag à chaque chargement
+# Générer les .gz (et .br si le module brotli est installé) manquants au démarrage
+STATIC_PRECOMPRESS = os.environ.get('STATIC_PRECOMPRESS', 'false').lower() == 'true'
+STATIC_COMPRESSIBLE_EXTENSIONS = ('.html', '.js', '.css', '.json', '.svg', '.txt', '.xml', '.map', '.ico')
+STATIC_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))  # ordre de préférence
+
+def precompress_static_files(root):
+    """Créer les variantes .gz/.br manquantes des fichiers texte (retourne le nombre créé)"""
+    brotli = importlib.import_module('brotli') if module_available('brotli') else None
+    created = 0
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if not filename.endswith(STATIC_COMPRESSIBLE_EXTENSIONS):
+                continue
+            path = os.path.join(directory, filename)
+            data = None
+            for encoding, suffix in STATIC_ENCODINGS:
+                if (encoding == 'br' and brotli is None) or os.path.exists(path + suffix):
+                    continue
+                if data is None:
+                    with open(path, 'rb') as f:
+                        data = f.read()
+                compressed = brotli.compress(data) if encoding == 'br' else gzip.compress(data, compresslevel=9)
+                if len(compressed) < len(data):
+                    with open(path + suffix, 'wb') as f:
+                        f.write(compressed)
+                    created += 1
+    return created
+
+def _static_entry(root, relative_path):
+    """Entrée du manifeste pour un fichier de out/"""
+    path = os.path.join(root, relative_path)
+    stat = os.stat(path)
+    url_path = relative_path.replace(os.sep, '/')
+    if url_path.startswith(STATIC_IMMUTABLE_PREFIXES):
+        cache_control = STATIC_IMMUTABLE_CACHE
+    elif url_path.endswith('.html'):
+        cache_control = STATIC_PAGE_CACHE
+    else:
+        cache_control = STATIC_ASSET_CACHE
+    return {
+        'path': path,
+        'mimetype': mimetypes.guess_type(path)[0] or 'application/octet-stream',
+        'etag': f'{stat.st_size:x}-{stat.st_mtime_ns:x}',
+        'cacheControl': cache_control,
+        'variants': {encoding: path + suffix for encoding, suffix in STATIC_ENCODINGS if os.path.isfile(path + suffix)}
+    }
+
+def build_static_manifest(root):
+    """Parcourir out/ et associer chaque chemin d'URL à son fichier"""
+    manifest = {}
+    if not os.path.isdir(root):
+        return manifest
+    if STATIC_PRECOMPRESS:
+        created = precompress_static_files(root)
+        if created:
+            print(f'[FRONTEND] {created} variante(s) précompressée(s) créée(s)')
+    compressed_suffixes = tuple(suffix for _, suffix in STATIC_ENCODINGS)
+    for directory, _, filenames in os.walk(root):
+        for filename in filenames:
+            if filename.endswith(compressed_suffixes):
+                continue
+            relative_path = os.path.relpath(os.path.join(directory, filename), root)
+            entry = _static_entry(root, relative_path)
+            url_path = relative_path.replace(os.sep, '/')
+            manifest[url_path] = entry
+            if url_path.endswith('.html'):
+                # page.html -> /page ; dossier/index.html -> /dossier et /dossier/
+                manifest.setdefault(url_path[:-5], entry)
+                if filename == 'index.html':
+                    folder = url_path[:-len('index.html')]
+                    manifest.setdefault(folder, entry)
+                    manifest.setdefault(folder.rstrip('/'), entry)
+    return manifest
+
+STATIC_MANIFEST = build_static_manifest(FRONTEND_BUILD_DIR) if FRONTEND_AVAILABLE else {}
+if STATIC_MANIFEST:
+    print(f'[FRONTEND] Manifeste statique: {len(STATIC_MANIFEST)} route(s)')
+
+def refresh_static_manifest():
+    """Reconstruire le manifeste (après un build du frontend)"""
+    global STATIC_MANIFEST
+    STATIC_MANIFEST = build_static_manifest(FRONTEND_BUILD_DIR)
+
+def serve_static_entry(entry):
+    """Servir une entrée du manifeste (variante précompressée si acceptée, ETag, Cache-Control)"""
+    accepted = request.accept_encodings
+    for encoding, variant_path in entry['variants'].items():
+        if accepted[encoding]:
+            response = send_file(variant_path, mimetype=entry['mimetype'], etag=f"{entry['etag']}-{encoding}",
+                                 conditional=True, max_age=None)
+            response.headers['Content-Encoding'] = encoding
+            break
+    else:
+        response = send_file(entry['path'], mimetype=entry['mimetype'], etag=entry['etag'],
+                             conditional=True, max_age=None)
+    response.headers['Cache-Control'] = entry['cacheControl']
+    if entry['variants']:
+        response.vary.add('Accept-Encoding')
+    return response
+
+def serve_static_path(url_path, fallback_to_index=False):
+    """Servir un chemin du manifeste (sinon index.html pour le routage côté client, ou 404)"""
+    entry = STATIC_MANIFEST.get(url_path)
+    if entry is None and fallback_to_index:
+        entry = STATIC_MANIFEST.get('index.html')
+    if entry is None:
+        return '', 404
+    try:
+        return serve_static_entry(entry)
+    except FileNotFoundError:
+        # Build remplacé depuis le démarrage : relire out/ une fois
+        safe_print(f'[FRONTEND] Fichier absent ({url_path}), reconstruction du manifeste')
+        refresh_static_manifest()
+        entry = STATIC_MANIFEST.get(url_path) or (STATIC_MANIFEST.get('index.html') if fallback_to_index else None)
+        return serve_static_entry(entry) if entry else ('', 404)
+
 # ==================== ROUTES FRONTEND (fichiers statiques) ====================
 
 @app.route('/')
 def serve_index():
     """Servir la page d'accueil du frontend"""
     if FRONTEND_AVAILABLE:
-        return send_from_directory(FRONTEND_BUILD_DIR, 'index.html')
+        return serve_static_path('index.html')
     else:
         return '''
         <html>
@@ -952,10 +2616,8 @@ npm run build
 @app.route('/favicon.ico')
 def serve_favicon():
     """Servir le favicon"""
-    if FRONTEND_AVAILABLE:
-        favicon_path = os.path.join(FRONTEND_BUILD_DIR, 'favicon.ico')
-        if os.path.exists(favicon_path):
-            return send_from_directory(FRONTEND_BUILD_DIR, 'favicon.ico')
+    if 'favicon.ico' in STATIC_MANIFEST:
+        return serve_static_path('favicon.ico')
     return '', 204
 
 @app.route('/logo-globalvision.png')
@@ -968,38 +2630,69 @@ def serve_logo():
 # Route pour servir les fichiers statiques Next.js (_next, images, etc.)
 @app.route('/_next/<path:filename>')
 def serve_next_static(filename):
-    """Servir les fichiers statiques Next.js (_next)"""
-    if FRONTEND_AVAILABLE:
-        return send_from_directory(os.path.join(FRONTEND_BUILD_DIR, '_next'), filename)
-    return '', 404
+    """Servir les fichiers statiques Next.js (_next, immuables sous _next/static)"""
+    return serve_static_path(f'_next/{filename}')
 
 @app.route('/fonts/<path:filename>')
 def serve_fonts(filename):
     """Servir les polices"""
-    if FRONTEND_AVAILABLE:
-        fonts_dir = os.path.join(FRONTEND_BUILD_DIR, 'fonts')
-        if os.path.exists(fonts_dir):
-            return send_from_directory(fonts_dir, filename)
-    return '', 404
+    return serve_static_path(f'fonts/{filename}')
 
 @app.route('/img/<path:filename>')
 def serve_images(filename):
     """Servir les images"""
-    if FRONTEND_AVAILABLE:
-        img_dir = os.path.join(FRONTEND_BUILD_DIR, 'img')
-        if os.path.exists(img_dir):
-            return send_from_directory(img_dir, filename)
-    return '', 404
+    return serve_static_path(f'img/{filename}')
 
 # ==================== API IMAGES ====================
+# Un nom adressé par le contenu ne change jamais de contenu : ETag = empreinte et
+# cache immuable. Les anciens noms sont revalidés via un ETag taille/date. Range et
+# If-None-Match sont gérés par send_file ; avec IMAGE_ACCEL_REDIRECT (préfixe d'une
+# location nginx « internal » pointant sur data/images), nginx sert les octets.
+IMAGE_IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+IMAGE_LEGACY_CACHE = 'public, max-age=86400'
+IMAGE_PENDING_CACHE = 'public, max-age=60'  # ?w= servi par l'original en attendant la taille dérivée
+IMAGE_ACCEL_REDIRECT = os.environ.get('IMAGE_ACCEL_REDIRECT', '')  # ex. /_protected_images/
+
+def image_file_etag(path):
+    """ETag d'un fichier sans empreinte dans le nom : taille et date de modification"""
+    stat = os.stat(path)
+    return f'{stat.st_size:x}-{stat.st_mtime_ns:x}'
+
+def send_image_file(relative_path, etag, cache_control):
+    """Réponse image (fichier de IMAGES_DIR) avec ETag fort et Cache-Control"""
+    path = os.path.join(IMAGES_DIR, relative_path)
+    if IMAGE_ACCEL_REDIRECT:
+        if not os.path.isfile(path):
+            raise FileNotFoundError(relative_path)
+        response = Response(mimetype=mimetypes.guess_type(path)[0] or 'application/octet-stream')
+        # nginx sert le fichier : ETag, If-None-Match et Range sont gérés de son côté
+        response.headers['X-Accel-Redirect'] = f"{IMAGE_ACCEL_REDIRECT.rstrip('/')}/{relative_path.replace(os.sep, '/')}"
+    else:
+        response = send_file(path, etag=etag, conditional=True, max_age=None)
+    response.headers['Cache-Control'] = cache_control
+    return response
 
 @app.route('/api/images/<filename>')
 def serve_image(filename):
-    """Servir une image sauvegardée"""
+    """Servir une image sauvegardée (?w=<largeur> : taille précalculée la plus proche)"""
     try:
         # Sécurité: empêcher la traversée de répertoire
         safe_filename = os.path.basename(filename)
-        return send_from_directory(IMAGES_DIR, safe_filename)
+        content_hash = safe_filename.split('.', 1)[0] if CONTENT_ADDRESSED_IMAGE_PATTERN.match(safe_filename) else None
+        cache_control = IMAGE_IMMUTABLE_CACHE if content_hash else IMAGE_LEGACY_CACHE
+        width = request.args.get('w', type=int)
+        if width and width > 0 and os.path.isfile(os.path.join(IMAGES_DIR, safe_filename)):
+            variant_path = select_image_variant(safe_filename, width)
+            if variant_path:
+                variant_name = os.path.basename(variant_path)
+                # <fichier>.w<largeur>.<ext> : l'ETag reprend l'empreinte, la largeur et le format
+                etag = f"{content_hash}-{variant_name[len(safe_filename) + 1:].replace('.', '-')}" if content_hash else None
+                return send_image_file(os.path.join('variants', variant_name),
+                                       etag or image_file_etag(variant_path), cache_control)
+            if image_variant_pending(safe_filename, width):
+                cache_control = IMAGE_PENDING_CACHE
+        path = os.path.join(IMAGES_DIR, safe_filename)
+        return send_image_file(safe_filename, content_hash or image_file_etag(path), cache_control)
     except Exception as e:
         safe_print(f'[IMG] Erreur lecture image {filename}: {str(e)}')
         return jsonify({'error': 'Image non trouvée'}), 404
@@ -1035,18 +2728,66 @@ def upload_image():
             
     except Exception as e:
         safe_print(f'[IMG] Exception upload: {e}')
-        import traceback
-        traceback.print_exc()
+        safe_traceback()
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # ==================== API ITEMS ====================
 
+# Mapping des champs API vers colonnes DB (champs modifiables d'un item)
+ITEM_FIELD_MAPPING = {
+    'name': 'name',
+    'quantity': 'quantity',
+    'category': 'category',
+    'categoryDetails': 'category_details',
+    'image': 'image',
+    'scannedCode': 'scanned_code',
+    'serialNumber': 'serial_number',
+    'brand': 'brand',
+    'model': 'model',
+    'itemType': 'item_type',
+    'status': 'status'
+}
+
+def format_item(row_dict, hex_id=None):
+    """Convertir une ligne de la table items en objet API (camelCase)"""
+    custom_data = {}
+    if row_dict.get('custom_data'):
+        try:
+            custom_data = json.loads(row_dict['custom_data'])
+        except:
+            pass
+
+    return {
+        'id': row_dict.get('id'),
+        'itemId': row_dict.get('item_id'),
+        'hexId': hex_id or row_dict.get('hex_id'),
+        'name': row_dict.get('name'),
+        'serialNumber': row_dict.get('serial_number'),
+        'quantity': row_dict.get('quantity', 1),
+        'category': row_dict.get('category'),
+        'categoryDetails': row_dict.get('category_details'),
+        'image': row_dict.get('image'),
+        'scannedCode': row_dict.get('scanned_code'),
+        'status': row_dict.get('status', 'en_stock'),
+        'itemType': row_dict.get('item_type'),
+        'brand': row_dict.get('brand'),
+        'model': row_dict.get('model'),
+        'rentalEndDate': row_dict.get('rental_end_date'),
+        'currentRentalId': row_dict.get('current_rental_id'),
+        'parentId': row_dict.get('parent_id'),
+        'displayOrder': row_dict.get('display_order', 0),
+        'customData': custom_data,
+        'version': row_dict.get('version') or 1,
+        'createdAt': row_dict.get('created_at'),
+        'lastUpdated': row_dict.get('last_updated')
+    }
+
 @app.route('/api/items', methods=['GET'])
 def get_items():
     """Récupérer tous les items"""
     conn = None
     try:
-        print('[API] GET /api/items - Récupération des items...')
+        safe_print('[API] GET /api/items - Récupération des items...')
         conn = get_db()
         cursor = conn.cursor()
         cursor.execute('SELECT * FROM items ORDER BY last_updated DESC')
@@ -1062,41 +2803,12 @@ def get_items():
                 hex_id = generate_item_hex_id(cursor)
                 cursor.execute('UPDATE items SET hex_id = ? WHERE id = ?', (hex_id, row_dict['id']))
                 conn.commit()
-            # Parser custom_data JSON
-            custom_data = {}
-            if row_dict.get('custom_data'):
-                try:
-                    custom_data = json.loads(row_dict['custom_data'])
-                except:
-                    pass
-            
-            items.append({
-                'id': row_dict.get('id'),
-                'itemId': row_dict.get('item_id'),
-                'hexId': hex_id,
-                'name': row_dict.get('name'),
-                'serialNumber': row_dict.get('serial_number'),
-                'quantity': row_dict.get('quantity', 1),
-                'category': row_dict.get('category'),
-                'categoryDetails': row_dict.get('category_details'),
-                'image': row_dict.get('image'),
-                'scannedCode': row_dict.get('scanned_code'),
-                'status': row_dict.get('status', 'en_stock'),
-                'itemType': row_dict.get('item_type'),
-                'brand': row_dict.get('brand'),
-                'model': row_dict.get('model'),
-                'rentalEndDate': row_dict.get('rental_end_date'),
-                'currentRentalId': row_dict.get('current_rental_id'),
-                'parentId': row_dict.get('parent_id'),
-                'displayOrder': row_dict.get('display_order', 0),
-                'customData': custom_data,
-                'createdAt': row_dict.get('created_at'),
-                'lastUpdated': row_dict.get('last_updated')
-            })
+
+            items.append(format_item(row_dict, hex_id))
         
         if conn:
             conn.close()
-        print(f'[API] GET /api/items - {len(items)} items retournés')
+        safe_print(f'[API] GET /api/items - {len(items)} items retournés')
         return jsonify({'success': True, 'items': items}), 200
     except Exception as e:
         if conn:
@@ -1104,7 +2816,7 @@ def get_items():
                 conn.close()
             except Exception:
                 pass
-        print(f'[API] ERREUR GET /api/items: {str(e)}')
+        safe_print(f'[API] ERREUR GET /api/items: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -1117,7 +2829,7 @@ def search_item():
         if not query:
             return jsonify({'success': False, 'error': 'Paramètre de recherche manquant'}), 400
         
-        print(f'[API] GET /api/items/search - Recherche: {query}')
+        safe_print(f'[API] GET /api/items/search - Recherche: {query}')
         conn = get_db()
         cursor = conn.cursor()
         
@@ -1163,14 +2875,14 @@ def search_item():
                 'createdAt': row_dict.get('created_at'),
                 'lastUpdated': row_dict.get('last_updated')
             }
-            print(f'[API] GET /api/items/search - Item trouvé: {item["name"]}')
+            safe_print(f'[API] GET /api/items/search - Item trouvé: {item["name"]}')
             return jsonify({'success': True, 'found': True, 'item': item}), 200
         else:
-            print(f'[API] GET /api/items/search - Aucun item trouvé')
+            safe_print(f'[API] GET /api/items/search - Aucun item trouvé')
             return jsonify({'success': True, 'found': False, 'item': None}), 200
             
     except Exception as e:
-        print(f'[API] ERREUR GET /api/items/search: {str(e)}')
+        safe_print(f'[API] ERREUR GET /api/items/search: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -1183,12 +2895,13 @@ def create_item():
         if not data:
             return jsonify({'success': False, 'error': 'Données JSON invalides'}), 400
 
-        # Log sans l'image pour éviter [Errno 22] sur Windows (image Base64 trop grande)
-        try:
-            log_data = {k: (v[:100] + '...' if k == 'image' and isinstance(v, str) and len(v) > 100 else v) for k, v in data.items()}
-            safe_print(f'[API] POST /api/items - Données reçues: {log_data}')
-        except Exception as log_err:
-            safe_print(f'[API] POST /api/items - (log error: {log_err})')
+        # Log sans l'image (Base64 trop grande), uniquement si LOG_PAYLOADS
+        if LOG_PAYLOADS:
+            try:
+                log_data = {k: (v[:100] + '...' if k == 'image' and isinstance(v, str) and len(v) > 100 else v) for k, v in data.items()}
+                log_payload('[API] POST /api/items - Données reçues', log_data)
+            except Exception as log_err:
+                safe_print(f'[API] POST /api/items - (log error: {log_err})')
         
         # Validation des champs requis
         missing_fields = validate_required_fields(data, ['name', 'serialNumber'])
@@ -1213,6 +2926,10 @@ def create_item():
         if not data.get('name') or not data.get('serialNumber'):
             safe_print('[API] ERREUR: Nom ou numéro de série manquant après sanitization')
             return jsonify({'success': False, 'error': 'Le nom et le numéro de série sont obligatoires'}), 400
+        
+        custom_data_error = validate_custom_data(data.get('customData'))
+        if custom_data_error:
+            return jsonify({'success': False, 'error': custom_data_error}), 400
 
         # Traiter les images: sauvegarder sur disque au lieu de stocker en Base64
         if data.get('image'):
@@ -1242,9 +2959,10 @@ def create_item():
             # Enregistrer l'historique de la modification de quantité
             if quantity_to_add > 0:
                 cursor.execute('''
-                    INSERT INTO item_history (item_serial_number, field_name, old_value, new_value, changed_at)
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO item_history (item_id, item_serial_number, field_name, old_value, new_value, changed_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
                 ''', (
+                    existing['id'],
                     data['serialNumber'],
                     'quantity',
                     str(old_quantity),
@@ -1259,7 +2977,8 @@ def create_item():
             cursor.execute('''
                 UPDATE items 
                 SET name = ?, quantity = ?, category = ?, category_details = ?, 
-                    image = ?, scanned_code = ?, item_type = ?, brand = ?, model = ?, custom_data = ?, last_updated = ?
+                    image = ?, scanned_code = ?, item_type = ?, brand = ?, model = ?, custom_data = ?, last_updated = ?,
+                    version = COALESCE(version, 1) + 1
                 WHERE serial_number = ?
             ''', (
                 data['name'],
@@ -1315,9 +3034,10 @@ def create_item():
             
             # Enregistrer la création dans l'historique
             cursor.execute('''
-                INSERT INTO item_history (item_serial_number, field_name, old_value, new_value, changed_at)
-                VALUES (?, ?, ?, ?, ?)
+                INSERT INTO item_history (item_id, item_serial_number, field_name, old_value, new_value, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
             ''', (
+                item_id,
                 data['serialNumber'],
                 'created',
                 None,
@@ -1344,7 +3064,11 @@ def create_item():
                     'success',
                     data['serialNumber'],
                     conn,
-                    cursor
+                    cursor,
+                    event='item_updated',
+                    field='quantity',
+                    old_value=old_quantity,
+                    new_value=new_quantity
                 )
             else:
                 create_notification(
@@ -1352,7 +3076,9 @@ def create_item():
                     'success',
                     data['serialNumber'],
                     conn,
-                    cursor
+                    cursor,
+                    event='item_created',
+                    new_value=data['name']
                 )
         except Exception as notif_err:
             safe_print(f'[API] Erreur notification (non bloquante): {notif_err}')
@@ -1375,6 +3101,59 @@ def create_item():
         safe_print(f'[API] ERREUR POST /api/items: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
+ITEM_FIELD_LABELS = {
+    'name': 'Nom',
+    'quantity': 'Quantité',
+    'category': 'Catégorie',
+    'categoryDetails': 'Détails',
+    'serialNumber': 'Numéro de série',
+    'scannedCode': 'Code scanné',
+    'brand': 'Marque',
+    'model': 'Modèle',
+    'itemType': 'Type',
+    'status': 'Statut',
+    'image': 'Image'
+}
+
+def format_item_update_notification(item_name, serial_number, entries, custom_labels, changed_at):
+    """Construire le message d'une notification de modification (un ou plusieurs champs)"""
+    try:
+        changed_time = datetime.fromisoformat(changed_at.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        changed_time = datetime.now()
+    stamp = f'{changed_time.strftime("%d/%m/%Y")} {changed_time.strftime("%H:%M:%S")}'
+
+    def label_for(field_name):
+        if field_name.startswith('custom_'):
+            custom_key = field_name[len('custom_'):]
+            return custom_labels.get(custom_key, custom_key)
+        return ITEM_FIELD_LABELS.get(field_name, field_name)
+
+    if len(entries) > 1:
+        changes = ', '.join(
+            f'{label_for(e["field_name"])} : {e["old_value"] or "vide"} -> {e["new_value"] or "vide"}'
+            for e in entries
+        )
+        return f'✏️ Modification de {len(entries)} champs - Item "{item_name}" ({serial_number}) : {changes} | {stamp}'
+
+    entry = entries[0]
+    field_name = entry['field_name']
+    field_label = label_for(field_name)
+    old_val_display = entry['old_value'] if entry['old_value'] else 'vide'
+    new_val_display = entry['new_value'] if entry['new_value'] else 'vide'
+
+    if field_name == 'quantity':
+        return f'📊 Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {stamp}'
+    if field_name == 'name':
+        return f'✏️ Modification de {field_label} - Item "{old_val_display}" ({serial_number}) -> "{new_val_display}" | {stamp}'
+    if field_name == 'category':
+        return f'🏷️ Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display or "aucune"} -> {new_val_display} | {stamp}'
+    if field_name == 'status':
+        return f'🔄 Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {stamp}'
+    if field_name.startswith('custom_'):
+        return f'📝 Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {stamp}'
+    return f'✏️ Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {stamp}'
+
 @app.route('/api/items/<serial_number>', methods=['PUT'])
 def update_item(serial_number):
     """Mettre à jour un item"""
@@ -1403,27 +3182,12 @@ def update_item(serial_number):
 
         now = datetime.now().isoformat()
 
-        # Mapping des champs API vers colonnes DB
-        field_mapping = {
-            'name': 'name',
-            'quantity': 'quantity',
-            'category': 'category',
-            'categoryDetails': 'category_details',
-            'image': 'image',
-            'scannedCode': 'scanned_code',
-            'serialNumber': 'serial_number',
-            'brand': 'brand',
-            'model': 'model',
-            'itemType': 'item_type',
-            'status': 'status'
-        }
-
         # Construire la requête de mise à jour et enregistrer l'historique
         update_fields = []
         update_values = []
         history_entries = []
 
-        for api_field, db_column in field_mapping.items():
+        for api_field, db_column in ITEM_FIELD_MAPPING.items():
             if api_field in data:
                 old_value = existing.get(db_column)
                 new_value = data[api_field]
@@ -1448,6 +3212,10 @@ def update_item(serial_number):
         
         # Gérer customData (champs personnalisés)
         if 'customData' in data:
+            new_custom_data = data.get('customData') or {}
+            if not isinstance(new_custom_data, dict):
+                conn.close()
+                return jsonify({'success': False, 'error': 'customData doit être un objet'}), 400
             old_custom_data = {}
             if existing.get('custom_data'):
                 try:
@@ -1455,9 +3223,8 @@ def update_item(serial_number):
                 except:
                     pass
             
-            new_custom_data = data.get('customData', {})
-            
             # Comparer chaque champ personnalisé
+            custom_changes = []
             all_custom_keys = set(list(old_custom_data.keys()) + list(new_custom_data.keys()))
             for custom_key in all_custom_keys:
                 old_val = old_custom_data.get(custom_key)
@@ -1467,27 +3234,33 @@ def update_item(serial_number):
                 new_val_str = str(new_val) if new_val is not None else None
                 
                 if old_val_str != new_val_str:
-                    history_entries.append({
-                        'item_serial_number': serial_number,
-                        'field_name': f'custom_{custom_key}',
-                        'old_value': old_val_str,
-                        'new_value': new_val_str,
-                        'changed_at': now
-                    })
+                    custom_changes.append((custom_key, old_val_str, new_val_str))
+            
+            # Valider seulement les valeurs modifiées : une valeur déjà stockée reste
+            # acceptée même si la définition du champ a changé depuis
+            custom_data_error = validate_custom_data({key: new_custom_data[key] for key, _, _ in custom_changes
+                                                      if key in new_custom_data})
+            if custom_data_error:
+                conn.close()
+                return jsonify({'success': False, 'error': custom_data_error}), 400
+            
+            for custom_key, old_val_str, new_val_str in custom_changes:
+                history_entries.append({
+                    'item_serial_number': serial_number,
+                    'field_name': f'custom_{custom_key}',
+                    'old_value': old_val_str,
+                    'new_value': new_val_str,
+                    'changed_at': now
+                })
             
             # Mettre à jour custom_data dans la base
             custom_data_json = json.dumps(new_custom_data) if new_custom_data else None
             update_fields.append('custom_data = ?')
             update_values.append(custom_data_json)
         
-        # Si le serialNumber change, mettre à jour la référence dans l'historique
-        if 'serialNumber' in data and data['serialNumber'] != serial_number:
-            new_serial = data['serialNumber']
-            # Mettre à jour les références dans l'historique
-            cursor.execute('UPDATE item_history SET item_serial_number = ? WHERE item_serial_number = ?', 
-                         (new_serial, serial_number))
-        
+        # L'historique est rattaché à items.id : un changement de numéro de série ne le réécrit pas
         if update_fields:
+            update_fields.append('version = COALESCE(version, 1) + 1')
             update_fields.append('last_updated = ?')
             update_values.append(now)
             update_values.append(serial_number)
@@ -1497,160 +3270,771 @@ def update_item(serial_number):
                 update_values
             )
             
-            # Enregistrer l'historique et créer des notifications
-            item_name = existing['name']
-            for entry in history_entries:
-                cursor.execute('''
-                    INSERT INTO item_history (item_serial_number, field_name, old_value, new_value, changed_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (
-                    entry['item_serial_number'],
-                    entry['field_name'],
-                    entry['old_value'],
-                    entry['new_value'],
-                    entry['changed_at']
-                ))
-                
-                # Créer une notification pour chaque modification
-                field_labels = {
-                    'name': 'Nom',
-                    'quantity': 'Quantité',
-                    'category': 'Catégorie',
-                    'categoryDetails': 'Détails',
-                    'serialNumber': 'Numéro de série',
-                    'scannedCode': 'Code scanné',
-                    'brand': 'Marque',
-                    'model': 'Modèle',
-                    'itemType': 'Type',
-                    'status': 'Statut',
-                    'image': 'Image'
-                }
-                
-                # Gérer les champs personnalisés
-                field_name = entry['field_name']
-                if field_name.startswith('custom_'):
-                    # Récupérer le nom du champ personnalisé depuis la base
-                    custom_key = field_name.replace('custom_', '')
-                    cursor.execute('SELECT name FROM custom_fields WHERE field_key = ?', (custom_key,))
-                    custom_field = cursor.fetchone()
-                    field_label = custom_field['name'] if custom_field else custom_key
-                else:
-                    field_label = field_labels.get(field_name, field_name)
-                
-                # Formater l'heure complète
-                try:
-                    changed_time = datetime.fromisoformat(entry['changed_at'].replace('Z', '+00:00'))
-                    time_str = changed_time.strftime('%H:%M:%S')
-                    date_str = changed_time.strftime('%d/%m/%Y')
-                except:
-                    changed_time = datetime.now()
-                    time_str = changed_time.strftime('%H:%M:%S')
-                    date_str = changed_time.strftime('%d/%m/%Y')
-                
-                old_val_display = entry['old_value'] if entry['old_value'] else 'vide'
-                new_val_display = entry['new_value'] if entry['new_value'] else 'vide'
-                
-                # Formater le message avec tous les détails
-                if field_name == 'quantity':
-                    notification_msg = f'📊 Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {date_str} {time_str}'
-                elif field_name == 'name':
-                    notification_msg = f'✏️ Modification de {field_label} - Item "{old_val_display}" ({serial_number}) -> "{new_val_display}" | {date_str} {time_str}'
-                elif field_name == 'category':
-                    notification_msg = f'🏷️ Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display or "aucune"} -> {new_val_display} | {date_str} {time_str}'
-                elif field_name == 'status':
-                    notification_msg = f'🔄 Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {date_str} {time_str}'
-                elif field_name.startswith('custom_'):
-                    notification_msg = f'📝 Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {date_str} {time_str}'
+            # Enregistrer l'historique en un seul lot
+            cursor.executemany('''
+                INSERT INTO item_history (item_id, item_serial_number, field_name, old_value, new_value, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', [
+                (existing['id'], entry['item_serial_number'], entry['field_name'],
+                 entry['old_value'], entry['new_value'], entry['changed_at'])
+                for entry in history_entries
+            ])
+            
+            # Une seule notification récapitulative par requête
+            if history_entries:
+                custom_labels = get_custom_field_registry()['labels']
+                current_serial = data.get('serialNumber') or serial_number
+                notification_msg = format_item_update_notification(
+                    existing['name'], current_serial, history_entries, custom_labels, now
+                )
+                if len(history_entries) == 1:
+                    entry = history_entries[0]
+                    old_value, new_value = entry['old_value'], entry['new_value']
                 else:
-                    notification_msg = f'✏️ Modification de {field_label} - Item "{item_name}" ({serial_number}) : {old_val_display} -> {new_val_display} | {date_str} {time_str}'
-                
-                create_notification(notification_msg, 'success', serial_number, conn, cursor)
+                    old_value = {entry['field_name']: entry['old_value'] for entry in history_entries}
+                    new_value = {entry['field_name']: entry['new_value'] for entry in history_entries}
+                create_notification(notification_msg, 'success', current_serial, conn, cursor,
+                                    event='item_updated', item_id=existing['id'],
+                                    field=', '.join(entry['field_name'] for entry in history_entries),
+                                    old_value=old_value, new_value=new_value)
         
         conn.commit()
         conn.close()
         
         # Diffuser l'événement à tous les clients
-        broadcast_event('items_changed', {'action': 'updated', 'serialNumber': serial_number})
+        broadcast_event('items_changed', {'action': 'updated', 'id': existing['id'], 'serialNumber': serial_number})
         broadcast_event('notifications_changed', {})
         
         return jsonify({'success': True}), 200
     except Exception as e:
-        print(f'[API] ERREUR PUT /api/items/{serial_number}: {str(e)}')
+        safe_print(f'[API] ERREUR PUT /api/items/{serial_number}: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
+def parse_if_match(header_value):
+    """Extraire la version attendue d'un en-tête If-Match (None si absent ou '*')"""
+    if not header_value:
+        return None
+    value = header_value.strip()
+    if value == '*':
+        return None
+    if value.startswith('W/'):
+        value = value[2:]
+    return int(value.strip('"'))
+
+def item_etag(version):
+    """ETag d'un item à partir de sa version"""
+    return f'"{version or 1}"'
+
+@app.route('/api/items/<int:item_id>', methods=['PATCH'])
+def patch_item(item_id):
+    """Mise à jour partielle d'un item (If-Match pour la concurrence optimiste)"""
+    conn = None
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not data:
+            return jsonify({'success': False, 'error': 'Données JSON invalides'}), 400
+
+        try:
+            expected_version = parse_if_match(request.headers.get('If-Match'))
+        except ValueError:
+            return jsonify({'success': False, 'error': 'En-tête If-Match invalide'}), 400
+
+        unknown_fields = [f for f in data if f not in ITEM_FIELD_MAPPING and f != 'customData']
+        if unknown_fields:
+            return jsonify({'success': False, 'error': f'Champs inconnus: {", ".join(unknown_fields)}'}), 400
+
+        # Sanitization des données (mêmes limites que la création)
+        string_limits = {'name': 200, 'serialNumber': 100, 'brand': 100, 'model': 100, 'category': 50,
+                         'categoryDetails': 1000, 'scannedCode': 100, 'itemType': 50, 'status': 50}
+        for api_field, max_length in string_limits.items():
+            if api_field in data:
+                data[api_field] = sanitize_string(data[api_field], max_length)
+        for api_field in ('name', 'serialNumber'):
+            if api_field in data and not data[api_field]:
+                return jsonify({'success': False, 'error': 'Le nom et le numéro de série sont obligatoires'}), 400
+        if 'quantity' in data:
+            if not validate_positive_number(data['quantity']):
+                return jsonify({'success': False, 'error': 'La quantité doit être un nombre positif'}), 400
+            data['quantity'] = int(data['quantity'])
+        if 'image' in data:
+            data['image'] = process_images_for_storage(data['image'], item_id) if data['image'] else None
+        custom_patch = data.get('customData')
+        if custom_patch is not None and not isinstance(custom_patch, dict):
+            return jsonify({'success': False, 'error': 'customData doit être un objet'}), 400
+        custom_data_error = validate_custom_data(custom_patch)
+        if custom_data_error:
+            return jsonify({'success': False, 'error': custom_data_error}), 400
+
+        now = datetime.now().isoformat()
+        set_clauses = []
+        set_values = []
+        # L'historique est calculé par SQLite (INSERT ... SELECT) : pas d'aller-retour lecture/comparaison
+        history_selects = []
+        history_values = []
+
+        for api_field, db_column in ITEM_FIELD_MAPPING.items():
+            if api_field in data:
+                value = data[api_field]
+                value_str = str(value) if value is not None else None
+                set_clauses.append(f'{db_column} = ?')
+                set_values.append(value)
+                history_selects.append(
+                    f'SELECT id, serial_number, ?, CAST({db_column} AS TEXT), ?, ? FROM items '
+                    f'WHERE id = ? AND CAST({db_column} AS TEXT) IS NOT ?'
+                )
+                history_values.extend([api_field, value_str, now, item_id, value_str])
+
+        if 'customData' in data and custom_patch is None:
+            # Suppression de tous les champs personnalisés : une ligne par clé retirée
+            set_clauses.append('custom_data = NULL')
+            history_selects.append(
+                "SELECT items.id, items.serial_number, 'custom_' || custom.key, CAST(custom.value AS TEXT), NULL, ? "
+                "FROM items, json_each(CASE WHEN json_valid(items.custom_data) THEN items.custom_data END) AS custom "
+                "WHERE items.id = ? AND custom.value IS NOT NULL"
+            )
+            history_values.extend([now, item_id])
+        elif custom_patch:
+            # JSON Merge Patch (RFC 7396) : les clés à null sont supprimées
+            set_clauses.append("custom_data = json_patch(COALESCE(custom_data, '{}'), ?)")
+            set_values.append(json.dumps(custom_patch))
+            for custom_key, value in custom_patch.items():
+                json_path = '$.' + json.dumps(custom_key)
+                value_str = str(value) if value is not None else None
+                history_selects.append(
+                    'SELECT id, serial_number, ?, CAST(json_extract(custom_data, ?) AS TEXT), ?, ? FROM items '
+                    'WHERE id = ? AND CAST(json_extract(custom_data, ?) AS TEXT) IS NOT ?'
+                )
+                history_values.extend([f'custom_{custom_key}', json_path, value_str, now, item_id, json_path, value_str])
+
+        conn = get_db()
+        cursor = conn.cursor()
+
+        # Lignes d'historique insérées = champs dont la valeur a réellement changé
+        history_entries = []
+        if history_selects:
+            cursor.execute(
+                'INSERT INTO item_history (item_id, item_serial_number, field_name, old_value, new_value, changed_at) '
+                + ' UNION ALL '.join(history_selects)
+                + ' RETURNING field_name, old_value, new_value',
+                history_values
+            )
+            history_entries = [dict(entry) for entry in cursor.fetchall()]
+
+        if not history_entries:
+            # Aucun changement effectif : vérifier seulement la précondition
+            cursor.execute('SELECT * FROM items WHERE id = ?', (item_id,))
+            row = cursor.fetchone()
+            conn.close()
+            conn = None
+            if not row:
+                return jsonify({'success': False, 'error': 'Item non trouvé'}), 404
+            if expected_version is not None and (row['version'] or 1) != expected_version:
+                response = jsonify({'success': False, 'error': 'Version obsolète', 'currentVersion': row['version'] or 1})
+                response.headers['ETag'] = item_etag(row['version'])
+                return response, 412
+            response = jsonify({'success': True, 'changed': False, 'item': format_item(dict(row))})
+            response.headers['ETag'] = item_etag(row['version'])
+            return response, 200
+
+        sql = f'UPDATE items SET {", ".join(set_clauses)}, version = COALESCE(version, 1) + 1, last_updated = ? WHERE id = ?'
+        params = set_values + [now, item_id]
+        if expected_version is not None:
+            sql += ' AND COALESCE(version, 1) = ?'
+            params.append(expected_version)
+        cursor.execute(sql + ' RETURNING *', params)
+        row = cursor.fetchone()
+
+        if not row:
+            conn.rollback()
+            cursor.execute('SELECT version FROM items WHERE id = ?', (item_id,))
+            current = cursor.fetchone()
+            conn.close()
+            conn = None
+            if not current:
+                return jsonify({'success': False, 'error': 'Item non trouvé'}), 404
+            response = jsonify({'success': False, 'error': 'Version obsolète', 'currentVersion': current['version'] or 1})
+            response.headers['ETag'] = item_etag(current['version'])
+            return response, 412
+
+        item = format_item(dict(row))
+
+        # Notification limitée aux champs modifiés (comme PUT), pas à toutes les clés envoyées
+        custom_labels = get_custom_field_registry()['labels']
+        notification_msg = format_item_update_notification(
+            item['name'], item['serialNumber'], history_entries, custom_labels, now
+        )
+        if len(history_entries) == 1:
+            old_value, new_value = history_entries[0]['old_value'], history_entries[0]['new_value']
+        else:
+            old_value = {entry['field_name']: entry['old_value'] for entry in history_entries}
+            new_value = {entry['field_name']: entry['new_value'] for entry in history_entries}
+        changed_fields = ', '.join(entry['field_name'] for entry in history_entries)
+        create_notification(notification_msg, 'success', item['serialNumber'], conn, cursor,
+                            event='item_updated', item_id=item_id, field=changed_fields,
+                            old_value=old_value, new_value=new_value)
+
+        conn.commit()
+        conn.close()
+        conn = None
+
+        broadcast_event('items_changed', {'action': 'updated', 'id': item_id, 'serialNumber': item['serialNumber']})
+        broadcast_event('notifications_changed', {})
+
+        response = jsonify({'success': True, 'changed': True, 'item': item})
+        response.headers['ETag'] = item_etag(item['version'])
+        return response, 200
+    except sqlite3.IntegrityError:
+        if conn:
+            conn.rollback()
+            conn.close()
+        return jsonify({'success': False, 'error': 'Ce numéro de série existe déjà'}), 409
+    except Exception as e:
+        if conn:
+            try:
+                conn.rollback()
+                conn.close()
+            except Exception:
+                pass
+        safe_print(f'[API] ERREUR PATCH /api/items/{item_id}: {str(e)}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
+# ==================== API ACTIONS GROUPÉES ====================
+
+# Champs modifiables en masse (le numéro de série, unique par item, est exclu)
+BULK_UPDATE_FIELDS = {
+    'name': 'name',
+    'quantity': 'quantity',
+    'category': 'category',
+    'categoryDetails': 'category_details',
+    'brand': 'brand',
+    'model': 'model',
+    'itemType': 'item_type',
+    'status': 'status'
+}
+
+# Nombre maximal d'items par requête groupée
+BULK_MAX_ITEMS = 5000
+
+# Taille des lots pour les clauses IN (limite de variables SQLite)
+SQL_IN_CHUNK_SIZE = 500
+
+def chunked(values, size=SQL_IN_CHUNK_SIZE):
+    """Découper une liste en lots de taille fixe"""
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+def parse_bulk_ids(data):
+    """Extraire et valider la liste d'IDs d'une requête groupée (retourne ids, erreur)"""
+    raw_ids = data.get('ids')
+    if not isinstance(raw_ids, list) or len(raw_ids) == 0:
+        return None, 'Le champ ids doit être une liste non vide'
+    ids = []
+    seen = set()
+    for raw_id in raw_ids:
+        try:
+            item_id = int(raw_id)
+        except (TypeError, ValueError):
+            return None, f'ID invalide: {raw_id}'
+        if item_id not in seen:
+            seen.add(item_id)
+            ids.append(item_id)
+    if len(ids) > BULK_MAX_ITEMS:
+        return None, f'Maximum {BULK_MAX_ITEMS} items par requête'
+    return ids, None
+
+@app.route('/api/items/bulk-update', methods=['POST'])
+def bulk_update_items():
+    """Appliquer un même jeu de modifications à plusieurs items (une seule transaction)"""
+    conn = None
+    try:
+        data = request.get_json() or {}
+        ids, error = parse_bulk_ids(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+
+        changes = data.get('changes')
+        if not isinstance(changes, dict) or not changes:
+            return jsonify({'success': False, 'error': 'Aucune modification fournie'}), 400
+
+        unknown_fields = [f for f in changes if f not in BULK_UPDATE_FIELDS]
+        if unknown_fields:
+            return jsonify({'success': False, 'error': f'Champs non modifiables en masse: {", ".join(unknown_fields)}'}), 400
+
+        # Sanitization des valeurs (mêmes limites que la création)
+        string_limits = {'name': 200, 'brand': 100, 'model': 100, 'category': 50, 'categoryDetails': 1000, 'itemType': 50, 'status': 50}
+        for api_field, max_length in string_limits.items():
+            if api_field in changes:
+                changes[api_field] = sanitize_string(changes[api_field], max_length)
+        if 'name' in changes and not changes['name']:
+            return jsonify({'success': False, 'error': 'Le nom ne peut pas être vide'}), 400
+        if 'quantity' in changes:
+            if not validate_positive_number(changes['quantity']):
+                return jsonify({'success': False, 'error': 'La quantité doit être un nombre positif'}), 400
+            changes['quantity'] = int(changes['quantity'])
+
+        columns = [BULK_UPDATE_FIELDS[f] for f in changes]
+        now = datetime.now().isoformat()
+        conn = get_db()
+        cursor = conn.cursor()
+
+        # Lire les valeurs actuelles en une requête par lot (pour l'historique)
+        rows = []
+        for chunk in chunked(ids):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(
+                f'SELECT id, serial_number, {", ".join(columns)} FROM items WHERE id IN ({placeholders})',
+                chunk
+            )
+            rows.extend(cursor.fetchall())
+
+        found_ids = {row['id'] for row in rows}
+        not_found = [item_id for item_id in ids if item_id not in found_ids]
+
+        history_rows = []
+        changed_ids = []
+        for row in rows:
+            row_changed = False
+            for api_field, new_value in changes.items():
+                old_value = row[BULK_UPDATE_FIELDS[api_field]]
+                old_val_str = str(old_value) if old_value is not None else None
+                new_val_str = str(new_value) if new_value is not None else None
+                if old_val_str != new_val_str:
+                    row_changed = True
+                    history_rows.append((row['id'], row['serial_number'], api_field, old_val_str, new_val_str, now))
+            if row_changed:
+                changed_ids.append(row['id'])
+
+        if changed_ids:
+            set_clause = ', '.join(f'{column} = ?' for column in columns)
+            values = list(changes.values())
+            for chunk in chunked(changed_ids):
+                placeholders = ', '.join('?' * len(chunk))
+                cursor.execute(
+                    f'UPDATE items SET {set_clause}, last_updated = ?, version = COALESCE(version, 1) + 1 WHERE id IN ({placeholders})',
+                    values + [now] + chunk
+                )
+
+            cursor.executemany('''
+                INSERT INTO item_history (item_id, item_serial_number, field_name, old_value, new_value, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', history_rows)
+
+            # Une seule notification récapitulative
+            now_dt = datetime.now()
+            time_str = now_dt.strftime('%H:%M:%S')
+            date_str = now_dt.strftime('%d/%m/%Y')
+            changes_str = ', '.join(f'{f} -> {v if v not in (None, "") else "vide"}' for f, v in changes.items())
+            create_notification(
+                f'✏️ Modification groupée - {len(changed_ids)} item(s) : {changes_str} | {date_str} {time_str}',
+                'success',
+                None,
+                conn,
+                cursor,
+                event='items_bulk_updated',
+                field=', '.join(changes),
+                new_value=changes
+            )
+
+        conn.commit()
+        conn.close()
+        conn = None
+
+        if changed_ids:
+            broadcast_event('items_changed', {'action': 'bulk_updated', 'ids': changed_ids})
+            broadcast_event('notifications_changed', {})
+
+        safe_print(f'[API] POST /api/items/bulk-update - {len(changed_ids)}/{len(ids)} item(s) modifié(s)')
+        return jsonify({
+            'success': True,
+            'updated': len(changed_ids),
+            'unchanged': len(rows) - len(changed_ids),
+            'notFound': not_found
+        }), 200
+    except Exception as e:
+        if conn:
+            try:
+                conn.rollback()
+                conn.close()
+            except Exception:
+                pass
+        safe_print(f'[API] ERREUR POST /api/items/bulk-update: {str(e)}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
+@app.route('/api/items/bulk-delete', methods=['POST'])
+def bulk_delete_items():
+    """Supprimer plusieurs items en une seule transaction"""
+    conn = None
+    try:
+        data = request.get_json() or {}
+        ids, error = parse_bulk_ids(data)
+        if error:
+            return jsonify({'success': False, 'error': error}), 400
+
+        conn = get_db()
+        cursor = conn.cursor()
+
+        deleted_ids = []
+        for chunk in chunked(ids):
+            placeholders = ', '.join('?' * len(chunk))
+            cursor.execute(f'SELECT id FROM items WHERE id IN ({placeholders})', chunk)
+            deleted_ids.extend(row['id'] for row in cursor.fetchall())
+            cursor.execute(f'DELETE FROM items WHERE id IN ({placeholders})', chunk)
+
+        not_found = sorted(set(ids) - set(deleted_ids))
+
+        if deleted_ids:
+            now_dt = datetime.now()
+            time_str = now_dt.strftime('%H:%M:%S')
+            date_str = now_dt.strftime('%d/%m/%Y')
+            create_notification(
+                f'🗑️ Suppression groupée - {len(deleted_ids)} article(s) supprimé(s) | {date_str} {time_str}',
+                'success',
+                None,
+                conn,
+                cursor,
+                event='items_bulk_deleted',
+                old_value=len(deleted_ids)
+            )
+
+        conn.commit()
+        conn.close()
+        conn = None
+
+        if deleted_ids:
+            broadcast_event('items_changed', {'action': 'bulk_deleted', 'ids': deleted_ids})
+            broadcast_event('notifications_changed', {})
+
+        safe_print(f'[API] POST /api/items/bulk-delete - {len(deleted_ids)}/{len(ids)} item(s) supprimé(s)')
+        return jsonify({'success': True, 'deleted': len(deleted_ids), 'notFound': not_found}), 200
+    except Exception as e:
+        if conn:
+            try:
+                conn.rollback()
+                conn.close()
+            except Exception:
+                pass
+        safe_print(f'[API] ERREUR POST /api/items/bulk-delete: {str(e)}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
 @app.route('/api/events', methods=['GET'])
 def stream_events():
-    """Stream Server-Sent Events pour la synchronisation en temps réel"""
-    def event_stream():
-        # Créer une queue pour ce client (taille limitée pour éviter l'accumulation)
-        client_queue = queue.Queue(maxsize=10)
-        
-        with clients_lock:
-            clients.append(client_queue)
-            client_count = len(clients)
-        
-        print(f'[SSE] Client connected. Total: {client_count}')
+    """Stream Server-Sent Events pour la synchronisation en temps réel
+    
+    Un client qui se reconnecte avec Last-Event-ID (en-tête ou paramètre lastEventId)
+    reçoit les événements manqués ; s'ils ne sont plus dans le tampon, un événement
+    'resync' lui demande de recharger ses données.
+    
+    Paramètres optionnels : topics (items, rentals, categories, custom_fields,
+    notifications) et itemIds (ne recevoir les items_changed que pour ces items).
+    """
+    try:
+        subscription = parse_sse_subscription(request.args.get('topics'), request.args.get('itemIds'))
+    except ValueError as ve:
+        return jsonify({'success': False, 'error': str(ve)}), 400
+    requested_seq = parse_last_event_id(request.headers.get('Last-Event-ID') or request.args.get('lastEventId'))
+    current_seq = acquire_sse_slot()
+    if current_seq is None:
+        response = jsonify({'success': False, 'error': 'Trop de connexions temps réel'})
+        response.headers['Retry-After'] = str(SSE_RETRY_MS // 1000 * 10)
+        return response, 503
+    
+    def event_stream():
+        safe_print(f'[SSE] Client connected. Total: {sse_client_count}')
         
         try:
-            # Envoyer un message de connexion
-            yield f"data: {json.dumps({'type': 'connected', 'data': {}})}\n\n"
+            last_seq, prelude = sse_stream_start(requested_seq, current_seq)
+            sent_seq = last_seq
+            yield prelude
             
             # Garder la connexion ouverte et envoyer les événements
             while True:
-                try:
-                    # Attendre un événement avec timeout pour vérifier la connexion
-                    message = client_queue.get(timeout=30)
-                    yield message
-                except queue.Empty:
+                messages, last_seq, wakeup, gap = read_events_since(last_seq, subscription)
+                if gap:
+                    yield format_sse_message('resync', {'reason': 'events_dropped'})
+                if messages:
+                    sent_seq = last_seq
+                    yield ''.join(messages)
+                    continue
+                # Attendre un événement avec timeout pour vérifier la connexion
+                if not wakeup.wait(timeout=SSE_KEEPALIVE_SECONDS):
                     # Envoyer un keepalive pour maintenir la connexion
-                    yield ": keepalive\n\n"
+                    yield sse_keepalive(last_seq, sent_seq)
+                    sent_seq = last_seq
         except GeneratorExit:
             # Client déconnecté
             pass
-        finally:
-            # Retirer le client de la liste
-            with clients_lock:
-                if client_queue in clients:
-                    clients.remove(client_queue)
-                client_count = len(clients)
-            
-            print(f'[SSE] Client disconnected. Remaining: {client_count}')
     
-    return Response(event_stream(), mimetype='text/event-stream', headers={
+    def release_slot():
+        client_count = release_sse_slot()
+        safe_print(f'[SSE] Client disconnected. Remaining: {client_count}')
+    
+    response = Response(event_stream(), mimetype='text/event-stream', headers={
         'Cache-Control': 'no-cache',
         'X-Accel-Buffering': 'no',
         'Connection': 'keep-alive'
     })
+    # Libérer la place à la fermeture de la réponse, que le flux ait démarré ou non
+    # (requête HEAD, client parti avant le premier envoi)
+    response.call_on_close(release_slot)
+    return response
+
+# ==================== SSE ASGI (asyncio) ====================
+# Avec un serveur ASGI (uvicorn server:asgi_app, ou USE_ASGI=true python server.py),
+# /api/events est servi par la boucle asyncio : une connexion inactive ne coûte
+# qu'une coroutine, pas un thread WSGI. Le reste de l'API passe par Flask dans un
+# pool de threads (a2wsgi).
+SSE_HEARTBEAT_SECONDS = int(os.environ.get('SSE_HEARTBEAT_SECONDS', 15))
+WSGI_THREADS = int(os.environ.get('WSGI_THREADS', 16))
+
+_async_wakeups = {}  # boucle asyncio -> {types suivis: asyncio.Event courant} (pas un par client)
+_async_wakeups_lock = threading.Lock()
+_flask_asgi = None
+
+def _rotate_async_wakeup(loop, event_type):
+    """(Dans la boucle) réveiller les flux qui suivent ce type et préparer l'événement suivant"""
+    wakeups = []
+    with _async_wakeups_lock:
+        loop_wakeups = _async_wakeups.setdefault(loop, {})
+        for key in list(loop_wakeups):
+            if key is None or event_type in key:
+                wakeups.append(loop_wakeups[key])
+                loop_wakeups[key] = asyncio.Event()
+    for wakeup in wakeups:
+        wakeup.set()
+
+def get_async_wakeup(loop, event_types):
+    """(Dans la boucle) événement de réveil courant d'un ensemble de types suivis"""
+    with _async_wakeups_lock:
+        loop_wakeups = _async_wakeups.setdefault(loop, {})
+        wakeup = loop_wakeups.get(event_types)
+        if wakeup is None:
+            wakeup = loop_wakeups[event_types] = asyncio.Event()
+        return wakeup
+
+def notify_async_waiters(event_type):
+    """Réveiller les flux SSE asyncio (appelable depuis n'importe quel thread)"""
+    with _async_wakeups_lock:
+        loops = list(_async_wakeups)
+    for loop in loops:
+        try:
+            loop.call_soon_threadsafe(_rotate_async_wakeup, loop, event_type)
+        except RuntimeError:
+            # Boucle fermée
+            with _async_wakeups_lock:
+                _async_wakeups.pop(loop, None)
+
+def _sse_cors_headers(request_headers):
+    """En-têtes CORS du flux ASGI (flask-cors ne s'applique pas hors de Flask)"""
+    origin = request_headers.get('origin')
+    if '*' in CORS_ORIGINS_LIST:
+        return [(b'access-control-allow-origin', b'*')]
+    if origin and origin in CORS_ORIGINS_LIST:
+        return [(b'access-control-allow-origin', origin.encode('latin-1')), (b'vary', b'Origin')]
+    return []
+
+async def _wait_for_disconnect(receive):
+    """Attendre la déconnexion du client"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+async def sse_asgi_stream(scope, receive, send):
+    """Flux SSE asyncio (mêmes messages, ids et relecture que la route Flask)"""
+    request_headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+    query = urllib.parse.parse_qs(scope.get('query_string', b'').decode('latin-1'))
+    requested_seq = parse_last_event_id(request_headers.get('last-event-id') or (query.get('lastEventId') or [None])[0])
+    cors_headers = _sse_cors_headers(request_headers)
+    
+    try:
+        subscription = parse_sse_subscription((query.get('topics') or [None])[0], (query.get('itemIds') or [None])[0])
+    except ValueError as ve:
+        await send({'type': 'http.response.start', 'status': 400, 'headers': [
+            (b'content-type', b'application/json'),
+            *cors_headers
+        ]})
+        await send({'type': 'http.response.body', 'body': json.dumps({'success': False, 'error': str(ve)}).encode('utf-8')})
+        return
+    
+    current_seq = acquire_sse_slot()
+    if current_seq is None:
+        body = json.dumps({'success': False, 'error': 'Trop de connexions temps réel'}).encode('utf-8')
+        await send({'type': 'http.response.start', 'status': 503, 'headers': [
+            (b'content-type', b'application/json'),
+            (b'retry-after', str(SSE_RETRY_MS // 1000 * 10).encode('ascii')),
+            *cors_headers
+        ]})
+        await send({'type': 'http.response.body', 'body': body})
+        return
+    
+    loop = asyncio.get_running_loop()
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(receive))
+    safe_print(f'[SSE] Client connected (asyncio). Total: {sse_client_count}')
+    try:
+        await send({'type': 'http.response.start', 'status': 200, 'headers': [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+            *cors_headers
+        ]})
+        last_seq, prelude = sse_stream_start(requested_seq, current_seq)
+        sent_seq = last_seq
+        await send({'type': 'http.response.body', 'body': prelude.encode('utf-8'), 'more_body': True})
+        
+        while not disconnect.done():
+            # Prendre l'événement de réveil avant de lire le tampon (aucun réveil perdu)
+            wakeup = get_async_wakeup(loop, subscription[0])
+            messages, last_seq, _, gap = read_events_since(last_seq, subscription)
+            chunk = format_sse_message('resync', {'reason': 'events_dropped'}) if gap else ''
+            if messages:
+                sent_seq = last_seq
+                chunk += ''.join(messages)
+            if chunk:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+                continue
+            waiter = asyncio.ensure_future(wakeup.wait())
+            done, _ = await asyncio.wait({waiter, disconnect}, timeout=SSE_HEARTBEAT_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if not waiter.done():
+                waiter.cancel()
+            if not done:
+                keepalive = sse_keepalive(last_seq, sent_seq)
+                sent_seq = last_seq
+                await send({'type': 'http.response.body', 'body': keepalive.encode('utf-8'), 'more_body': True})
+    except (OSError, asyncio.CancelledError):
+        # Client déconnecté pendant l'envoi / arrêt du serveur
+        pass
+    finally:
+        disconnect.cancel()
+        client_count = release_sse_slot()
+        safe_print(f'[SSE] Client disconnected (asyncio). Remaining: {client_count}')
+
+async def asgi_app(scope, receive, send):
+    """Application ASGI : /api/events en asyncio, tout le reste via Flask"""
+    global _flask_asgi
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Initialisation (si elle n'a pas déjà été faite par __main__ ; un worker
+                # du serveur de production trouve la base préparée par le superviseur)
+                if BOOT_READY_SECONDS is None:
+                    boot = run_worker_boot if os.environ.get(SUPERVISOR_BOOT_ENV) else run_boot_sequence
+                    await asyncio.get_running_loop().run_in_executor(None, boot)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+    if scope['type'] == 'http' and scope['path'] == '/api/events' and scope['method'] == 'GET':
+        await sse_asgi_stream(scope, receive, send)
+        return
+    if _flask_asgi is None:
+        from a2wsgi import WSGIMiddleware
+        _flask_asgi = WSGIMiddleware(app, workers=WSGI_THREADS)
+    await _flask_asgi(scope, receive, send)
+
+# Pagination par curseur (clé de tri + id, encodés en base64 URL-safe)
+HISTORY_DEFAULT_LIMIT = 10
+HISTORY_MAX_LIMIT = 200
+
+def encode_cursor(sort_value, row_id):
+    """Encoder un curseur de pagination opaque"""
+    raw = f'{sort_value}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor_value):
+    """Décoder un curseur de pagination (retourne sort_value, row_id ; ValueError si invalide)"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor_value.encode('ascii')).decode('utf-8')
+        sort_value, row_id = raw.rsplit('|', 1)
+        return sort_value, int(row_id)
+    except Exception:
+        raise ValueError('Curseur invalide')
+
+def parse_limit(value, default, maximum):
+    """Lire un paramètre limit borné (ValueError si invalide)"""
+    if value is None or value == '':
+        return default
+    limit = int(value)
+    if limit <= 0:
+        raise ValueError('limit doit être positif')
+    return min(limit, maximum)
+
+def format_history_row(row):
+    """Convertir une ligne item_history en objet API"""
+    return {
+        'id': row['id'],
+        'fieldName': row['field_name'],
+        'oldValue': row['old_value'],
+        'newValue': row['new_value'],
+        'changedAt': row['changed_at']
+    }
 
 @app.route('/api/items/<serial_number>/history', methods=['GET'])
 def get_item_history(serial_number):
-    """Récupérer l'historique des modifications d'un item"""
+    """Récupérer l'historique des modifications d'un item (paginé par curseur)
+
+    Paramètres : limit, cursor (nextCursor de la page précédente), fields (liste séparée par des virgules)
+    """
+    conn = None
     try:
+        try:
+            limit = parse_limit(request.args.get('limit'), HISTORY_DEFAULT_LIMIT, HISTORY_MAX_LIMIT)
+            cursor_value = request.args.get('cursor')
+            after = decode_cursor(cursor_value) if cursor_value else None
+        except ValueError as ve:
+            return jsonify({'success': False, 'error': str(ve)}), 400
+        fields = [f.strip() for f in request.args.get('fields', '').split(',') if f.strip()]
+
         conn = get_db()
         cursor = conn.cursor()
-        
-        cursor.execute('''
-            SELECT field_name, old_value, new_value, changed_at
+
+        cursor.execute('SELECT id FROM items WHERE serial_number = ?', (serial_number,))
+        item_row = cursor.fetchone()
+        if not item_row:
+            conn.close()
+            return jsonify({'success': True, 'history': [], 'nextCursor': None}), 200
+
+        # Parcours de l'index (item_id, changed_at) dans l'ordre décroissant
+        where = ['item_id = ?']
+        params = [item_row['id']]
+        if fields:
+            where.append(f'field_name IN ({", ".join("?" * len(fields))})')
+            params.extend(fields)
+        if after:
+            where.append('(changed_at < ? OR (changed_at = ? AND id < ?))')
+            params.extend([after[0], after[0], after[1]])
+        params.append(limit + 1)
+
+        cursor.execute(f'''
+            SELECT id, field_name, old_value, new_value, changed_at
             FROM item_history
-            WHERE item_serial_number = ?
-            ORDER BY changed_at DESC
-            LIMIT 10
-        ''', (serial_number,))
-        
+            WHERE {' AND '.join(where)}
+            ORDER BY changed_at DESC, id DESC
+            LIMIT ?
+        ''', params)
+
         rows = cursor.fetchall()
-        history = [{
-            'fieldName': row['field_name'],
-            'oldValue': row['old_value'],
-            'newValue': row['new_value'],
-            'changedAt': row['changed_at']
-        } for row in rows]
-        
         conn.close()
-        return jsonify({'success': True, 'history': history}), 200
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        history = [format_history_row(row) for row in rows]
+        next_cursor = encode_cursor(rows[-1]['changed_at'], rows[-1]['id']) if has_more else None
+
+        return jsonify({'success': True, 'history': history, 'nextCursor': next_cursor}), 200
     except Exception as e:
-        print(f'[API] ERREUR GET /api/items/{serial_number}/history: {str(e)}')
+        if conn:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        safe_print(f'[API] ERREUR GET /api/items/{serial_number}/history: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/items/delete-all', methods=['POST'])
@@ -1686,23 +4070,25 @@ def delete_all_items():
             'warning',
             None,
             conn,
-            cursor
+            cursor,
+            event='items_cleared',
+            old_value=item_count
         )
         
         conn.commit()
         conn.close()
         
         # Broadcaster la suppression
-        broadcast_sse_event('items_changed', {
+        broadcast_event('items_changed', {
             'action': 'all_deleted',
             'count': item_count
         })
-        broadcast_sse_event('notifications_changed', {})
+        broadcast_event('notifications_changed', {})
         
         return jsonify({'success': True, 'count': item_count})
         
     except Exception as e:
-        print(f'[API] ERREUR DELETE /api/items/delete-all: {str(e)}')
+        safe_print(f'[API] ERREUR DELETE /api/items/delete-all: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/items/<path:serial_number>', methods=['DELETE'])
@@ -1716,9 +4102,10 @@ def delete_item(serial_number):
         cursor = conn.cursor()
         
         # Récupérer le nom de l'item avant suppression
-        cursor.execute('SELECT name FROM items WHERE serial_number = ?', (serial_number,))
+        cursor.execute('SELECT id, name FROM items WHERE serial_number = ?', (serial_number,))
         item = cursor.fetchone()
         item_name = item['name'] if item else 'Item'
+        item_id = item['id'] if item else None
         
         cursor.execute('DELETE FROM items WHERE serial_number = ?', (serial_number,))
         
@@ -1739,20 +4126,184 @@ def delete_item(serial_number):
             'success',
             serial_number,
             conn,
-            cursor
+            cursor,
+            event='item_deleted',
+            item_id=item_id,
+            old_value=item_name
         )
         
         conn.commit()
         conn.close()
         
         # Diffuser l'événement à tous les clients
-        broadcast_event('items_changed', {'action': 'deleted', 'serialNumber': serial_number})
+        broadcast_event('items_changed', {'action': 'deleted', 'id': item_id, 'serialNumber': serial_number})
         broadcast_event('notifications_changed', {})
         
         return jsonify({'success': True}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
+# ==================== API JOURNAL D'AUDIT ====================
+
+AUDIT_MAX_LIMIT = 1000
+AUDIT_EXPORT_BATCH_SIZE = 500
+AUDIT_CSV_COLUMNS = ['id', 'changedAt', 'itemId', 'serialNumber', 'itemName', 'fieldName', 'oldValue', 'newValue']
+
+def build_audit_query(args):
+    """Construire la clause WHERE du journal d'audit à partir des paramètres (ValueError si invalide)"""
+    where = []
+    params = []
+
+    for arg_name, operator in (('from', '>='), ('to', '<')):
+        value = args.get(arg_name)
+        if value:
+            # Valider le format ISO (les dates sont stockées en isoformat, comparables en texte)
+            datetime.fromisoformat(value.replace('Z', '+00:00'))
+            where.append(f'h.changed_at {operator} ?')
+            params.append(value)
+
+    fields = [f.strip() for f in args.get('fields', '').split(',') if f.strip()]
+    if fields:
+        where.append(f'h.field_name IN ({", ".join("?" * len(fields))})')
+        params.extend(fields)
+
+    item_ids = [i.strip() for i in args.get('itemIds', '').split(',') if i.strip()]
+    if item_ids:
+        where.append(f'h.item_id IN ({", ".join("?" * len(item_ids))})')
+        params.extend(int(i) for i in item_ids)
+
+    serial_number = args.get('serialNumber')
+    if serial_number:
+        # L'historique est rattaché à items.id (le numéro stocké n'est pas réécrit au
+        # renommage) : numéro actuel de l'item, ou numéro stocké pour un item supprimé
+        where.append('(h.item_id IN (SELECT id FROM items WHERE serial_number = ?) '
+                     'OR (i.id IS NULL AND h.item_serial_number = ?))')
+        params.extend([serial_number, serial_number])
+
+    return where, params
+
+def format_audit_row(row):
+    """Convertir une ligne du journal d'audit en objet API"""
+    return {
+        'id': row['id'],
+        'changedAt': row['changed_at'],
+        'itemId': row['item_id'],
+        'serialNumber': row['item_serial_number'],
+        'itemName': row['item_name'],
+        'fieldName': row['field_name'],
+        'oldValue': row['old_value'],
+        'newValue': row['new_value']
+    }
+
+AUDIT_SELECT_SQL = '''
+    SELECT h.id, h.changed_at, h.item_id, COALESCE(i.serial_number, h.item_serial_number) AS item_serial_number,
+           i.name AS item_name,
+           h.field_name, h.old_value, h.new_value
+    FROM item_history h
+    LEFT JOIN items i ON i.id = h.item_id
+'''
+
+@app.route('/api/audit', methods=['GET'])
+def get_audit_log():
+    """Journal d'audit global des modifications d'items
+
+    Filtres : from, to (ISO 8601), fields, itemIds, serialNumber
+    Formats : json (paginé : limit, cursor), jsonl ou csv (export en streaming)
+    """
+    try:
+        where, params = build_audit_query(request.args)
+        export_format = request.args.get('format', 'json').lower()
+        if export_format not in ('json', 'jsonl', 'csv'):
+            return jsonify({'success': False, 'error': 'Format invalide (json, jsonl ou csv)'}), 400
+
+        if export_format == 'json':
+            limit = parse_limit(request.args.get('limit'), 100, AUDIT_MAX_LIMIT)
+            cursor_value = request.args.get('cursor')
+            if cursor_value:
+                after_changed_at, after_id = decode_cursor(cursor_value)
+                where.append('(h.changed_at < ? OR (h.changed_at = ? AND h.id < ?))')
+                params.extend([after_changed_at, after_changed_at, after_id])
+    except ValueError as ve:
+        return jsonify({'success': False, 'error': sanitize_error(ve)}), 400
+
+    where_sql = f'WHERE {" AND ".join(where)}' if where else ''
+    sql = f'{AUDIT_SELECT_SQL} {where_sql} ORDER BY h.changed_at DESC, h.id DESC'
+
+    if export_format == 'json':
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            cursor.execute(f'{sql} LIMIT ?', params + [limit + 1])
+            rows = cursor.fetchall()
+            conn.close()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['changed_at'], rows[-1]['id']) if has_more else None
+            return jsonify({
+                'success': True,
+                'entries': [format_audit_row(row) for row in rows],
+                'nextCursor': next_cursor
+            }), 200
+        except Exception as e:
+            if conn:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            safe_print(f'[API] ERREUR GET /api/audit: {str(e)}')
+            return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
+    def read_export_batch(after):
+        """Un lot du journal après la position (changed_at, id), lu sur une connexion fermée aussitôt"""
+        batch_where, batch_params = list(where), list(params)
+        if after:
+            batch_where.append('(h.changed_at < ? OR (h.changed_at = ? AND h.id < ?))')
+            batch_params.extend([after[0], after[0], after[1]])
+        batch_where_sql = f'WHERE {" AND ".join(batch_where)}' if batch_where else ''
+        conn = get_db()
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f'{AUDIT_SELECT_SQL} {batch_where_sql} ORDER BY h.changed_at DESC, h.id DESC LIMIT ?',
+                           batch_params + [AUDIT_EXPORT_BATCH_SIZE])
+            return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def generate_export():
+        """Émettre le journal par lots paginés (changed_at, id) : aucune lecture n'est ouverte
+        pendant l'envoi au client, les écritures ne sont donc pas bloquées (journal rollback)"""
+        if export_format == 'csv':
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(AUDIT_CSV_COLUMNS)
+            yield buffer.getvalue()
+        after = None
+        while True:
+            rows = read_export_batch(after)
+            if not rows:
+                break
+            after = (rows[-1]['changed_at'], rows[-1]['id'])
+            if export_format == 'csv':
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                for row in rows:
+                    entry = format_audit_row(row)
+                    writer.writerow([entry[col] for col in AUDIT_CSV_COLUMNS])
+                yield buffer.getvalue()
+            else:
+                yield ''.join(json.dumps(format_audit_row(row), ensure_ascii=False) + '\n' for row in rows)
+            if len(rows) < AUDIT_EXPORT_BATCH_SIZE:
+                break
+
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(generate_export(), mimetype=mimetype, headers={
+        'Content-Disposition': f'attachment; filename=audit_{timestamp}.{export_format}',
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 # ==================== API GROUPES/HIÉRARCHIE D'ITEMS ====================
 
 @app.route('/api/items/<int:item_id>/set-parent', methods=['POST'])
@@ -1806,7 +4357,7 @@ def set_item_parent(item_id):
         return jsonify({'success': True}), 200
         
     except Exception as e:
-        print(f'[API] ERREUR POST /api/items/{item_id}/set-parent: {str(e)}')
+        safe_print(f'[API] ERREUR POST /api/items/{item_id}/set-parent: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -1833,7 +4384,7 @@ def remove_item_parent(item_id):
         return jsonify({'success': True}), 200
         
     except Exception as e:
-        print(f'[API] ERREUR POST /api/items/{item_id}/remove-parent: {str(e)}')
+        safe_print(f'[API] ERREUR POST /api/items/{item_id}/remove-parent: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/items/reorder-hierarchy', methods=['POST'])
@@ -1867,7 +4418,7 @@ def reorder_item_hierarchy():
         return jsonify({'success': True}), 200
         
     except Exception as e:
-        print(f'[API] ERREUR POST /api/items/reorder-hierarchy: {str(e)}')
+        safe_print(f'[API] ERREUR POST /api/items/reorder-hierarchy: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -1943,7 +4494,8 @@ def create_category():
         )
         
         # Créer une notification
-        create_notification(f'Catégorie "{category_name}" ajoutée', 'success', None, conn, cursor)
+        create_notification(f'Catégorie "{category_name}" ajoutée', 'success', None, conn, cursor,
+                            event='category_created', field='category', new_value=category_name)
         
         conn.commit()
         conn.close()
@@ -1975,14 +4527,15 @@ def delete_category(category_name):
         cursor.execute('DELETE FROM custom_categories WHERE name = ?', (category_name,))
         
         cursor.execute(
-            'UPDATE items SET category = ?, last_updated = ? WHERE category = ?',
+            'UPDATE items SET category = ?, last_updated = ?, version = COALESCE(version, 1) + 1 WHERE category = ?',
             ('autre', datetime.now().isoformat(), category_name)
         )
         
         updated_count = cursor.rowcount
         
         # Créer une notification
-        create_notification(f'Catégorie "{category_name}" supprimée. {updated_count} item(s) mis à jour.', 'success', None, conn, cursor)
+        create_notification(f'Catégorie "{category_name}" supprimée. {updated_count} item(s) mis à jour.', 'success', None, conn, cursor,
+                            event='category_deleted', field='category', old_value=category_name)
         
         conn.commit()
         conn.close()
@@ -2001,35 +4554,132 @@ def delete_category(category_name):
 
 # ==================== API CUSTOM FIELDS (Colonnes personnalisées) ====================
 
-@app.route('/api/custom-fields', methods=['GET'])
-def get_custom_fields():
-    """Récupérer tous les champs personnalisés"""
+# Registre en mémoire des champs personnalisés : rechargé paresseusement après chaque
+# invalidation (POST/PUT/DELETE /api/custom-fields) et partagé par les handlers.
+# L'invalidation est locale au processus.
+_custom_field_registry = None
+_custom_field_registry_version = 1
+_custom_field_registry_lock = threading.Lock()
+
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+def _build_custom_field_validator(field_type, options):
+    """Construire le validateur d'un champ (retourne un message d'erreur ou None)"""
+    def validate(value):
+        if value is None or value == '':
+            return None
+        if field_type == 'number':
+            if isinstance(value, bool):
+                return 'nombre attendu'
+            try:
+                float(value)
+            except (TypeError, ValueError):
+                return 'nombre attendu'
+        elif field_type == 'date':
+            try:
+                datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+            except ValueError:
+                return 'date ISO attendue (AAAA-MM-JJ)'
+        elif field_type == 'checkbox':
+            if not isinstance(value, bool) and str(value).lower() not in ('true', 'false', '1', '0'):
+                return 'booléen attendu'
+        elif field_type == 'select':
+            if options and str(value) not in [str(o) for o in options]:
+                return f'valeur hors des options ({", ".join(str(o) for o in options)})'
+        elif field_type == 'email':
+            if not EMAIL_PATTERN.match(str(value)):
+                return 'adresse email invalide'
+        elif field_type == 'url':
+            if any(c.isspace() for c in str(value)):
+                return 'URL invalide'
+        return None
+    return validate
+
+def _load_custom_field_registry(version):
+    """Lire custom_fields et précalculer libellés, fragment de prompt IA et validateurs"""
+    conn = get_db()
     try:
-        conn = get_db()
         cursor = conn.cursor()
-        
         cursor.execute('''
             SELECT id, name, field_key, field_type, options, required, display_order, created_at
             FROM custom_fields
             ORDER BY display_order ASC, name ASC
         ''')
-        
         rows = cursor.fetchall()
-        fields = [{
-            'id': row['id'],
-            'name': row['name'],
-            'fieldKey': row['field_key'],
-            'fieldType': row['field_type'],
-            'options': json.loads(row['options']) if row['options'] else None,
-            'required': bool(row['required']),
-            'displayOrder': row['display_order'],
-            'createdAt': row['created_at']
-        } for row in rows]
-        
+    finally:
         conn.close()
-        return jsonify({'success': True, 'fields': fields}), 200
+
+    fields = [{
+        'id': row['id'],
+        'name': row['name'],
+        'fieldKey': row['field_key'],
+        'fieldType': row['field_type'],
+        'options': json.loads(row['options']) if row['options'] else None,
+        'required': bool(row['required']),
+        'displayOrder': row['display_order'],
+        'createdAt': row['created_at']
+    } for row in rows]
+
+    ai_fields = [{
+        'name': field['name'],
+        'fieldKey': field['fieldKey'],
+        'fieldType': field['fieldType'],
+        'options': field['options']
+    } for field in fields]
+    custom_fields_json = ',\n  '.join(f'"{field["fieldKey"]}": "valeur du champ {field["name"]}"' for field in fields)
+
+    return {
+        'version': version,
+        'fields': fields,
+        'labels': {field['fieldKey']: field['name'] for field in fields},
+        'aiFields': ai_fields,
+        'aiPromptFragment': f",\n  {custom_fields_json}" if custom_fields_json else '',
+        'validators': {field['fieldKey']: _build_custom_field_validator(field['fieldType'], field['options'])
+                       for field in fields}
+    }
+
+def get_custom_field_registry():
+    """Retourner l'instantané courant du registre (chargé à la demande)"""
+    global _custom_field_registry
+    registry = _custom_field_registry
+    if registry is not None and registry['version'] == _custom_field_registry_version:
+        metric_inc('inventory_cache_requests_total', {'cache': 'custom_fields', 'result': 'hit'})
+        return registry
+    metric_inc('inventory_cache_requests_total', {'cache': 'custom_fields', 'result': 'miss'})
+    with _custom_field_registry_lock:
+        if _custom_field_registry is None or _custom_field_registry['version'] != _custom_field_registry_version:
+            _custom_field_registry = _load_custom_field_registry(_custom_field_registry_version)
+        return _custom_field_registry
+
+def invalidate_custom_field_registry():
+    """Invalider le registre après une modification de custom_fields"""
+    global _custom_field_registry_version
+    with _custom_field_registry_lock:
+        _custom_field_registry_version += 1
+
+def validate_custom_data(custom_data):
+    """Valider les valeurs de champs personnalisés connus (message d'erreur ou None)"""
+    if not custom_data:
+        return None
+    if not isinstance(custom_data, dict):
+        return 'customData doit être un objet'
+    validators = get_custom_field_registry()['validators']
+    errors = []
+    for key, value in custom_data.items():
+        validator = validators.get(key)
+        error = validator(value) if validator else None
+        if error:
+            errors.append(f'{key}: {error}')
+    return f'Champs personnalisés invalides - {"; ".join(errors)}' if errors else None
+
+@app.route('/api/custom-fields', methods=['GET'])
+def get_custom_fields():
+    """Récupérer tous les champs personnalisés"""
+    try:
+        registry = get_custom_field_registry()
+        return jsonify({'success': True, 'fields': registry['fields'], 'version': registry['version']}), 200
     except Exception as e:
-        print(f'[API] ERREUR GET /api/custom-fields: {str(e)}')
+        safe_print(f'[API] ERREUR GET /api/custom-fields: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/custom-fields', methods=['POST'])
@@ -2077,8 +4727,9 @@ def create_custom_field():
         field_id = cursor.lastrowid
         conn.commit()
         conn.close()
+        invalidate_custom_field_registry()
         
-        print(f'[API] Champ personnalisé créé: {name} (type: {field_type})')
+        safe_print(f'[API] Champ personnalisé créé: {name} (type: {field_type})')
         
         # Diffuser l'événement
         broadcast_event('custom_fields_changed', {'action': 'created', 'fieldId': field_id, 'name': name})
@@ -2092,7 +4743,7 @@ def create_custom_field():
     except sqlite3.IntegrityError:
         return jsonify({'success': False, 'error': 'Un champ avec ce nom existe déjà'}), 409
     except Exception as e:
-        print(f'[API] ERREUR POST /api/custom-fields: {str(e)}')
+        safe_print(f'[API] ERREUR POST /api/custom-fields: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/custom-fields/<int:field_id>', methods=['PUT'])
@@ -2154,6 +4805,7 @@ def update_custom_field(field_id):
         
         conn.commit()
         conn.close()
+        invalidate_custom_field_registry()
         
         # Diffuser l'événement
         broadcast_event('custom_fields_changed', {'action': 'updated', 'fieldId': field_id})
@@ -2161,7 +4813,7 @@ def update_custom_field(field_id):
         return jsonify({'success': True}), 200
         
     except Exception as e:
-        print(f'[API] ERREUR PUT /api/custom-fields/{field_id}: {str(e)}')
+        safe_print(f'[API] ERREUR PUT /api/custom-fields/{field_id}: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/custom-fields/<int:field_id>', methods=['DELETE'])
@@ -2190,8 +4842,9 @@ def delete_custom_field(field_id):
         
         conn.commit()
         conn.close()
+        invalidate_custom_field_registry()
         
-        print(f'[API] Champ personnalisé supprimé: {field_name}')
+        safe_print(f'[API] Champ personnalisé supprimé: {field_name}')
         
         # Diffuser l'événement
         broadcast_event('custom_fields_changed', {'action': 'deleted', 'fieldId': field_id, 'fieldKey': field_key})
@@ -2199,115 +4852,157 @@ def delete_custom_field(field_id):
         return jsonify({'success': True}), 200
         
     except Exception as e:
-        print(f'[API] ERREUR DELETE /api/custom-fields/{field_id}: {str(e)}')
+        safe_print(f'[API] ERREUR DELETE /api/custom-fields/{field_id}: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 # ==================== API NOTIFICATIONS ====================
 
+NOTIFICATIONS_DEFAULT_LIMIT = 50
+NOTIFICATIONS_MAX_LIMIT = 200
+NOTIFICATION_CLIENT_ID_MAX_LENGTH = 64
+
+def get_notification_client_id(data=None):
+    """Identifiant client pour les marqueurs de lecture (en-tête X-Client-Id, paramètre ou corps clientId)"""
+    client_id = request.headers.get('X-Client-Id') or request.args.get('clientId')
+    if not client_id and data:
+        client_id = data.get('clientId')
+    if client_id is None:
+        return None
+    client_id = str(client_id).strip()
+    if not client_id or len(client_id) > NOTIFICATION_CLIENT_ID_MAX_LENGTH:
+        raise ValueError('clientId invalide')
+    return client_id
+
+def format_notification_row(row):
+    """Convertir une ligne notifications en objet API (déjà nettoyée à l'écriture)"""
+    return {
+        'id': row['id'],
+        'message': row['message'] or '',
+        'type': row['type'],
+        'event': row['event_type'],
+        'itemId': row['item_id'],
+        'field': row['field_name'],
+        'oldValue': row['old_value'],
+        'newValue': row['new_value'],
+        'itemSerialNumber': row['item_serial_number'],
+        'itemHexId': row['item_hex_id'],
+        'timestamp': row['created_at'],
+        'created_at': row['created_at']  # Alias pour compatibilité
+    }
+
 @app.route('/api/notifications', methods=['GET'])
 def get_notifications():
-    """Récupérer les notifications"""
+    """Récupérer les notifications (plus récentes d'abord, pagination par curseur)
+    
+    Paramètres : limit, cursor, since (id), unseen=1 (avec X-Client-Id ou clientId).
+    """
+    conn = None
     try:
-        print('[API] GET /api/notifications - Récupération des notifications...')
+        try:
+            limit = parse_limit(request.args.get('limit'), NOTIFICATIONS_DEFAULT_LIMIT, NOTIFICATIONS_MAX_LIMIT)
+            client_id = get_notification_client_id()
+            since_id = int(request.args.get('since') or 0)
+            cursor_value = request.args.get('cursor')
+            before_id = decode_cursor(cursor_value)[1] if cursor_value else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': sanitize_error(e)}), 400
+        
         conn = get_db()
         cursor = conn.cursor()
         
-        # Récupérer les 50 dernières notifications (avec item_hex_id pour navigation)
-        cursor.execute('''
-            SELECT id, message, type, item_serial_number, item_hex_id, created_at
+        last_seen_id = None
+        if client_id:
+            cursor.execute('SELECT last_seen_id FROM notification_reads WHERE client_id = ?', (client_id,))
+            read_row = cursor.fetchone()
+            last_seen_id = read_row['last_seen_id'] if read_row else 0
+            if request.args.get('unseen') in ('1', 'true'):
+                since_id = max(since_id, last_seen_id)
+        
+        # Les id sont croissants : la clé primaire sert d'ordre et de curseur
+        where = ['id > ?']
+        params = [since_id]
+        if before_id is not None:
+            where.append('id < ?')
+            params.append(before_id)
+        cursor.execute(f'''
+            SELECT id, message, type, item_serial_number, item_hex_id, created_at,
+                   event_type, item_id, field_name, old_value, new_value
             FROM notifications
-            ORDER BY created_at DESC
-            LIMIT 50
-        ''')
-        
+            WHERE {' AND '.join(where)}
+            ORDER BY id DESC
+            LIMIT ?
+        ''', params + [limit + 1])
         rows = cursor.fetchall()
-        notifications = []
         
-        # Traiter chaque notification individuellement pour gérer les erreurs d'encodage
-        for row in rows:
-            row_dict = dict(row)  # sqlite3.Row n'a pas .get(), convertir en dict
-            try:
-                # Récupérer le message et le sanitizer
-                raw_message = row_dict.get('message')
-                if raw_message is None:
-                    raw_message = ''
-                
-                # Sanitizer le message pour éviter les problèmes d'encodage
-                clean_message = sanitize_notification_message(raw_message)
-                
-                notifications.append({
-                    'id': row_dict.get('id'),
-                    'message': clean_message,
-                    'type': row_dict.get('type'),
-                    'itemSerialNumber': row_dict.get('item_serial_number'),
-                    'itemHexId': row_dict.get('item_hex_id'),
-                    'timestamp': row_dict.get('created_at'),
-                    'created_at': row_dict.get('created_at')  # Alias pour compatibilité
-                })
-            except Exception as msg_error:
-                # Si une notification spécifique cause une erreur, la remplacer par un message par défaut
-                try:
-                    error_msg = str(msg_error)
-                    # S'assurer que le message peut être encodé en UTF-8
-                    error_msg = error_msg.encode('utf-8', errors='replace').decode('utf-8', errors='replace')
-                    safe_error_msg = sanitize_error(error_msg)
-                    print(f'[API] Erreur lors du traitement d\'une notification (ID: {row_dict.get("id", "unknown")}): {safe_error_msg}')
-                except:
-                    print(f'[API] Erreur lors du traitement d\'une notification (ID: {row_dict.get("id", "unknown")})')
-                notifications.append({
-                    'id': row_dict.get('id', 0),
-                    'message': 'Message de notification (erreur d\'encodage)',
-                    'type': row_dict.get('type', 'info'),
-                    'itemSerialNumber': row_dict.get('item_serial_number'),
-                    'itemHexId': row_dict.get('item_hex_id'),
-                    'timestamp': row_dict.get('created_at', ''),
-                    'created_at': row_dict.get('created_at', '')
-                })
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['id'], rows[-1]['id'])
+        notifications = [format_notification_row(row) for row in rows]
+        
+        result = {'success': True, 'notifications': notifications, 'nextCursor': next_cursor}
+        if client_id:
+            cursor.execute('SELECT COUNT(*) FROM notifications WHERE id > ?', (last_seen_id,))
+            result['lastSeenId'] = last_seen_id
+            result['unseenCount'] = cursor.fetchone()[0]
         
         conn.close()
-        print(f'[API] GET /api/notifications - {len(notifications)} notifications retournées')
+        conn = None
         # Ne pas afficher les messages dans la console car ils peuvent contenir des caractères Unicode
         # qui causent des erreurs d'encodage sur Windows
-        return jsonify({'success': True, 'notifications': notifications}), 200
+        safe_print(f'[API] GET /api/notifications - {len(notifications)} notifications retournées')
+        return jsonify(result), 200
     except Exception as e:
-        # Gérer les erreurs d'encodage de manière plus robuste
-        error_msg = str(e)
-        # S'assurer que le message d'erreur peut être encodé en UTF-8
-        try:
-            # Encoder en UTF-8 avec remplacement des caractères problématiques
-            error_msg = error_msg.encode('utf-8', errors='replace').decode('utf-8', errors='replace')
-        except:
-            error_msg = 'Erreur lors de la récupération des notifications'
-        
-        # Utiliser sanitize_error pour nettoyer le message avant l'affichage
-        safe_error_msg = sanitize_error(error_msg)
+        safe_print(f'[API] ERREUR GET /api/notifications: {sanitize_error(e)}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+    finally:
+        if conn:
+            conn.close()
+
+@app.route('/api/notifications/seen', methods=['POST'])
+def mark_notifications_seen():
+    """Enregistrer la dernière notification vue par un client (le marqueur ne recule jamais)"""
+    try:
+        data = request.get_json(silent=True) or {}
         try:
-            print(f'[API] ERREUR GET /api/notifications: {safe_error_msg}')
-        except:
-            # Si l'affichage échoue encore, utiliser un message générique
-            print('[API] ERREUR GET /api/notifications: Erreur lors de la récupération des notifications')
+            client_id = get_notification_client_id(data)
+            if not client_id:
+                raise ValueError('clientId requis')
+            last_seen_id = data.get('lastSeenId')
+            if last_seen_id is not None:
+                last_seen_id = int(last_seen_id)
+        except (TypeError, ValueError) as e:
+            return jsonify({'success': False, 'error': sanitize_error(e)}), 400
         
-        import traceback
-        try:
-            # Capturer la traceback dans une chaîne pour éviter les problèmes d'encodage
-            import io
-            traceback_buffer = io.StringIO()
-            traceback.print_exc(file=traceback_buffer)
-            traceback_str = traceback_buffer.getvalue()
-            # Nettoyer la traceback avant l'affichage
-            traceback_str = traceback_str.encode('utf-8', errors='replace').decode('utf-8', errors='replace')
-            print(traceback_str)
-        except:
-            # Si même l'affichage de la traceback échoue, ignorer
-            pass
+        conn = get_db()
+        cursor = conn.cursor()
+        if last_seen_id is None:
+            # Par défaut : tout marquer comme vu
+            cursor.execute('SELECT COALESCE(MAX(id), 0) FROM notifications')
+            last_seen_id = cursor.fetchone()[0]
+        cursor.execute('''
+            INSERT INTO notification_reads (client_id, last_seen_id, updated_at)
+            VALUES (?, ?, ?)
+            ON CONFLICT(client_id) DO UPDATE SET
+                last_seen_id = MAX(last_seen_id, excluded.last_seen_id),
+                updated_at = excluded.updated_at
+            RETURNING last_seen_id
+        ''', (client_id, last_seen_id, datetime.now().isoformat()))
+        stored_id = cursor.fetchone()[0]
+        conn.commit()
+        conn.close()
         
-        return jsonify({'success': False, 'error': safe_error_msg}), 500
+        return jsonify({'success': True, 'lastSeenId': stored_id}), 200
+    except Exception as e:
+        safe_print(f'[API] ERREUR POST /api/notifications/seen: {sanitize_error(e)}')
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/notifications/<int:notification_id>', methods=['DELETE'])
 def delete_notification(notification_id):
     """Supprimer une notification spécifique"""
     try:
-        print(f'[API] DELETE /api/notifications/{notification_id} - Suppression de la notification...')
+        safe_print(f'[API] DELETE /api/notifications/{notification_id} - Suppression de la notification...')
         conn = get_db()
         cursor = conn.cursor()
         
@@ -2315,7 +5010,7 @@ def delete_notification(notification_id):
         cursor.execute('SELECT id FROM notifications WHERE id = ?', (notification_id,))
         if not cursor.fetchone():
             conn.close()
-            print(f'[API] DELETE /api/notifications/{notification_id} - Notification non trouvée')
+            safe_print(f'[API] DELETE /api/notifications/{notification_id} - Notification non trouvée')
             return jsonify({'success': False, 'error': 'Notification non trouvée'}), 404
         
         # Supprimer la notification
@@ -2324,14 +5019,14 @@ def delete_notification(notification_id):
         conn.commit()
         conn.close()
         
-        print(f'[API] DELETE /api/notifications/{notification_id} - Notification supprimée avec succès')
+        safe_print(f'[API] DELETE /api/notifications/{notification_id} - Notification supprimée avec succès')
         
         # Diffuser l'événement
-        broadcast_event('notifications_changed', {})
+        broadcast_event('notifications_changed', {'action': 'deleted', 'id': notification_id})
         
         return jsonify({'success': True}), 200
     except Exception as e:
-        print(f'[API] ERREUR DELETE /api/notifications/{notification_id}: {str(e)}')
+        safe_print(f'[API] ERREUR DELETE /api/notifications/{notification_id}: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -2349,7 +5044,7 @@ def clear_notifications():
         conn.close()
         
         # Diffuser l'événement
-        broadcast_event('notifications_changed', {})
+        broadcast_event('notifications_changed', {'action': 'cleared'})
         
         return jsonify({'success': True}), 200
     except Exception as e:
@@ -2380,7 +5075,7 @@ def proxy_gtinsearch():
         try:
             _log('INFO', 'Essai Open Food Facts...')
             off_url = f'https://world.openfoodfacts.org/api/v0/product/{gtin}.json'
-            off_response = requests.get(off_url, timeout=8, headers=headers)
+            off_response = external_request('openfoodfacts', 'GET', off_url, timeout=8, headers=headers)
             
             if off_response.status_code == 200:
                 off_data = off_response.json()
@@ -2412,7 +5107,7 @@ def proxy_gtinsearch():
         try:
             _log('INFO', 'Essai UPC Item DB...')
             upc_url = f'https://api.upcitemdb.com/prod/trial/lookup?upc={gtin}'
-            upc_response = requests.get(upc_url, timeout=8, headers={
+            upc_response = external_request('upcitemdb', 'GET', upc_url, timeout=8, headers={
                 **headers,
                 'Accept': 'application/json',
             })
@@ -2441,7 +5136,7 @@ def proxy_gtinsearch():
         try:
             _log('INFO', 'Essai GTINsearch...')
             gtin_url = f'https://gtinsearch.org/api?gtin={gtin}'
-            gtin_response = requests.get(gtin_url, timeout=8, headers=headers)
+            gtin_response = external_request('gtinsearch', 'GET', gtin_url, timeout=8, headers=headers)
             
             if gtin_response.status_code == 200:
                 gtin_data = gtin_response.json()
@@ -2480,37 +5175,37 @@ def proxy_openfoodfacts():
         if not barcode:
             return jsonify({'success': False, 'error': 'Paramètre barcode manquant'}), 400
         
-        print(f'[Proxy] Requête Open Food Facts pour: {barcode}')
+        safe_print(f'[Proxy] Requête Open Food Facts pour: {barcode}')
         url = f'https://world.openfoodfacts.org/api/v0/product/{barcode}.json'
         
-        response = requests.get(url, timeout=10, headers={
+        response = external_request('openfoodfacts', 'GET', url, timeout=10, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
-        print(f'[Proxy] Open Food Facts status: {response.status_code}')
+        safe_print(f'[Proxy] Open Food Facts status: {response.status_code}')
         
         if response.status_code != 200:
-            print(f'[Proxy] Open Food Facts erreur HTTP: {response.status_code}')
+            safe_print(f'[Proxy] Open Food Facts erreur HTTP: {response.status_code}')
             return jsonify({'success': False, 'status': 0, 'error': f'HTTP {response.status_code}'}), 200
         
         try:
             data = response.json()
-            print(f'[Proxy] Open Food Facts réponse reçue')
+            safe_print(f'[Proxy] Open Food Facts réponse reçue')
             return jsonify(data), 200
         except ValueError:
-            print(f'[Proxy] Open Food Facts réponse non-JSON')
+            safe_print(f'[Proxy] Open Food Facts réponse non-JSON')
             return jsonify({'success': False, 'status': 0, 'error': 'Réponse invalide'}), 200
             
     except requests.exceptions.Timeout:
-        print(f'[Proxy] Open Food Facts timeout')
+        safe_print(f'[Proxy] Open Food Facts timeout')
         return jsonify({'success': False, 'status': 0, 'error': 'Timeout'}), 200
     except requests.exceptions.RequestException as e:
-        print(f'[Proxy] Open Food Facts erreur: {str(e)}')
+        safe_print(f'[Proxy] Open Food Facts erreur: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'status': 0, 'error': sanitize_error(e)}), 200
     except Exception as e:
-        print(f'[Proxy] Open Food Facts erreur inattendue: {str(e)}')
+        safe_print(f'[Proxy] Open Food Facts erreur inattendue: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'status': 0, 'error': sanitize_error(e)}), 200
@@ -2523,35 +5218,35 @@ def proxy_openfoodfacts_search():
         if not query:
             return jsonify({'success': False, 'error': 'Paramètre query manquant'}), 400
         
-        print(f'[Proxy] Recherche Open Food Facts pour: {query}')
+        safe_print(f'[Proxy] Recherche Open Food Facts pour: {query}')
         url = f'https://world.openfoodfacts.org/cgi/search.pl?search_terms={query}&search_simple=1&action=process&json=1&page_size=8'
         
-        response = requests.get(url, timeout=10, headers={
+        response = external_request('openfoodfacts', 'GET', url, timeout=10, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
         
-        print(f'[Proxy] Open Food Facts recherche status: {response.status_code}')
+        safe_print(f'[Proxy] Open Food Facts recherche status: {response.status_code}')
         
         if response.status_code != 200:
-            print(f'[Proxy] Open Food Facts recherche erreur HTTP: {response.status_code}')
+            safe_print(f'[Proxy] Open Food Facts recherche erreur HTTP: {response.status_code}')
             return jsonify({'success': False, 'products': [], 'error': f'HTTP {response.status_code}'}), 200
         
         try:
             data = response.json()
-            print(f'[Proxy] Open Food Facts recherche réponse reçue')
+            safe_print(f'[Proxy] Open Food Facts recherche réponse reçue')
             return jsonify(data), 200
         except ValueError:
-            print(f'[Proxy] Open Food Facts recherche réponse non-JSON')
+            safe_print(f'[Proxy] Open Food Facts recherche réponse non-JSON')
             return jsonify({'success': False, 'products': [], 'error': 'Réponse invalide'}), 200
             
     except requests.exceptions.Timeout:
-        print(f'[Proxy] Open Food Facts recherche timeout')
+        safe_print(f'[Proxy] Open Food Facts recherche timeout')
         return jsonify({'success': False, 'products': [], 'error': 'Timeout'}), 200
     except requests.exceptions.RequestException as e:
-        print(f'[Proxy] Open Food Facts recherche erreur réseau: {str(e)}')
+        safe_print(f'[Proxy] Open Food Facts recherche erreur réseau: {str(e)}')
         return jsonify({'success': False, 'products': [], 'error': str(e)}), 200
     except Exception as e:
-        print(f'[Proxy] Open Food Facts recherche erreur inattendue: {str(e)}')
+        safe_print(f'[Proxy] Open Food Facts recherche erreur inattendue: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'products': [], 'error': sanitize_error(e)}), 200
@@ -2564,30 +5259,30 @@ def proxy_image():
         if not image_url:
             return jsonify({'success': False, 'error': 'Paramètre url manquant'}), 400
         
-        print(f'[Proxy] Récupération image depuis: {image_url}')
+        safe_print(f'[Proxy] Récupération image depuis: {image_url}')
         
         # Vérifier que l'URL est une image
         if not any(ext in image_url.lower() for ext in ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']):
-            print(f'[Proxy] URL ne semble pas être une image')
+            safe_print(f'[Proxy] URL ne semble pas être une image')
         
         # Récupérer l'image
-        response = requests.get(image_url, timeout=15, headers={
+        response = external_request('image_proxy', 'GET', image_url, timeout=15, headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
             'Accept': 'image/*'
         })
         
-        print(f'[Proxy] Image status: {response.status_code}')
+        safe_print(f'[Proxy] Image status: {response.status_code}')
         
         if response.status_code != 200:
-            print(f'[Proxy] Erreur HTTP lors de la récupération: {response.status_code}')
+            safe_print(f'[Proxy] Erreur HTTP lors de la récupération: {response.status_code}')
             return jsonify({'success': False, 'error': f'HTTP {response.status_code}'}), 200
         
         # Vérifier le content-type
         content_type = response.headers.get('Content-Type', '')
-        print(f'[Proxy] Content-Type: {content_type}')
+        safe_print(f'[Proxy] Content-Type: {content_type}')
         
         if not content_type.startswith('image/'):
-            print(f'[Proxy] Content-Type invalide: {content_type}')
+            safe_print(f'[Proxy] Content-Type invalide: {content_type}')
             return jsonify({'success': False, 'error': f'Type de contenu invalide: {content_type}'}), 200
         
         # Convertir en base64
@@ -2595,7 +5290,7 @@ def proxy_image():
         image_base64 = base64.b64encode(response.content).decode('utf-8')
         data_uri = f'data:{content_type};base64,{image_base64}'
         
-        print(f'[Proxy] Image converted to base64 ({len(image_base64)} chars)')
+        safe_print(f'[Proxy] Image converted to base64 ({len(image_base64)} chars)')
         
         return jsonify({
             'success': True,
@@ -2604,27 +5299,27 @@ def proxy_image():
         }), 200
         
     except requests.exceptions.Timeout:
-        print(f'[Proxy] Timeout lors de la récupération de l\'image')
+        safe_print(f'[Proxy] Timeout lors de la récupération de l\'image')
         return jsonify({'success': False, 'error': 'Timeout'}), 200
     except requests.exceptions.RequestException as e:
-        print(f'[Proxy] Erreur réseau: {str(e)}')
+        safe_print(f'[Proxy] Erreur réseau: {str(e)}')
         return jsonify({'success': False, 'error': f'Erreur réseau: {str(e)}'}), 200
     except Exception as e:
-        print(f'[Proxy] Erreur inattendue: {str(e)}')
+        safe_print(f'[Proxy] Erreur inattendue: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 200
             
     except requests.exceptions.Timeout:
-        print(f'[Proxy] Open Food Facts recherche timeout')
+        safe_print(f'[Proxy] Open Food Facts recherche timeout')
         return jsonify({'success': False, 'products': [], 'error': 'Timeout'}), 200
     except requests.exceptions.RequestException as e:
-        print(f'[Proxy] Open Food Facts recherche erreur: {str(e)}')
+        safe_print(f'[Proxy] Open Food Facts recherche erreur: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'products': [], 'error': sanitize_error(e)}), 200
     except Exception as e:
-        print(f'[Proxy] Open Food Facts recherche erreur inattendue: {str(e)}')
+        safe_print(f'[Proxy] Open Food Facts recherche erreur inattendue: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'products': [], 'error': sanitize_error(e)}), 200
@@ -2672,7 +5367,7 @@ def get_rentals():
         conn.close()
         return jsonify({'success': True, 'rentals': rentals}), 200
     except Exception as e:
-        print(f'[API] ERREUR GET /api/rentals: {str(e)}')
+        safe_print(f'[API] ERREUR GET /api/rentals: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -2777,7 +5472,8 @@ def create_rental():
                                 quantity = ?,
                                 rental_end_date = ?,
                                 current_rental_id = ?,
-                                last_updated = ?
+                                last_updated = ?,
+                                version = COALESCE(version, 1) + 1
                             WHERE serial_number = ?
                         ''', (
                             item_status if remaining_quantity == 0 else 'en_stock',  # Si tout est loué, changer le statut
@@ -2788,9 +5484,9 @@ def create_rental():
                             serial_number
                         ))
                         
-                        print(f'[RENTAL] Item {serial_number}: {quantity}/{current_quantity} loués, {remaining_quantity} restants, statut: {item_status if remaining_quantity == 0 else "en_stock"}')
+                        safe_print(f'[RENTAL] Item {serial_number}: {quantity}/{current_quantity} loués, {remaining_quantity} restants, statut: {item_status if remaining_quantity == 0 else "en_stock"}')
                 except Exception as e:
-                    print(f'[RENTAL] Erreur mise à jour item {serial_number}: {e}')
+                    safe_print(f'[RENTAL] Erreur mise à jour item {serial_number}: {e}')
         
         conn.commit()
         conn.close()
@@ -2801,7 +5497,7 @@ def create_rental():
         
         return jsonify({'success': True, 'id': rental_id}), 201
     except Exception as e:
-        print(f'[API] ERREUR POST /api/rentals: {str(e)}')
+        safe_print(f'[API] ERREUR POST /api/rentals: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -2877,7 +5573,8 @@ def update_rental(rental_id):
                                     quantity = ?,
                                     rental_end_date = NULL,
                                     current_rental_id = NULL,
-                                    last_updated = ?
+                                    last_updated = ?,
+                                    version = COALESCE(version, 1) + 1
                                 WHERE serial_number = ?
                             ''', (
                                 new_quantity,
@@ -2885,7 +5582,7 @@ def update_rental(rental_id):
                                 serial_number
                             ))
                             
-                            print(f'[RENTAL UPDATE] Location terminée - Item {serial_number}: {quantity} libérés, nouveau total: {new_quantity}')
+                            safe_print(f'[RENTAL UPDATE] Location terminée - Item {serial_number}: {quantity} libérés, nouveau total: {new_quantity}')
         
         # Si le statut passe de 'a_venir' à 'en_cours', mettre à jour le statut des items
         elif old_status == 'a_venir' and data['status'] == 'en_cours':
@@ -2895,10 +5592,10 @@ def update_rental(rental_id):
                     if serial_number:
                         cursor.execute('''
                             UPDATE items 
-                            SET status = 'en_location'
+                            SET status = 'en_location', version = COALESCE(version, 1) + 1
                             WHERE serial_number = ? AND current_rental_id = ?
                         ''', (serial_number, rental_id))
-                        print(f'[RENTAL UPDATE] Statut changé: location_future -> en_location pour {serial_number}')
+                        safe_print(f'[RENTAL UPDATE] Statut changé: location_future -> en_location pour {serial_number}')
         
         conn.commit()
         conn.close()
@@ -2909,7 +5606,7 @@ def update_rental(rental_id):
         
         return jsonify({'success': True}), 200
     except Exception as e:
-        print(f'[API] ERREUR PUT /api/rentals/{rental_id}: {str(e)}')
+        safe_print(f'[API] ERREUR PUT /api/rentals/{rental_id}: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -2950,7 +5647,8 @@ def delete_rental(rental_id):
                                     quantity = ?,
                                     rental_end_date = NULL,
                                     current_rental_id = NULL,
-                                    last_updated = ?
+                                    last_updated = ?,
+                                    version = COALESCE(version, 1) + 1
                                 WHERE serial_number = ?
                             ''', (
                                 new_quantity,
@@ -2958,9 +5656,9 @@ def delete_rental(rental_id):
                                 serial_number
                             ))
                             
-                            print(f'[RENTAL DELETE] Item {serial_number}: {quantity} libérés, nouveau total: {new_quantity}')
+                            safe_print(f'[RENTAL DELETE] Item {serial_number}: {quantity} libérés, nouveau total: {new_quantity}')
             except Exception as e:
-                print(f'[RENTAL DELETE] Erreur libération items: {e}')
+                safe_print(f'[RENTAL DELETE] Erreur libération items: {e}')
         
         cursor.execute('DELETE FROM rentals WHERE id = ?', (rental_id,))
         conn.commit()
@@ -2971,7 +5669,7 @@ def delete_rental(rental_id):
         
         return jsonify({'success': True}), 200
     except Exception as e:
-        print(f'[API] ERREUR DELETE /api/rentals/{rental_id}: {str(e)}')
+        safe_print(f'[API] ERREUR DELETE /api/rentals/{rental_id}: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -2986,6 +5684,12 @@ def generate_rental_caution_pdf(rental):
     if not PDF_AVAILABLE:
         return None
     
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import cm
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+    from reportlab.lib import colors
+    
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=2*cm, leftMargin=2*cm, topMargin=2*cm, bottomMargin=2*cm)
     styles = getSampleStyleSheet()
@@ -3066,8 +5770,9 @@ def generate_rental_caution_from_template(rental, template_path):
     """Générer un PDF avec fpdf (basé sur pdf.py) avec les infos du loueur."""
     try:
         if not FPDF_AVAILABLE:
-            print('[PDF] fpdf non disponible, impossible de générer le PDF')
+            safe_print('[PDF] fpdf non disponible, impossible de générer le PDF')
             return None
+        from fpdf import FPDF
         
         def format_date(date_str):
             if not date_str:
@@ -3151,17 +5856,18 @@ Date et Signature des deux parties :
         buffer.write(pdf_output)
         buffer.seek(0)
         
-        print('[PDF] PDF généré avec succès avec fpdf')
+        safe_print('[PDF] PDF généré avec succès avec fpdf')
         return buffer
         
     except Exception as e:
-        print(f'[PDF] Erreur lors de la génération avec fpdf: {str(e)}')
+        safe_print(f'[PDF] Erreur lors de la génération avec fpdf: {str(e)}')
         import traceback
         safe_traceback()
         return None
 
 
 @app.route('/api/rentals/<int:rental_id>/caution-doc', methods=['GET'])
+@admission_controlled('documents')
 def get_rental_caution_doc(rental_id):
     """Générer et télécharger le document de caution (PDF par défaut, DOCX si format=docx)"""
     try:
@@ -3205,6 +5911,7 @@ def get_rental_caution_doc(rental_id):
             if not os.path.exists(template_path):
                 return jsonify({'success': False, 'error': 'Modèle DOCX non trouvé'}), 404
         
+        from docx import Document
         doc = Document(template_path)
         
         # Formater les dates
@@ -3383,7 +6090,7 @@ def get_rental_caution_doc(rental_id):
             download_name=filename
         )
     except Exception as e:
-        print(f'[API] ERREUR GET /api/rentals/{rental_id}/caution-doc: {str(e)}')
+        safe_print(f'[API] ERREUR GET /api/rentals/{rental_id}/caution-doc: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -3404,7 +6111,7 @@ def get_rental_statuses():
         conn.close()
         return jsonify({'success': True, 'statuses': statuses}), 200
     except Exception as e:
-        print(f'[API] ERREUR GET /api/rental-statuses: {str(e)}')
+        safe_print(f'[API] ERREUR GET /api/rental-statuses: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/rental-statuses', methods=['POST'])
@@ -3422,12 +6129,13 @@ def create_rental_status():
         conn.close()
         return jsonify({'success': True, 'id': cursor.lastrowid}), 201
     except Exception as e:
-        print(f'[API] ERREUR POST /api/rental-statuses: {str(e)}')
+        safe_print(f'[API] ERREUR POST /api/rental-statuses: {str(e)}')
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 # ==================== OCR (TESSERACT) ====================
 
 @app.route('/api/ocr', methods=['POST'])
+@admission_controlled('ocr')
 def ocr_image():
     """Extraire le texte d'une image avec Tesseract OCR"""
     if not OCR_AVAILABLE:
@@ -3447,6 +6155,9 @@ def ocr_image():
         if ',' in image_data:
             image_data = image_data.split(',')[1]
         
+        pytesseract = load_pytesseract()
+        from PIL import Image
+        
         image_bytes = base64.b64decode(image_data)
         image = Image.open(BytesIO(image_bytes))
         
@@ -3460,7 +6171,7 @@ def ocr_image():
         elif image.mode != 'RGB':
             image = image.convert('RGB')
         
-        print(f'[OCR] Traitement image {image.size}...')
+        safe_print(f'[OCR] Traitement image {image.size}...')
         
         # Configuration Tesseract pour de meilleures performances sur les étiquettes
         # PSM 6 = Assume a single uniform block of text
@@ -3468,8 +6179,9 @@ def ocr_image():
         custom_config = r'--oem 3 --psm 6 -l fra+eng'
         
         # Extraire le texte
-        raw_text = pytesseract.image_to_string(image, config=custom_config)
-        print(f'[OCR] Texte brut extrait:\n{raw_text[:500]}...')
+        with track_inflight('ocr'):
+            raw_text = pytesseract.image_to_string(image, config=custom_config)
+        safe_print(f'[OCR] Texte brut extrait:\n{raw_text[:500]}...')
         
         # Parser le texte pour extraire les informations
         parsed_data = parse_ocr_text(raw_text)
@@ -3481,12 +6193,13 @@ def ocr_image():
         }), 200
         
     except Exception as e:
-        print(f'[OCR] Erreur: {str(e)}')
+        safe_print(f'[OCR] Erreur: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
 @app.route('/api/analyze-label-ai', methods=['POST'])
+@admission_controlled('ai')
 def analyze_label_ai():
     """Analyser une étiquette avec IA (OpenRouter) pour extraction intelligente des champs"""
     try:
@@ -3507,29 +6220,14 @@ def analyze_label_ai():
                 'error': 'Clé API OpenRouter non configurée'
             }), 500
         
-        # Récupérer les champs personnalisés
+        # Champs personnalisés et fragment de prompt précalculés par le registre
         custom_fields = []
         custom_fields_prompt = ""
         try:
-            conn = get_db()
-            cursor = conn.cursor()
-            cursor.execute('SELECT name, field_key, field_type, options FROM custom_fields ORDER BY display_order ASC')
-            rows = cursor.fetchall()
-            conn.close()
-            
-            if rows:
-                custom_fields = [{
-                    'name': row['name'],
-                    'fieldKey': row['field_key'],
-                    'fieldType': row['field_type'],
-                    'options': json.loads(row['options']) if row['options'] else None
-                } for row in rows]
-                
-                # Ajouter les champs personnalisés au prompt
-                custom_fields_json = ',\n  '.join([f'"{field["fieldKey"]}": "valeur du champ {field["name"]}"' for field in custom_fields])
-                if custom_fields_json:
-                    custom_fields_prompt = f",\n  {custom_fields_json}"
-                
+            registry = get_custom_field_registry()
+            custom_fields = registry['aiFields']
+            custom_fields_prompt = registry['aiPromptFragment']
+            if custom_fields:
                 _log('INFO', f'[AI-Label] {len(custom_fields)} champs personnalisés trouvés')
         except Exception as e:
             _log('WARN', f'[AI-Label] Impossible de récupérer les champs personnalisés: {str(e)}')
@@ -3596,7 +6294,8 @@ IMPORTANT:
         _log('INFO', f'[AI-Label] Envoi requête à OpenRouter (modèle: {payload["model"]})...')
         
         # Appeler l'API OpenRouter
-        response = requests.post(
+        response = external_request(
+            'openrouter', 'POST',
             'https://openrouter.ai/api/v1/chat/completions',
             headers=headers,
             json=payload,
@@ -3660,7 +6359,7 @@ IMPORTANT:
                         'key_type': '3scale'
                     }
                     
-                    upc_response = requests.get(upc_url, headers=upc_headers, timeout=5)
+                    upc_response = external_request('upcitemdb', 'GET', upc_url, headers=upc_headers, timeout=5)
                     
                     if upc_response.status_code == 200:
                         upc_data = upc_response.json()
@@ -3782,7 +6481,7 @@ def parse_ocr_text(text):
     if description_lines:
         result['description'] = ' | '.join(description_lines[:3])  # Max 3 lignes
     
-    print(f'[OCR] Données parsées: {result}')
+    log_payload('[OCR] Données parsées', result)
     return result
 
 @app.route('/api/ocr/status', methods=['GET'])
@@ -3791,46 +6490,120 @@ def ocr_status():
     return jsonify({
         'success': True,
         'available': OCR_AVAILABLE,
-        'tesseract_path': pytesseract.pytesseract.tesseract_cmd if OCR_AVAILABLE else None
+        'tesseract_path': tesseract_path if OCR_AVAILABLE else None
     }), 200
 
 # ==================== COMMANDE VOCALE (IA) ====================
 
-# Initialiser Whisper local (faster-whisper)
-WHISPER_AVAILABLE = False
-whisper_model = None
-
-try:
-    from faster_whisper import WhisperModel
-    # Utiliser le modèle "base" pour un bon équilibre vitesse/qualité
-    # Options: tiny, base, small, medium, large-v3
-    print('[WHISPER] Chargement du modèle Whisper local (base)...')
-    whisper_model = WhisperModel("base", device="cpu", compute_type="int8")
-    WHISPER_AVAILABLE = True
-    print('[WHISPER] Modèle Whisper local chargé avec succès')
-except ImportError:
+# Whisper local (faster-whisper) : le modèle n'est plus chargé à l'import mais
+# préchauffé en tâche de fond au démarrage (WHISPER_PRELOAD) ou au premier usage.
+# Tailles possibles : tiny, base, small, medium, large-v3
+WHISPER_MODEL_SIZE = os.environ.get('WHISPER_MODEL_SIZE', 'base')
+WHISPER_DEVICE = os.environ.get('WHISPER_DEVICE', 'cpu')
+WHISPER_COMPUTE_TYPE = os.environ.get('WHISPER_COMPUTE_TYPE', 'int8')
+WHISPER_PRELOAD = os.environ.get('WHISPER_PRELOAD', 'true').lower() in ('1', 'true', 'yes')
+WHISPER_IDLE_UNLOAD_SECONDS = int(os.environ.get('WHISPER_IDLE_UNLOAD_SECONDS', 0))  # 0 = jamais déchargé
+
+# Détecter le paquet sans l'importer (l'import de ctranslate2 est coûteux)
+WHISPER_AVAILABLE = importlib.util.find_spec('faster_whisper') is not None
+if not WHISPER_AVAILABLE:
     print('[WHISPER] faster-whisper non installé - pip install faster-whisper')
-except Exception as e:
-    print(f'[WHISPER] Erreur chargement modèle: {e}')
 
-# Vérifier si OpenAI est disponible (pour l'analyse GPT)
-
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-    # Initialiser le client OpenAI (la clé sera lue depuis .env ou variable d'environnement)
-    openai_api_key = os.environ.get('OPENAI_API_KEY')
-    if openai_api_key:
-        openai_client = OpenAI(api_key=openai_api_key)
-        print('[OPENAI] Client OpenAI initialisé (pour analyse GPT)')
-    else:
-        OPENAI_AVAILABLE = False
-        print('[OPENAI] OPENAI_API_KEY non définie - analyse GPT désactivée')
-except ImportError:
-    OPENAI_AVAILABLE = False
+whisper_model = None
+_whisper_lock = threading.Lock()
+_whisper_state = {
+    'status': 'idle' if WHISPER_AVAILABLE else 'unavailable',  # idle, loading, ready, unloaded, error
+    'error': None,
+    'loadSeconds': None,
+    'lastUsed': None,
+    'active': 0
+}
+_whisper_background_started = False
+
+def load_whisper_model():
+    """Charger le modèle Whisper si nécessaire (bloquant, une seule fois même en concurrence)"""
+    global whisper_model
+    if whisper_model is not None:
+        return whisper_model
+    with _whisper_lock:
+        if whisper_model is not None:
+            return whisper_model
+        _whisper_state['status'] = 'loading'
+        _whisper_state['error'] = None
+        safe_print(f'[WHISPER] Chargement du modèle Whisper local ({WHISPER_MODEL_SIZE}, {WHISPER_DEVICE}, {WHISPER_COMPUTE_TYPE})...')
+        started = time.perf_counter()
+        try:
+            from faster_whisper import WhisperModel
+            whisper_model = WhisperModel(WHISPER_MODEL_SIZE, device=WHISPER_DEVICE, compute_type=WHISPER_COMPUTE_TYPE)
+        except Exception as e:
+            _whisper_state['status'] = 'error'
+            _whisper_state['error'] = sanitize_error(e)
+            safe_print(f'[WHISPER] Erreur chargement modèle: {e}')
+            return None
+        _whisper_state['loadSeconds'] = round(time.perf_counter() - started, 2)
+        _whisper_state['lastUsed'] = time.time()
+        _whisper_state['status'] = 'ready'
+        safe_print(f'[WHISPER] Modèle Whisper local chargé avec succès ({_whisper_state["loadSeconds"]}s)')
+        return whisper_model
+
+def _unload_idle_whisper_model():
+    """Libérer le modèle s'il n'a pas servi depuis WHISPER_IDLE_UNLOAD_SECONDS"""
+    global whisper_model
+    with _whisper_lock:
+        if whisper_model is None or _whisper_state['active'] > 0:
+            return
+        if time.time() - (_whisper_state['lastUsed'] or 0) < WHISPER_IDLE_UNLOAD_SECONDS:
+            return
+        whisper_model = None
+        _whisper_state['status'] = 'unloaded'
+    gc.collect()
+    safe_print(f'[WHISPER] Modèle déchargé après {WHISPER_IDLE_UNLOAD_SECONDS}s d\'inactivité')
+
+def _whisper_idle_loop():
+    """Boucle de surveillance de l'inactivité du modèle"""
+    while True:
+        time.sleep(max(5, min(60, WHISPER_IDLE_UNLOAD_SECONDS // 2)))
+        try:
+            _unload_idle_whisper_model()
+        except Exception as e:
+            safe_print(f'[WHISPER] Erreur déchargement: {e}')
+
+def start_whisper_background():
+    """Lancer le préchauffage et la surveillance d'inactivité (une seule fois par processus)"""
+    global _whisper_background_started
+    if not WHISPER_AVAILABLE or _whisper_background_started:
+        return
+    _whisper_background_started = True
+    if WHISPER_PRELOAD:
+        threading.Thread(target=load_whisper_model, name='whisper-warmup', daemon=True).start()
+    if WHISPER_IDLE_UNLOAD_SECONDS > 0:
+        threading.Thread(target=_whisper_idle_loop, name='whisper-idle', daemon=True).start()
+
+# Vérifier si OpenAI est disponible (pour l'analyse GPT) ; le client est créé au premier usage
+openai_api_key = os.environ.get('OPENAI_API_KEY')
+OPENAI_AVAILABLE = False
+if not module_available('openai'):
     print('[OPENAI] openai non installé - pip install openai')
+elif not openai_api_key:
+    print('[OPENAI] OPENAI_API_KEY non définie - analyse GPT désactivée')
+else:
+    OPENAI_AVAILABLE = True
+    print('[OPENAI] Client OpenAI disponible (pour analyse GPT)')
+
+_openai_client = None
+_openai_client_lock = threading.Lock()
+
+def get_openai_client():
+    """Créer le client OpenAI au premier usage (la clé est lue depuis .env ou l'environnement)"""
+    global _openai_client
+    with _openai_client_lock:
+        if _openai_client is None:
+            from openai import OpenAI
+            _openai_client = OpenAI(api_key=openai_api_key)
+        return _openai_client
 
 @app.route('/api/voice/transcribe', methods=['POST'])
+@admission_controlled('whisper')
 def transcribe_audio():
     """Transcrire un audio en texte avec Whisper local (faster-whisper)"""
     if not WHISPER_AVAILABLE:
@@ -3848,22 +6621,30 @@ def transcribe_audio():
         if audio_file.filename == '':
             return jsonify({'success': False, 'error': 'Fichier audio vide'}), 400
         
-        print(f'[WHISPER] Transcription audio: {audio_file.filename}')
+        safe_print(f'[WHISPER] Transcription audio: {audio_file.filename}')
         
         # Sauvegarder temporairement le fichier
         temp_path = os.path.join('data', f'temp_audio_{datetime.now().timestamp()}.webm')
         os.makedirs('data', exist_ok=True)
         audio_file.save(temp_path)
         
+        with _whisper_lock:
+            _whisper_state['active'] += 1
         try:
-            # Transcrire avec Whisper local
-            segments, info = whisper_model.transcribe(
+            # Transcrire avec Whisper local (chargé au premier usage si le préchauffage n'est pas terminé)
+            model = load_whisper_model()
+            if model is None:
+                return jsonify({
+                    'success': False,
+                    'error': f'Modèle Whisper indisponible: {_whisper_state["error"]}'
+                }), 503
+            segments, info = model.transcribe(
                 temp_path,
                 language="fr",
                 beam_size=5
             )
             
-            # Combiner tous les segments
+            # Combiner tous les segments (la transcription est paresseuse)
             text = " ".join([segment.text for segment in segments]).strip()
             
             if not text:
@@ -3872,8 +6653,8 @@ def transcribe_audio():
                     'error': 'Aucun texte détecté dans l\'audio'
                 }), 400
             
-            print(f'[WHISPER] Transcription réussie: {text[:100]}...')
-            print(f'[WHISPER] Langue détectée: {info.language}, probabilité: {info.language_probability:.2f}')
+            log_payload('[WHISPER] Transcription réussie', f'{text[:100]}...')
+            safe_print(f'[WHISPER] Langue détectée: {info.language}, probabilité: {info.language_probability:.2f}')
             
             return jsonify({
                 'success': True,
@@ -3883,12 +6664,15 @@ def transcribe_audio():
             }), 200
             
         finally:
+            with _whisper_lock:
+                _whisper_state['active'] -= 1
+                _whisper_state['lastUsed'] = time.time()
             # Supprimer le fichier temporaire
             if os.path.exists(temp_path):
                 os.remove(temp_path)
     
     except Exception as e:
-        print(f'[WHISPER] Erreur transcription: {str(e)}')
+        safe_print(f'[WHISPER] Erreur transcription: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -3899,7 +6683,14 @@ def voice_status():
     return jsonify({
         'whisper': {
             'available': WHISPER_AVAILABLE,
-            'model': 'base (local)' if WHISPER_AVAILABLE else None
+            'model': f'{WHISPER_MODEL_SIZE} (local)' if WHISPER_AVAILABLE else None,
+            'status': _whisper_state['status'],
+            'loaded': whisper_model is not None,
+            'device': WHISPER_DEVICE,
+            'computeType': WHISPER_COMPUTE_TYPE,
+            'loadSeconds': _whisper_state['loadSeconds'],
+            'idleUnloadSeconds': WHISPER_IDLE_UNLOAD_SECONDS or None,
+            'error': _whisper_state['error']
         },
         'openai': {
             'available': OPENAI_AVAILABLE,
@@ -3908,6 +6699,7 @@ def voice_status():
     }), 200
 
 @app.route('/api/voice/analyze', methods=['POST'])
+@admission_controlled('ai')
 def analyze_voice_command():
     """Analyser un texte avec GPT pour extraire les informations de location"""
     if not OPENAI_AVAILABLE:
@@ -3923,7 +6715,7 @@ def analyze_voice_command():
         if not text:
             return jsonify({'success': False, 'error': 'Texte vide'}), 400
         
-        print(f'[VOICE] Analyse du texte: {text[:100]}...')
+        log_payload('[VOICE] Analyse du texte', f'{text[:100]}...')
         
         # Créer un prompt pour GPT
         prompt = f"""Tu es un assistant qui analyse des commandes vocales pour créer des locations d'équipement.
@@ -3958,18 +6750,19 @@ Date actuelle: {datetime.now().strftime('%Y-%m-%d')}
 """
         
         # Appeler GPT (gpt-3.5-turbo = 20x moins cher que gpt-4)
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "Tu es un assistant qui extrait des informations structurées depuis du texte."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3  # Basse température pour plus de précision
-        )
+        with time_external_call('openai'):
+            response = get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "Tu es un assistant qui extrait des informations structurées depuis du texte."},
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.3  # Basse température pour plus de précision
+            )
         
         # Extraire la réponse
         result_text = response.choices[0].message.content.strip()
-        print(f'[VOICE] Réponse GPT: {result_text}')
+        safe_print(f'[VOICE] Réponse GPT: {result_text}')
         
         # Parser le JSON
         # Nettoyer si GPT a ajouté des backticks markdown
@@ -3996,20 +6789,20 @@ Date actuelle: {datetime.now().strftime('%Y-%m-%d')}
             if 'itemId' not in item and 'serialNumber' in item:
                 item['itemId'] = item['serialNumber']
             # Log pour debug
-            print(f'[VOICE] Item extrait: {item}')
+            log_payload('[VOICE] Item extrait', item)
         
-        print(f'[VOICE] Analyse réussie: {len(result["items"])} items détectés')
+        safe_print(f'[VOICE] Analyse réussie: {len(result["items"])} items détectés')
         
         return jsonify(result), 200
     
     except json.JSONDecodeError as e:
-        print(f'[VOICE] Erreur parsing JSON: {e}')
+        safe_print(f'[VOICE] Erreur parsing JSON: {e}')
         return jsonify({
             'success': False,
             'error': 'Impossible de parser la réponse de l\'IA'
         }), 500
     except Exception as e:
-        print(f'[VOICE] Erreur analyse: {str(e)}')
+        safe_print(f'[VOICE] Erreur analyse: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
@@ -4020,7 +6813,7 @@ def create_rental_from_voice():
     try:
         data = request.get_json()
         
-        print(f'[VOICE] Création location depuis IA: {data}')
+        log_payload('[VOICE] Création location depuis IA', data)
         
         # Récupérer les items depuis la base de données
         conn = get_db()
@@ -4082,7 +6875,7 @@ def create_rental_from_voice():
         if end_date_str and 'T' in end_date_str:
             end_date_str = end_date_str.split('T')[0]
         
-        print(f'[VOICE] Dates: {start_date_str} -> {end_date_str}')
+        safe_print(f'[VOICE] Dates: {start_date_str} -> {end_date_str}')
         
         # Créer la location
         rental_data = {
@@ -4104,7 +6897,7 @@ def create_rental_from_voice():
             end = datetime.strptime(rental_data['endDate'], '%Y-%m-%d')
             rental_data['rentalDuration'] = max(1, (end - start).days)
         except Exception as date_err:
-            print(f'[VOICE] Erreur parsing dates: {date_err}')
+            safe_print(f'[VOICE] Erreur parsing dates: {date_err}')
             rental_data['rentalDuration'] = 7
         
         # Déterminer le statut
@@ -4164,7 +6957,8 @@ def create_rental_from_voice():
                             quantity = ?,
                             rental_end_date = ?,
                             current_rental_id = ?,
-                            last_updated = ?
+                            last_updated = ?,
+                            version = COALESCE(version, 1) + 1
                         WHERE serial_number = ?
                     ''', (
                         item_status if remaining_quantity == 0 else 'en_stock',
@@ -4182,7 +6976,7 @@ def create_rental_from_voice():
         broadcast_event('rentals_changed', {'action': 'created', 'id': rental_id, 'source': 'voice'})
         broadcast_event('items_changed', {'action': 'updated', 'rental_id': rental_id})
         
-        print(f'[VOICE] Location créée: #{rental_id}')
+        safe_print(f'[VOICE] Location créée: #{rental_id}')
         
         return jsonify({
             'success': True,
@@ -4192,11 +6986,376 @@ def create_rental_from_voice():
         }), 201
     
     except Exception as e:
-        print(f'[VOICE] Erreur création location: {str(e)}')
+        safe_print(f'[VOICE] Erreur création location: {str(e)}')
         import traceback
         safe_traceback()
         return jsonify({'success': False, 'error': sanitize_error(e)}), 500
 
+# ==================== MÉTRIQUES : JAUGES ET ROUTE ====================
+
+def _inflight_gauge():
+    with _metrics_lock:
+        tasks = dict(_inflight_tasks)
+    tasks['whisper'] = _whisper_state['active']
+    return [({'task': task}, count) for task, count in sorted(tasks.items())]
+
+define_gauge('inventory_process_info', 'Processus qui servent les requêtes (un par worker)', lambda: [({'pid': os.getpid(), 'event_bus': event_bus.name}, 1)])
+define_gauge('inventory_uptime_seconds', 'Secondes depuis le démarrage du processus', lambda: round(time.perf_counter() - BOOT_STARTED_AT, 3))
+define_gauge('inventory_sse_clients', 'Connexions SSE ouvertes', lambda: sse_client_count)
+define_gauge('inventory_sse_buffered_events', 'Événements dans le tampon de relecture SSE', lambda: len(_event_buffer))
+define_gauge('inventory_sse_last_sequence', 'Dernière séquence SSE', lambda: _event_seq)
+define_gauge('inventory_inflight_tasks', 'Tâches lourdes en cours (OCR, transcription Whisper)', _inflight_gauge)
+define_gauge('inventory_admission_active', 'Tâches lourdes admises en cours par classe',
+             lambda: [({'pool': name}, active) for name, active, _, _, _ in admission_snapshot()])
+define_gauge('inventory_admission_queue_depth', 'Requêtes lourdes en file d\'attente par classe',
+             lambda: [({'pool': name}, waiting) for name, _, waiting, _, _ in admission_snapshot()])
+define_gauge('inventory_admission_limit', 'Places par classe de tâches lourdes',
+             lambda: [({'pool': name}, limit) for name, _, _, limit, _ in admission_snapshot()])
+define_gauge('inventory_whisper_model_loaded', 'Modèle Whisper en mémoire (1) ou non (0)', lambda: 1 if whisper_model is not None else 0)
+define_gauge('inventory_log_queue_size', 'Enregistrements en attente dans la file de logs', lambda: log_queue.qsize())
+define_gauge('inventory_log_dropped_records', 'Enregistrements de log perdus (file pleine)', lambda: log_dropped_count)
+
+@app.route('/api/metrics', methods=['GET'])
+def metrics():
+    """Métriques au format texte Prometheus"""
+    if METRICS_TOKEN and request.headers.get('Authorization', '') != f'Bearer {METRICS_TOKEN}':
+        return jsonify({'success': False, 'error': 'Non autorisé'}), 401
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# ==================== ADMIN (diagnostic) ====================
+# Routes de diagnostic protégées par ADMIN_TOKEN (Authorization: Bearer <token>).
+# Sans ADMIN_TOKEN, elles ne sont ouvertes qu'en développement.
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN', '')
+
+def is_admin_request():
+    """La requête porte-t-elle le jeton d'administration ?"""
+    if not ADMIN_TOKEN:
+        return APP_MODE == 'development'
+    supplied = request.headers.get('Authorization', '')
+    return secrets.compare_digest(supplied, f'Bearer {ADMIN_TOKEN}')
+
+def require_admin(view):
+    """Décorateur : 401 sans jeton d'administration valide"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not is_admin_request():
+            return jsonify({'success': False, 'error': 'Accès administrateur requis'}), 401
+        return view(*args, **kwargs)
+    return wrapper
+
+@app.route('/api/admin/sql-stats', methods=['GET'])
+@require_admin
+def get_sql_stats():
+    """Top-N des requêtes SQL par durée cumulée
+
+    Paramètres : limit (défaut 20, max 200), sort (total, max, count, avg)
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'), 20, 200)
+    except ValueError as ve:
+        return jsonify({'success': False, 'error': str(ve)}), 400
+    sort = request.args.get('sort', 'total')
+    if sort not in ('total', 'max', 'count', 'avg'):
+        return jsonify({'success': False, 'error': 'sort doit valoir total, max, count ou avg'}), 400
+    return jsonify({'success': True, 'enabled': SQL_TRACE, 'slowMs': SQL_SLOW_MS, **sql_stats_report(limit, sort)}), 200
+
+@app.route('/api/admin/sql-stats', methods=['DELETE'])
+@require_admin
+def clear_sql_stats():
+    """Remettre à zéro les statistiques SQL"""
+    reset_sql_stats()
+    return jsonify({'success': True}), 200
+
+# ==================== INDEX DES IMAGES ====================
+
+def remove_image_file(filename):
+    """Supprimer une image et ses tailles dérivées (retourne les octets libérés)"""
+    freed = 0
+    paths = [os.path.join(IMAGES_DIR, filename)]
+    if os.path.isdir(IMAGE_VARIANTS_DIR):
+        paths += [os.path.join(IMAGE_VARIANTS_DIR, name) for name in os.listdir(IMAGE_VARIANTS_DIR)
+                  if name.startswith(f'{filename}.w')]
+    for path in paths:
+        try:
+            freed += os.path.getsize(path)
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return freed
+
+def image_storage_report(verify=False):
+    """Fichiers, références, orphelins, manquants (et empreintes si verify)"""
+    ensure_images_dir()
+    files = {entry.name: entry.stat() for entry in os.scandir(IMAGES_DIR)
+             if entry.is_file() and not entry.name.startswith('.')}
+    conn = get_db()
+    cursor = conn.cursor()
+    cursor.execute('SELECT filename, ref_count, uploaded_at FROM image_refs')
+    index = {row['filename']: dict(row) for row in cursor.fetchall()}
+    conn.close()
+    grace_cutoff = time.time() - IMAGE_ORPHAN_GRACE_HOURS * 3600
+    orphans = []
+    for name, stat in files.items():
+        if index.get(name, {}).get('ref_count', 0) > 0:
+            continue
+        uploaded_at = index.get(name, {}).get('uploaded_at')
+        uploaded = datetime.fromisoformat(uploaded_at).timestamp() if uploaded_at else stat.st_mtime
+        orphans.append({'filename': name, 'size': stat.st_size, 'removable': uploaded < grace_cutoff})
+    report = {
+        'files': len(files),
+        'bytes': sum(stat.st_size for stat in files.values()),
+        'contentAddressed': sum(1 for name in files if CONTENT_ADDRESSED_IMAGE_PATTERN.match(name)),
+        'referencedFiles': sum(1 for row in index.values() if row['ref_count'] > 0),
+        'references': sum(row['ref_count'] for row in index.values()),
+        'orphans': sorted(orphans, key=lambda orphan: orphan['filename']),
+        'missing': sorted(name for name, row in index.items() if row['ref_count'] > 0 and name not in files),
+        'orphanGraceHours': IMAGE_ORPHAN_GRACE_HOURS
+    }
+    if verify:
+        # Le nom d'un fichier adressé par le contenu est son empreinte : la recalculer suffit
+        report['corrupted'] = sorted(name for name in files if CONTENT_ADDRESSED_IMAGE_PATTERN.match(name)
+                                     and hash_image_file(os.path.join(IMAGES_DIR, name)) != name.split('.', 1)[0])
+    return report
+
+@app.route('/api/admin/images', methods=['GET'])
+@require_admin
+def get_image_storage():
+    """État du stockage des images (?verify=1 : recalculer les empreintes)"""
+    try:
+        verify = request.args.get('verify', '').lower() in ('1', 'true')
+        return jsonify({'success': True, **image_storage_report(verify)}), 200
+    except Exception as e:
+        safe_print(f'[IMG] Erreur rapport stockage: {e}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
+@app.route('/api/admin/images/rebuild-index', methods=['POST'])
+@require_admin
+def rebuild_image_index():
+    """Recompter les références à partir des items"""
+    try:
+        conn = get_db()
+        rebuild_image_refs(conn.cursor())
+        conn.commit()
+        conn.close()
+        return jsonify({'success': True, **image_storage_report()}), 200
+    except Exception as e:
+        safe_print(f'[IMG] Erreur reconstruction index: {e}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
+@app.route('/api/admin/images/orphans', methods=['DELETE'])
+@require_admin
+def delete_orphan_images():
+    """Supprimer les images sans référence plus anciennes que IMAGE_ORPHAN_GRACE_HOURS"""
+    try:
+        removable = [orphan['filename'] for orphan in image_storage_report()['orphans'] if orphan['removable']]
+        removed = []
+        freed = 0
+        conn = get_db()
+        for filename in removable:
+            # Re-vérifier sous transaction : un item a pu référencer l'image entre-temps
+            cursor = conn.execute('SELECT ref_count FROM image_refs WHERE filename = ?', (filename,))
+            row = cursor.fetchone()
+            if row and row['ref_count'] > 0:
+                continue
+            conn.execute('DELETE FROM image_refs WHERE filename = ?', (filename,))
+            conn.commit()
+            freed += remove_image_file(filename)
+            removed.append(filename)
+        conn.close()
+        safe_print(f'[IMG] {len(removed)} image(s) orpheline(s) supprimée(s), {freed} octets libérés')
+        return jsonify({'success': True, 'removed': removed, 'freedBytes': freed}), 200
+    except Exception as e:
+        safe_print(f'[IMG] Erreur suppression orphelines: {e}')
+        safe_traceback()
+        return jsonify({'success': False, 'error': sanitize_error(e)}), 500
+
+# ==================== PROFILAGE DES REQUÊTES ====================
+# Profil par échantillonnage de pile : un thread relève la pile des requêtes profilées
+# toutes les PROFILE_INTERVAL_MS et compte les piles identiques. Déclenché par
+# l'en-tête X-Profile: 1 (avec le jeton admin) ou par échantillonnage
+# (PROFILE_SAMPLE_RATE, PROFILE_SAMPLING="PUT /api/items/<serial_number>=0.05").
+# Les PROFILE_MAX_STORED derniers profils sont enregistrés dans PROFILE_DIR (partagé
+# par les workers, comme le bus d'événements SQLite) et servis au format « folded
+# stacks » (flamegraph.pl, inferno, speedscope).
+PROFILE_INTERVAL_MS = float(os.environ.get('PROFILE_INTERVAL_MS', 5))
+PROFILE_MAX_STORED = int(os.environ.get('PROFILE_MAX_STORED', 20))
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', 0))
+PROFILE_SAMPLING = parse_log_sampling(os.environ.get('PROFILE_SAMPLING', ''))
+PROFILE_MAX_DEPTH = 128
+PROFILE_DIR = os.environ.get('PROFILE_DIR', os.path.join(SCRIPT_DIR, 'data', 'profiles'))
+_PROFILE_ID_PATTERN = re.compile(r'^[0-9a-f]{12}$')
+
+_active_profiles = {}  # id du thread -> profil en cours
+_profiles_lock = threading.Lock()
+_profiler_wakeup = threading.Event()
+_profiler_thread = None
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+def _fold_stack(frame):
+    """Pile d'appels racine;...;feuille"""
+    labels = []
+    while frame is not None and len(labels) < PROFILE_MAX_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(labels))
+
+def _profiler_loop():
+    """Relever la pile de chaque requête profilée (le thread dort s'il n'y en a aucune)"""
+    interval = PROFILE_INTERVAL_MS / 1000
+    while True:
+        frames = sys._current_frames()
+        with _profiles_lock:
+            # Sous le verrou : un profil retiré par finish_request_profile n'est plus modifié
+            for thread_id, profile in _active_profiles.items():
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    stack = _fold_stack(frame)
+                    profile['stacks'][stack] = profile['stacks'].get(stack, 0) + 1
+            idle = not _active_profiles
+            if idle:
+                _profiler_wakeup.clear()
+        del frames
+        if idle:
+            _profiler_wakeup.wait()
+        else:
+            time.sleep(interval)
+
+def _stored_profile_entries():
+    """Fichiers de profils, du plus récent au plus ancien"""
+    entries = []
+    if not os.path.isdir(PROFILE_DIR):
+        return entries
+    for entry in os.scandir(PROFILE_DIR):
+        if not entry.name.endswith('.json'):
+            continue
+        try:
+            entries.append((entry.stat().st_mtime, entry.path))
+        except FileNotFoundError:
+            pass  # supprimé par un autre worker
+    return [path for _, path in sorted(entries, reverse=True)]
+
+def store_profile(profile):
+    """Enregistrer un profil terminé et ne garder que les PROFILE_MAX_STORED plus récents"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    path = os.path.join(PROFILE_DIR, f"{profile['id']}.json")
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, ensure_ascii=False)
+    os.replace(temp_path, path)
+    for old_path in _stored_profile_entries()[PROFILE_MAX_STORED:]:
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+
+def load_profile(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+def should_profile_request():
+    """Profiler cette requête ? (en-tête admin, ou taux d'échantillonnage de la route)"""
+    if request.headers.get('X-Profile') == '1' and is_admin_request():
+        return True
+    route = request.url_rule.rule if request.url_rule else request.path
+    rate = PROFILE_SAMPLING.get(f'{request.method} {route}', PROFILE_SAMPLING.get(route, PROFILE_SAMPLE_RATE))
+    return rate > 0 and random.random() < rate
+
+@app.before_request
+def start_request_profile():
+    """Démarrer l'échantillonnage de la pile du thread de la requête si demandé"""
+    global _profiler_thread
+    if not request.path.startswith('/api/') or request.path.startswith('/api/admin/') or not should_profile_request():
+        return
+    profile = {
+        'id': secrets.token_hex(6),
+        'pid': os.getpid(),
+        'requestId': g.get('request_id'),
+        'method': request.method,
+        'path': request.path,
+        'route': request.url_rule.rule if request.url_rule else None,
+        'startedAt': datetime.now().isoformat(),
+        'intervalMs': PROFILE_INTERVAL_MS,
+        'stacks': {},
+        '_started': time.perf_counter()
+    }
+    with _profiles_lock:
+        _active_profiles[threading.get_ident()] = profile
+        if _profiler_thread is None:
+            _profiler_thread = threading.Thread(target=_profiler_loop, name='request-profiler', daemon=True)
+            _profiler_thread.start()
+    _profiler_wakeup.set()
+    g.profile = profile
+
+@app.after_request
+def finish_request_profile(response):
+    """Arrêter l'échantillonnage et conserver le profil"""
+    profile = g.get('profile')
+    if profile is None:
+        return response
+    # Le thread est aussi retiré par teardown_request si un hook échoue avant celui-ci
+    with _profiles_lock:
+        _active_profiles.pop(threading.get_ident(), None)
+        stacks = dict(profile['stacks'])
+    duration_ms = round((time.perf_counter() - profile['_started']) * 1000, 1)
+    profile = {k: v for k, v in profile.items() if not k.startswith('_')}
+    profile.update(stacks=stacks, status=response.status_code, durationMs=duration_ms, samples=sum(stacks.values()))
+    try:
+        store_profile(profile)
+    except OSError as e:
+        safe_print(f'[PROFILE] Erreur enregistrement profil {profile["id"]}: {e}', level='WARNING')
+        return response
+    response.headers['X-Profile-Id'] = profile['id']
+    safe_print(f"[PROFILE] {profile['method']} {profile['path']} : {profile['samples']} échantillons "
+               f"en {profile['durationMs']} ms (profil {profile['id']})")
+    return response
+
+@app.teardown_request
+def release_request_profile(exc=None):
+    """Retirer le thread de l'échantillonnage même si un autre hook after_request a échoué"""
+    if g.pop('profile', None) is not None:
+        with _profiles_lock:
+            _active_profiles.pop(threading.get_ident(), None)
+
+def profile_summary(profile):
+    """Profil sans les piles, avec les fonctions les plus présentes en feuille de pile"""
+    leaves = {}
+    for stack, count in profile['stacks'].items():
+        leaf = stack.rsplit(';', 1)[-1]
+        leaves[leaf] = leaves.get(leaf, 0) + count
+    summary = {k: v for k, v in profile.items() if k != 'stacks'}
+    summary['topFrames'] = [{'frame': frame, 'samples': count}
+                            for frame, count in sorted(leaves.items(), key=lambda x: x[1], reverse=True)[:10]]
+    return summary
+
+@app.route('/api/admin/profiles', methods=['GET'])
+@require_admin
+def list_profiles():
+    """Derniers profils de requêtes, tous workers confondus (plus récent en premier)"""
+    profiles = [load_profile(path) for path in _stored_profile_entries()[:PROFILE_MAX_STORED]]
+    return jsonify({'success': True, 'profiles': [profile_summary(p) for p in profiles if p]}), 200
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+@require_admin
+def get_profile(profile_id):
+    """Un profil : piles repliées (texte, défaut) ou JSON (?format=json)"""
+    profile = load_profile(os.path.join(PROFILE_DIR, f'{profile_id}.json')) if _PROFILE_ID_PATTERN.match(profile_id) else None
+    if profile is None:
+        return jsonify({'success': False, 'error': 'Profil non trouvé'}), 404
+    if request.args.get('format') == 'json':
+        return jsonify({'success': True, 'profile': {**profile_summary(profile), 'stacks': profile['stacks']}}), 200
+    folded = ''.join(f'{stack} {count}\n' for stack, count in sorted(profile['stacks'].items()))
+    return Response(folded, mimetype='text/plain', headers={
+        'Content-Disposition': f'attachment; filename=profile-{profile_id}.folded'
+    })
+
 # ==================== HEALTH CHECK ====================
 
 @app.route('/api/health', methods=['GET'])
@@ -4208,7 +7367,10 @@ def health_check():
         'mode': APP_MODE,
         'database': 'connected' if os.path.exists(DB_PATH) else 'not found',
         'ocr': 'available' if OCR_AVAILABLE else 'unavailable',
-        'docx': 'available' if DOCX_AVAILABLE else 'unavailable'
+        'docx': 'available' if DOCX_AVAILABLE else 'unavailable',
+        'whisper': _whisper_state['status'],
+        'eventBus': event_bus.name,
+        'boot': boot_report()
     }), 200
 
 # ==================== CATCH-ALL FRONTEND (doit être après toutes les routes API) ====================
@@ -4223,27 +7385,9 @@ def serve_frontend_pages(path):
     if path.startswith('api/'):
         return '', 404
     
-    # Essayer de servir le fichier directement
-    file_path = os.path.join(FRONTEND_BUILD_DIR, path)
-    if os.path.exists(file_path) and os.path.isfile(file_path):
-        directory = os.path.dirname(file_path)
-        filename = os.path.basename(file_path)
-        return send_from_directory(directory, filename)
-    
-    # Essayer avec .html
-    html_path = os.path.join(FRONTEND_BUILD_DIR, f'{path}.html')
-    if os.path.exists(html_path):
-        directory = os.path.dirname(html_path)
-        filename = os.path.basename(html_path)
-        return send_from_directory(directory, filename)
-    
-    # Essayer comme dossier avec index.html
-    index_path = os.path.join(FRONTEND_BUILD_DIR, path, 'index.html')
-    if os.path.exists(index_path):
-        return send_from_directory(os.path.join(FRONTEND_BUILD_DIR, path), 'index.html')
-    
-    # Fallback: retourner index.html pour le routing côté client
-    return send_from_directory(FRONTEND_BUILD_DIR, 'index.html')
+    # Fichier, page .html ou dossier/index.html (une recherche dans le manifeste) ;
+    # sinon index.html pour le routage côté client
+    return serve_static_path(path, fallback_to_index=True)
 
 # ==================== DÉMARRAGE ====================
 
@@ -4252,6 +7396,21 @@ import sys
 
 # Configuration du démarrage (en mode dev : rechargement auto du backend à chaque modification)
 FLASK_DEBUG = os.environ.get('FLASK_DEBUG', 'true' if APP_MODE == 'development' else 'false').lower() == 'true'
+# Servir via uvicorn (SSE asyncio, voir asgi_app) au lieu du serveur de développement Flask
+USE_ASGI = os.environ.get('USE_ASGI', 'false').lower() == 'true'
+
+# Serveur de production (par défaut en APP_MODE=production) : uvicorn multi-processus,
+# chaque worker sert Flask dans un pool de WSGI_THREADS threads et le SSE en asyncio.
+# Le superviseur initialise la base une seule fois ; les workers partagent les événements
+# via le bus SQLite et chargent Whisper à la demande (un modèle par worker).
+PRODUCTION_SERVER = os.environ.get('PRODUCTION_SERVER', 'true' if APP_MODE == 'production' else 'false').lower() == 'true'
+SERVER_WORKERS = int(os.environ.get('SERVER_WORKERS', min(4, os.cpu_count() or 1)))
+SERVER_KEEPALIVE_SECONDS = int(os.environ.get('SERVER_KEEPALIVE_SECONDS', 5))
+SERVER_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get('SERVER_GRACEFUL_TIMEOUT_SECONDS', 30))
+SERVER_BACKLOG = int(os.environ.get('SERVER_BACKLOG', 2048))
+SERVER_LIMIT_CONCURRENCY = int(os.environ.get('SERVER_LIMIT_CONCURRENCY', 0)) or None  # par worker, 0 = illimité
+# Posé par le superviseur pour ses workers : la base est déjà initialisée
+SUPERVISOR_BOOT_ENV = 'SERVER_SUPERVISOR_BOOTED'
 
 def build_frontend():
     """Construire le frontend Next.js si nécessaire (depuis la racine du projet)"""
@@ -4301,16 +7460,123 @@ def build_frontend():
         print(f"[BUILD] Erreur lors du build: {e}")
         return False
 
+# ==================== SÉQUENCE DE DÉMARRAGE ====================
+
+def _timed_boot_task(task):
+    """Exécuter une tâche d'initialisation et retourner (durée, erreur)"""
+    started = time.perf_counter()
+    try:
+        task()
+        return time.perf_counter() - started, None
+    except Exception as e:
+        safe_print(f'[BOOT] Erreur tâche d\'initialisation: {sanitize_error(e)}')
+        return time.perf_counter() - started, sanitize_error(e)
+
+def run_boot_sequence(supervisor=False):
+    """Initialiser la base puis exécuter en parallèle les tâches indépendantes
+    
+    supervisor=True : superviseur multi-worker, qui ne sert pas de requêtes
+    (ni bus d'événements ni Whisper, ils démarrent dans chaque worker).
+    """
+    global BOOT_READY_SECONDS
+    # Le schéma doit exister avant tout le reste
+    init_db()
+    record_boot_phase('init_db')
+    
+    # Tâches indépendantes (SQLite sérialise les écritures, le verrou attend au plus 5 s)
+    tasks = {
+        'migrate_hex_ids': migrate_hex_ids,
+        'clean_notifications': clean_existing_notifications,
+        'custom_fields_registry': get_custom_field_registry,
+        'images_dir': ensure_images_dir
+    }
+    with ThreadPoolExecutor(max_workers=len(tasks), thread_name_prefix='boot') as executor:
+        futures = {name: executor.submit(_timed_boot_task, task) for name, task in tasks.items()}
+    for name, future in futures.items():
+        seconds, error = future.result()
+        record_boot_phase(name, seconds, parallel=True, error=error)
+    record_boot_phase('init_parallel')
+    
+    # Tâches de fond : rétention des notifications (une fois par hôte), puis celles du worker
+    start_notification_pruner()
+    if not supervisor:
+        start_worker_tasks()
+    BOOT_READY_SECONDS = time.perf_counter() - BOOT_STARTED_AT
+
+def start_worker_tasks():
+    """Tâches propres à chaque processus qui sert des requêtes : bus d'événements, Whisper et métriques"""
+    event_bus.start()
+    start_whisper_background()
+    start_metrics_flusher()
+
+def run_worker_boot():
+    """Démarrage d'un worker lancé par le superviseur (base déjà initialisée)"""
+    global BOOT_READY_SECONDS
+    conn = get_db()
+    try:
+        load_notification_watermark(conn.cursor())
+    finally:
+        conn.close()
+    get_custom_field_registry()
+    record_boot_phase('worker_state')
+    start_worker_tasks()
+    BOOT_READY_SECONDS = time.perf_counter() - BOOT_STARTED_AT
+    safe_print(f'[BOOT] Worker {os.getpid()} prêt en {BOOT_READY_SECONDS * 1000:.0f} ms')
+
+def run_production_server():
+    """Servir l'application avec uvicorn (SERVER_WORKERS processus)"""
+    import uvicorn
+    options = {
+        'host': '0.0.0.0',
+        'port': SERVER_PORT,
+        'log_level': 'warning',
+        'timeout_keep_alive': SERVER_KEEPALIVE_SECONDS,
+        'timeout_graceful_shutdown': SERVER_GRACEFUL_TIMEOUT_SECONDS,
+        'backlog': SERVER_BACKLOG,
+        'limit_concurrency': SERVER_LIMIT_CONCURRENCY
+    }
+    if SERVER_WORKERS <= 1:
+        uvicorn.run(asgi_app, **options)
+        return
+    reset_metrics_dir()
+    os.environ[SUPERVISOR_BOOT_ENV] = '1'
+    uvicorn.run('server:asgi_app', app_dir=SCRIPT_DIR, workers=SERVER_WORKERS, **options)
+
+def configure_worker_environment():
+    """(Superviseur) Réglages hérités par les workers, processus neufs qui importent server.py"""
+    global WHISPER_PRELOAD
+    if EVENT_BUS == 'local':
+        # Un bus local par processus ne verrait que ses propres événements
+        os.environ['EVENT_BUS'] = 'sqlite'
+        safe_print(f'[SSE] {SERVER_WORKERS} workers : bus d\'événements SQLite ({EVENT_BUS_PATH})')
+    # Un modèle Whisper par worker : pas de préchargement sauf demande explicite
+    os.environ.setdefault('WHISPER_PRELOAD', 'false')
+    WHISPER_PRELOAD = os.environ['WHISPER_PRELOAD'].lower() in ('1', 'true', 'yes')
+
+def print_boot_profile():
+    """Afficher le profil de démarrage dans la bannière"""
+    for phase in BOOT_PHASES:
+        label = f"{phase['name']}{' (//)' if phase.get('parallel') else ''}"
+        status = f"  [KO] {phase['error']}" if phase.get('error') else ''
+        print(f"    {label:<28}{phase['seconds'] * 1000:>8.0f} ms{status}")
+    if BOOT_READY_SECONDS is not None:
+        print(f"    {'prêt':<28}{BOOT_READY_SECONDS * 1000:>8.0f} ms")
+
+record_boot_phase('module')
+
 if __name__ == '__main__':
     print("=" * 60)
     print("  CODE BAR CRM - Serveur Unifié")
     print("=" * 60)
     
-    # Initialiser la base de données
-    init_db()
-    
-    # Migrer les hex_id vers le nouveau format 3 caractères
-    migrate_hex_ids()
+    # Initialiser la base, migrer les hex_id (A00-Z99) et lancer les tâches de fond.
+    # Le processus parent du reloader ne sert aucune requête : l'enfant s'en charge.
+    serving_process = PRODUCTION_SERVER or USE_ASGI or not FLASK_DEBUG or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+    supervisor = PRODUCTION_SERVER and SERVER_WORKERS > 1
+    if supervisor:
+        configure_worker_environment()
+    if serving_process:
+        run_boot_sequence(supervisor=supervisor)
     
     # Vérifier/construire le frontend si demandé
     auto_build = os.environ.get('AUTO_BUILD', 'false').lower() == 'true'
@@ -4318,14 +7584,26 @@ if __name__ == '__main__':
         build_frontend()
         # Recharger la vérification
         globals()['FRONTEND_AVAILABLE'] = check_frontend_build()
+        refresh_static_manifest()
     
+    # Les logs du démarrage passent par la file : les écrire avant la bannière
+    flush_logs()
     print("\n" + "=" * 60)
     print("  SERVEUR UNIFIE ACTIF")
     print(f"    URL:      http://localhost:{SERVER_PORT}")
     print(f"    Mode:     {APP_MODE}")
+    print(f"    Logs:     {LOG_FORMAT}, niveau {LOG_LEVEL}{', contenu des requêtes' if LOG_PAYLOADS else ''}")
+    if PRODUCTION_SERVER:
+        print(f"    Serveur:  uvicorn, {SERVER_WORKERS} worker(s) x {WSGI_THREADS} threads, keep-alive {SERVER_KEEPALIVE_SECONDS}s")
+    else:
+        print(f"    Serveur:  {'uvicorn (ASGI)' if USE_ASGI else 'Flask (développement)'}")
     print(f"    Frontend: {'[OK] Disponible' if FRONTEND_AVAILABLE else '[KO] Non builde'}")
     print(f"    OCR:      {'[OK] Disponible' if OCR_AVAILABLE else '[KO] Non disponible'}")
     print(f"    DOCX:     {'[OK] Disponible' if DOCX_AVAILABLE else '[KO] Non disponible'}")
+    print(f"    Whisper:  {f'[OK] {WHISPER_MODEL_SIZE} (' + ('préchargement en arrière-plan' if WHISPER_PRELOAD else 'chargé au premier usage') + ')' if WHISPER_AVAILABLE else '[KO] Non disponible'}")
+    if serving_process:
+        print("  DEMARRAGE")
+        print_boot_profile()
     print("=" * 60)
     
     if not FRONTEND_AVAILABLE:
@@ -4339,6 +7617,16 @@ if __name__ == '__main__':
     print("\nPour arrêter le serveur: Ctrl+C")
     print("=" * 60 + "\n")
     
+    if PRODUCTION_SERVER:
+        run_production_server()
+        sys.exit(0)
+    
+    if USE_ASGI:
+        # Flask dans un pool de threads + flux SSE sur la boucle asyncio
+        import uvicorn
+        uvicorn.run(asgi_app, host='0.0.0.0', port=SERVER_PORT, log_level='warning')
+        sys.exit(0)
+    
     # Démarrer Flask (API + Frontend sur le même port)
     # debug=True en dev : rechargement auto quand vous modifiez server.py ou les fichiers Python
     app.run(
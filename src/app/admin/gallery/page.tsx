@@ -50,7 +50,7 @@ import {
   MdFilterList,
 } from 'react-icons/md';
 import Card from 'components/card/Card';
-import { getItems, getCategories, Item, getSSEUrl } from 'lib/api';
+import { getItems, getCategories, Item, getSSETopicsUrl } from 'lib/api';
 
 interface ItemWithMedia extends Item {
   mediaArray: string[];
@@ -151,7 +151,7 @@ export default function GalleryPage() {
     loadData();
     
     // Écouter les événements SSE pour recharger uniquement lors de changements
-    const eventSource = new EventSource(getSSEUrl());
+    const eventSource = new EventSource(getSSETopicsUrl('items'));
     
     eventSource.addEventListener('items_changed', () => {
       // Recharger les items quand ils changent (ajout/modification/suppression)
@@ -65,6 +65,10 @@ import {
   Item,
   CustomField,
   getSSEUrl,
+  getSSEResumeUrl,
+  getImageVariantUrl,
+  applyItemsChanged,
+  ItemsChangedPayload,
   createCustomField,
   deleteCustomField,
   updateCustomField,
@@ -376,13 +380,32 @@ export default function InventoryPage() {
     let reconnectTimeout: NodeJS.Timeout | null = null;
     let reconnectAttempts = 0;
     const maxReconnectAttempts = 5;
+    // Dernier id reçu : à la reconnexion, le serveur rejoue les événements manqués
+    let lastEventId: string | null = null;
+    const trackEventId = (e: Event) => {
+      const id = (e as MessageEvent).lastEventId;
+      if (id) lastEventId = id;
+    };
     
     const connectSSE = () => {
       if (eventSource) {
         eventSource.close();
       }
       
-      eventSource = new EventSource(SSE_URL);
+      eventSource = new EventSource(getSSEResumeUrl(lastEventId, { topics: ['items', 'categories', 'custom_fields'] }));
+      
+      ['connected', 'items_changed', 'categories_changed', 'custom_fields_changed'].forEach((type) =>
+        eventSource?.addEventListener(type, trackEventId)
+      );
+      
+      // Événements manqués perdus (tampon serveur dépassé ou serveur redémarré) : tout recharger
+      eventSource.addEventListener('resync', () => {
+        console.log('[SSE] Resynchronisation complète demandée par le serveur');
+        setLastSyncTime(new Date());
+        loadItems();
+        loadCategories();
+        loadCustomFields();
+      });
       
       eventSource.onopen = () => {
         console.log('[SSE] ✅ Connecté aux événements temps réel');
@@ -410,13 +433,19 @@ export default function InventoryPage() {
       eventSource.addEventListener('items_changed', (e) => {
         console.log('[SSE] 📦 Événement items_changed reçu:', e);
         try {
-          const data = JSON.parse((e as MessageEvent).data);
+          const payload: ItemsChangedPayload = JSON.parse((e as MessageEvent).data)?.data ?? {};
           // Ne pas recharger si c'est un événement de hiérarchie (déjà géré en optimiste)
-          if (data?.action === 'hierarchy_updated' || data?.action === 'hierarchy_reordered') {
+          if (payload.action === 'hierarchy_updated' || payload.action === 'hierarchy_reordered') {
             console.log('[SSE] Événement hiérarchie ignoré (mise à jour optimiste déjà appliquée)');
             setLastSyncTime(new Date());
             return;
           }
+          // Le payload embarque les items modifiés : patcher l'état local sans recharger
+          if (!payload.reload && Array.isArray(payload.items) && Array.isArray(payload.deleted)) {
+            setItems((prev) => applyItemsChanged(prev, payload));
+            setLastSyncTime(new Date());
+            return;
+          }
         } catch {
           // Si on ne peut pas parser, on recharge par défaut
         }
@@ -1468,7 +1497,7 @@ export default function InventoryPage() {
                     }}
                     transition="all 0.2s"
                   >
-                    <Image src={imgSrc} alt={`Image ${idx + 1}`} w="100%" h="100%" objectFit="cover" />
+                    <Image src={getImageVariantUrl(imgSrc, 80)} alt={`Image ${idx + 1}`} w="100%" h="100%" objectFit="cover" />
                     {images.length > 1 && (
                       <Badge
                         position="absolute"
@@ -3191,7 +3220,7 @@ export default function InventoryPage() {
                           _hover={{ opacity: 0.9, borderColor: 'whiteAlpha.700' }}
                           transition="all 0.2s"
                         >
-                          <Image src={img} alt={`Miniature ${idx + 1}`} w="100%" h="100%" objectFit="cover" />
+                          <Image src={getImageVariantUrl(img, 80)} alt={`Miniature ${idx + 1}`} w="100%" h="100%" objectFit="cover" />
                         </Box>
                       ))}
                     </HStack>
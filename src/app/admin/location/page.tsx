@@ -68,7 +68,7 @@ import {
   MdDownload,
 } from 'react-icons/md';
 import Card from 'components/card/Card';
-import { getItems, getRentals, createRental, updateRental, deleteRental, downloadRentalCautionDoc, Item, getSSEUrl } from 'lib/api';
+import { getItems, getRentals, createRental, updateRental, deleteRental, downloadRentalCautionDoc, Item, getSSETopicsUrl } from 'lib/api';
 
 interface Rental {
   id: number;
@@ -334,7 +334,7 @@ export default function LocationPage() {
   }, [toast]);
 
   // URL SSE - utiliser la configuration
-  const SSE_URL = getSSEUrl();
+  const SSE_URL = getSSETopicsUrl('items', 'rentals');
 
   useEffect(() => {
     // Chargement initial
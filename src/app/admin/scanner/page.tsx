@@ -40,7 +40,7 @@ import {
 import { useState, useRef, useEffect } from 'react';
 import { MdQrCodeScanner, MdCameraAlt, MdSearch, MdDocumentScanner, MdTextFields, MdPhotoLibrary, MdClose, MdCheckCircle, MdAutoAwesome } from 'react-icons/md';
 import Card from 'components/card/Card';
-import { saveItem, searchProductByBarcode, searchItemByCode, recognizeImage, analyzeLabelAI, OcrResult, getCategories, getCustomFields, CustomField, getSSEUrl, fetchImageAsBase64, uploadImage } from 'lib/api';
+import { saveItem, searchProductByBarcode, searchItemByCode, recognizeImage, analyzeLabelAI, OcrResult, getCategories, getCustomFields, CustomField, getSSETopicsUrl, fetchImageAsBase64, uploadImage } from 'lib/api';
 import { BrowserMultiFormatReader, NotFoundException } from '@zxing/library';
 
 export default function ScannerPage() {
@@ -1290,7 +1290,7 @@ export default function ScannerPage() {
   }, []);
 
   // URL SSE - utiliser la configuration
-  const SSE_URL = getSSEUrl();
+  const SSE_URL = getSSETopicsUrl('categories', 'custom_fields');
 
   // Charger les catégories et champs personnalisés au montage
   useEffect(() => {
@@ -28,7 +28,7 @@ import { useAuth } from 'contexts/AuthContext';
 import { IoMdMoon, IoMdSunny } from 'react-icons/io';
 import { MdNotificationsNone, MdCheckCircle, MdClose } from 'react-icons/md';
 import routes from 'routes';
-import { getNotifications, deleteNotification, clearNotifications, Notification, getSSEUrl } from 'lib/api';
+import { getNotifications, deleteNotification, clearNotifications, Notification, getSSETopicsUrl, applyNotificationsChanged, NotificationsChangedPayload } from 'lib/api';
 
 export default function HeaderLinks(props: {
   secondary: boolean;
@@ -71,7 +71,7 @@ export default function HeaderLinks(props: {
     loadNotifications();
     
     // URL SSE - utiliser la configuration
-    const SSE_URL = getSSEUrl();
+    const SSE_URL = getSSETopicsUrl('notifications');
     
     // Écouter les événements SSE pour les notifications
     let eventSource: EventSource | null = null;
@@ -102,7 +102,17 @@ export default function HeaderLinks(props: {
         }
       };
       
-      eventSource.addEventListener('notifications_changed', () => {
+      eventSource.addEventListener('notifications_changed', (e) => {
+        try {
+          const payload: NotificationsChangedPayload = JSON.parse((e as MessageEvent).data)?.data ?? {};
+          // Le payload embarque les nouvelles notifications : patcher la liste sans recharger
+          if (!payload.reload && Array.isArray(payload.notifications)) {
+            setNotifications((prev) => applyNotificationsChanged(prev, payload));
+            return;
+          }
+        } catch {
+          // Si on ne peut pas parser, on recharge par défaut
+        }
         loadNotifications();
       });
     };
@@ -7,6 +7,7 @@
 import { ResizableTable, ResizableColumn } from './ResizableTable';
 import { Badge, Image, Box, Text, IconButton, Icon, HStack } from '@chakra-ui/react';
 import { MdEdit, MdDelete } from 'react-icons/md';
+import { getImageVariantUrl } from 'lib/api';
 
 interface Item {
   serialNumber: string;
@@ -69,7 +70,7 @@ export function InventoryTable({
       render: (item: Item) => (
         item.image ? (
           <Image
-            src={item.image}
+            src={getImageVariantUrl(item.image, 80)}
             alt={item.name}
             w="40px"
             h="40px"
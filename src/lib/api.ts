@@ -53,6 +53,34 @@ export const getSSEUrl = (): string => {
   return `${baseUrl}/events`;
 };
 
+// Sujets SSE : le serveur n'envoie (et ne réveille) que les types d'événements suivis
+export type SSETopic = 'items' | 'rentals' | 'categories' | 'custom_fields' | 'notifications';
+
+export interface SSESubscription {
+  topics?: SSETopic[];
+  itemIds?: number[]; // items_changed limités à ces items
+}
+
+// URL SSE avec abonnement et reprise : le serveur rejoue les événements postérieurs à lastEventId
+export const getSSEResumeUrl = (lastEventId?: string | null, subscription: SSESubscription = {}): string => {
+  const params = new URLSearchParams();
+  if (subscription.topics?.length) params.set('topics', subscription.topics.join(','));
+  if (subscription.itemIds?.length) params.set('itemIds', subscription.itemIds.join(','));
+  if (lastEventId) params.set('lastEventId', lastEventId);
+  const query = params.toString();
+  return query ? `${getSSEUrl()}?${query}` : getSSEUrl();
+};
+
+// URL SSE limitée à certains sujets
+export const getSSETopicsUrl = (...topics: SSETopic[]): string => getSSEResumeUrl(null, { topics });
+
+// Image redimensionnée : le serveur sert la taille précalculée la plus proche couvrant
+// `width` pixels (prévoir x2 pour les écrans haute densité), sinon l'original
+export const getImageVariantUrl = (src: string, width: number): string => {
+  if (!src.startsWith('/api/images/') || src.includes('?')) return src;
+  return `${src}?w=${Math.round(width)}`;
+};
+
 // Types
 export interface Item {
   id?: number;
@@ -80,6 +108,8 @@ export interface Item {
   displayOrder?: number;
   // Champs personnalisés
   customData?: Record<string, any>;
+  // Version pour la concurrence optimiste (ETag / If-Match)
+  version?: number;
   createdAt?: string;
   lastUpdated?: string;
 }
@@ -99,6 +129,11 @@ export interface Notification {
   id: number;
   message: string;
   type: string;
+  event?: string | null;
+  itemId?: number | null;
+  field?: string | null;
+  oldValue?: string | null;
+  newValue?: string | null;
   itemSerialNumber?: string;
   itemHexId?: string;
   timestamp: string;
@@ -264,6 +299,26 @@ export async function updateItem(
   });
 }
 
+/**
+ * Mise à jour partielle d'un item (customData fusionné en JSON Merge Patch).
+ * Si `version` est fourni, la requête échoue (412) si l'item a été modifié entre-temps.
+ */
+export async function patchItem(
+  itemId: number,
+  patch: Partial<Item>,
+  version?: number
+): Promise<{ success: boolean; changed: boolean; item: Item }> {
+  return apiRequest(`/items/${itemId}`, {
+    method: 'PATCH',
+    // Les en-têtes passés remplacent ceux par défaut : Content-Type doit être répété
+    headers: {
+      'Content-Type': 'application/json',
+      ...(version !== undefined ? { 'If-Match': `"${version}"` } : {}),
+    },
+    body: JSON.stringify(patch),
+  });
+}
+
 export async function deleteItem(serialNumber: string): Promise<any> {
   return apiRequest(`/items/${encodeURIComponent(serialNumber)}`, {
     method: 'DELETE',
@@ -276,6 +331,23 @@ export async function deleteAllItems(): Promise<{ success: boolean; count: numbe
   });
 }
 
+export async function bulkUpdateItems(
+  ids: number[],
+  changes: Partial<Pick<Item, 'name' | 'quantity' | 'category' | 'categoryDetails' | 'brand' | 'model' | 'itemType' | 'status'>>
+): Promise<{ success: boolean; updated: number; unchanged: number; notFound: number[] }> {
+  return apiRequest('/items/bulk-update', {
+    method: 'POST',
+    body: JSON.stringify({ ids, changes }),
+  });
+}
+
+export async function bulkDeleteItems(ids: number[]): Promise<{ success: boolean; deleted: number; notFound: number[] }> {
+  return apiRequest('/items/bulk-delete', {
+    method: 'POST',
+    body: JSON.stringify({ ids }),
+  });
+}
+
 export async function getItemHistory(serialNumber: string): Promise<any[]> {
   const data = await apiRequest<{ history: any[] }>(
     `/items/${encodeURIComponent(serialNumber)}/history`
@@ -283,6 +355,24 @@ export async function getItemHistory(serialNumber: string): Promise<any[]> {
   return data.history || [];
 }
 
+/**
+ * Historique paginé par curseur (passer nextCursor pour la page suivante)
+ */
+export async function getItemHistoryPage(
+  serialNumber: string,
+  options: { limit?: number; cursor?: string | null; fields?: string[] } = {}
+): Promise<{ history: any[]; nextCursor: string | null }> {
+  const params = new URLSearchParams();
+  if (options.limit) params.set('limit', String(options.limit));
+  if (options.cursor) params.set('cursor', options.cursor);
+  if (options.fields && options.fields.length > 0) params.set('fields', options.fields.join(','));
+  const query = params.toString();
+  const data = await apiRequest<{ history: any[]; nextCursor: string | null }>(
+    `/items/${encodeURIComponent(serialNumber)}/history${query ? `?${query}` : ''}`
+  );
+  return { history: data.history || [], nextCursor: data.nextCursor || null };
+}
+
 export async function searchItemByCode(code: string): Promise<{ found: boolean; item: Item | null }> {
   const data = await apiRequest<{ success: boolean; found: boolean; item: Item | null }>(
     `/items/search?q=${encodeURIComponent(code)}`
@@ -312,6 +402,55 @@ export async function reorderItemHierarchy(items: Array<{ id: number; parentId:
   });
 }
 
+// ==================== ÉVÉNEMENTS SSE (payloads fusionnés) ====================
+
+export interface ItemsChangedPayload {
+  action?: string;
+  actions?: string[];
+  count?: number;
+  items?: Item[];
+  deleted?: { id: number | null; serialNumber: string | null }[];
+  reload?: boolean;
+}
+
+export interface NotificationsChangedPayload {
+  action?: string;
+  count?: number;
+  notifications?: Notification[];
+  deleted?: number[];
+  cleared?: boolean;
+  reload?: boolean;
+}
+
+// Appliquer un items_changed à une liste locale (suppressions puis mises à jour/ajouts en tête)
+export function applyItemsChanged(items: Item[], payload: ItemsChangedPayload): Item[] {
+  const deletedIds = new Set((payload.deleted || []).map((d) => d.id).filter((id) => id != null));
+  const deletedSerials = new Set((payload.deleted || []).map((d) => d.serialNumber).filter(Boolean));
+  const updates = new Map((payload.items || []).map((item) => [item.id, item]));
+  const next = items
+    .filter((item) => !deletedIds.has(item.id) && !deletedSerials.has(item.serialNumber))
+    .map((item) => {
+      const updated = updates.get(item.id);
+      if (updated) updates.delete(item.id);
+      return updated || item;
+    });
+  return [...Array.from(updates.values()), ...next];
+}
+
+// Appliquer un notifications_changed à une liste locale (plus récentes d'abord)
+export function applyNotificationsChanged(
+  notifications: Notification[],
+  payload: NotificationsChangedPayload,
+  limit: number = 50
+): Notification[] {
+  if (payload.cleared) return [...(payload.notifications || [])];
+  const deleted = new Set(payload.deleted || []);
+  const incoming = payload.notifications || [];
+  const incomingIds = new Set(incoming.map((n) => n.id));
+  const kept = notifications.filter((n) => !deleted.has(n.id) && !incomingIds.has(n.id));
+  return [...incoming, ...kept].slice(0, limit);
+}
+
 // ==================== API NOTIFICATIONS ====================
 
 export async function getNotifications(): Promise<Notification[]> {
@@ -326,6 +465,37 @@ export async function getNotifications(): Promise<Notification[]> {
   }
 }
 
+export async function getNotificationsPage(
+  options: { limit?: number; cursor?: string | null; since?: number; clientId?: string; unseen?: boolean } = {}
+): Promise<{ notifications: Notification[]; nextCursor: string | null; lastSeenId?: number; unseenCount?: number }> {
+  const params = new URLSearchParams();
+  if (options.limit) params.set('limit', String(options.limit));
+  if (options.cursor) params.set('cursor', options.cursor);
+  if (options.since) params.set('since', String(options.since));
+  if (options.clientId) params.set('clientId', options.clientId);
+  if (options.unseen) params.set('unseen', '1');
+  const query = params.toString();
+  const data = await apiRequest<{
+    notifications: Notification[];
+    nextCursor: string | null;
+    lastSeenId?: number;
+    unseenCount?: number;
+  }>(`/notifications${query ? `?${query}` : ''}`);
+  return {
+    notifications: data.notifications || [],
+    nextCursor: data.nextCursor || null,
+    lastSeenId: data.lastSeenId,
+    unseenCount: data.unseenCount,
+  };
+}
+
+export async function markNotificationsSeen(clientId: string, lastSeenId?: number): Promise<{ lastSeenId: number }> {
+  return apiRequest('/notifications/seen', {
+    method: 'POST',
+    body: JSON.stringify({ clientId, lastSeenId }),
+  });
+}
+
 export async function clearNotifications(): Promise<any> {
   return apiRequest('/notifications', {
     method: 'DELETE',